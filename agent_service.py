@@ -0,0 +1,130 @@
+import os
+import time
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Optional
+import llm_chat_agent
+from resilience import AdaptiveLimiter
+
+# Agent runs executing at once across all sessions; further runs queue
+AGENT_POOL_SIZE = int(os.getenv("AGENT_POOL_SIZE", "4"))
+AGENT_MAX_QUEUE = int(os.getenv("AGENT_MAX_QUEUE", "20"))
+AGENT_QUEUE_TIMEOUT = float(os.getenv("AGENT_QUEUE_TIMEOUT", "60"))
+# Runs one browser session may have in flight; more are refused until one finishes
+AGENT_SESSION_MAX_CONCURRENT = int(os.getenv("AGENT_SESSION_MAX_CONCURRENT", "1"))
+# Upper bound on one agent run, queueing excluded
+AGENT_RUN_TIMEOUT = float(os.getenv("AGENT_RUN_TIMEOUT", "300"))
+
+
+class SessionBusy(Exception):
+    """Raised when a session already has AGENT_SESSION_MAX_CONCURRENT runs in flight."""
+
+
+class AgentService:
+    """Long-lived agent runner shared by every UI session.
+
+    submit() hands a question to the shared agent loop and returns a Future
+    straight away, so the caller's thread is never tied up by the LLM. A
+    fixed-size pool bounds the runs executing at once (extra runs queue, and
+    are rejected with LimiterRejected once the queue is full or the wait
+    times out), and each session is limited to its own number of runs.
+    """
+
+    def __init__(
+        self,
+        pool_size: int = AGENT_POOL_SIZE,
+        max_queue: int = AGENT_MAX_QUEUE,
+        queue_timeout: float = AGENT_QUEUE_TIMEOUT,
+        session_limit: int = AGENT_SESSION_MAX_CONCURRENT,
+        run_timeout: float = AGENT_RUN_TIMEOUT
+    ):
+        # A limiter pinned to one size is a fixed pool with a bounded wait queue
+        self.pool = AdaptiveLimiter(
+            initial_limit=pool_size,
+            min_limit=pool_size,
+            max_limit=pool_size,
+            max_queue=max_queue,
+            queue_timeout=queue_timeout,
+            latency_target=float("inf")
+        )
+        self.session_limit = session_limit
+        self.run_timeout = run_timeout
+        # Sessions submit from their own script threads
+        self._lock = threading.Lock()
+        self._sessions: Dict[str, int] = {}
+        self.completed = 0
+        self.failed = 0
+        self.session_rejections = 0
+
+    def submit(
+        self,
+        session_id: str,
+        question: str,
+        on_event: Optional[Callable[[Dict[str, Any]], None]] = None,
+        history: str = ""
+    ) -> "Future[Dict[str, Any]]":
+        """Start answering a question for a session; the Future resolves to the agent result.
+
+        on_event receives streamed progress (thoughts, tool calls, answer
+        tokens) from the agent loop thread, so it must be thread-safe and
+        non-blocking, e.g. queue.Queue.put. history is the session's bounded
+        conversation window.
+        """
+        with self._lock:
+            running = self._sessions.get(session_id, 0)
+            if running >= self.session_limit:
+                self.session_rejections += 1
+                raise SessionBusy(f"Still answering your previous question ({running} in progress)")
+            self._sessions[session_id] = running + 1
+        future = asyncio.run_coroutine_threadsafe(self._run(question, on_event, history), llm_chat_agent.agent_loop)
+        future.add_done_callback(lambda f: self._finish(session_id, f))
+        return future
+
+    async def _run(
+        self,
+        question: str,
+        on_event: Optional[Callable[[Dict[str, Any]], None]],
+        history: str
+    ) -> Dict[str, Any]:
+        await self.pool.acquire()
+        started = time.monotonic()
+        ok = False
+        try:
+            result = await asyncio.wait_for(llm_chat_agent.arun_agent(question, on_event, history), self.run_timeout)
+            ok = True
+            return result
+        finally:
+            self.pool.release(time.monotonic() - started, ok)
+
+    def _finish(self, session_id: str, future: Future) -> None:
+        with self._lock:
+            running = self._sessions.get(session_id, 1) - 1
+            if running > 0:
+                self._sessions[session_id] = running
+            else:
+                self._sessions.pop(session_id, None)
+            if future.cancelled() or future.exception() is not None:
+                self.failed += 1
+            else:
+                self.completed += 1
+
+    def in_flight(self, session_id: str) -> int:
+        with self._lock:
+            return self._sessions.get(session_id, 0)
+
+    def stats(self) -> Dict[str, Any]:
+        pool = self.pool.stats()
+        with self._lock:
+            sessions = len(self._sessions)
+        return {
+            "pool_size": self.pool.max_limit,
+            "running": pool["in_flight"],
+            "queued": pool["queued"],
+            "rejected": pool["rejected"] + pool["queue_timeouts"],
+            "active_sessions": sessions,
+            "session_rejections": self.session_rejections,
+            "completed": self.completed,
+            "failed": self.failed
+        }
+
@@ -0,0 +1,112 @@
+import os
+import sys
+import json
+import queue
+import atexit
+import random
+import logging
+import logging.handlers
+from typing import Any, Dict, Iterable, Optional
+
+# Logging configuration
+LOG_LEVEL = os.getenv("API_LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("API_LOG_FORMAT", "json").lower()
+# Fraction of DEBUG request traces that are actually emitted
+LOG_SAMPLE_RATE = float(os.getenv("API_LOG_SAMPLE_RATE", "1.0"))
+REDACTED_HEADERS = frozenset(
+    h.strip().lower() for h in os.getenv(
+        "API_LOG_REDACT_HEADERS", "Authorization,Accesstoken,referenceId,Cookie,Set-Cookie,X-API-Key"
+    ).split(",") if h.strip()
+)
+
+# Per-request tracing goes to its own logger so it can be enabled independently
+request_logger = logging.getLogger("mcp_tools_api.requests")
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def redact_headers(headers: Optional[Dict[str, Any]], redacted: Iterable[str] = REDACTED_HEADERS) -> Dict[str, Any]:
+    """Return a copy of headers with credential values masked."""
+    if not headers:
+        return {}
+    redacted = redacted if isinstance(redacted, frozenset) else frozenset(redacted)
+    return {k: ("***" if k.lower() in redacted else v) for k, v in headers.items()}
+
+
+def trace_enabled() -> bool:
+    """True if this request should be traced: DEBUG is on for the request logger and it is sampled in.
+
+    Call sites check this before building any trace payload, so tracing costs a
+    single level check when disabled.
+    """
+    if not request_logger.isEnabledFor(logging.DEBUG):
+        return False
+    return LOG_SAMPLE_RATE >= 1.0 or random.random() < LOG_SAMPLE_RATE
+
+
+class StructuredFormatter(logging.Formatter):
+    """Format records as single-line JSON, merging the `fields` passed via extra=."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": self.formatTime(record, "%Y-%m-%dT%H:%M:%S"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage()
+        }
+        fields = getattr(record, "fields", None)
+        if fields:
+            entry.update(fields)
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """Plain text formatter that appends `fields` as key=value pairs."""
+
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        fields = getattr(record, "fields", None)
+        if fields:
+            line += " " + " ".join(f"{k}={v}" for k, v in fields.items())
+        return line
+
+
+def configure_logging(level: str = LOG_LEVEL, fmt: str = LOG_FORMAT) -> None:
+    """Route all logging through a non-blocking queue handler that writes to stderr.
+
+    Log calls only enqueue the record; formatting and the blocking write happen
+    on a background listener thread. stdout is never used, so the stdio MCP
+    transport stays clean. Safe to call more than once.
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    stream_handler = logging.StreamHandler(sys.stderr)
+    stream_handler.setFormatter(StructuredFormatter() if fmt == "json" else TextFormatter())
+
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+
+    _listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging() -> None:
+    """Flush queued records and stop the background listener."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
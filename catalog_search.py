@@ -0,0 +1,144 @@
+import re
+import math
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+# Relative weight of a token match per catalog field
+FIELD_WEIGHTS = {
+    "name": 3.0,
+    "tags": 2.5,
+    "path": 2.0,
+    "parameters": 1.5,
+    "description": 1.0
+}
+# Score multiplier when a query term only matches as a token prefix
+PREFIX_WEIGHT = 0.5
+
+_CAMEL_RE = re.compile(r'([a-z0-9])([A-Z])|([A-Z]+)([A-Z][a-z])')
+_SPLIT_RE = re.compile(r'[^a-z0-9]+')
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase tokens, breaking camelCase, snake_case and path separators."""
+    if not text:
+        return []
+    text = _CAMEL_RE.sub(lambda m: f"{m.group(1) or m.group(3)} {m.group(2) or m.group(4)}", text)
+    return [token for token in _SPLIT_RE.split(text.lower()) if token]
+
+
+def parse_query(query: str) -> List[List[str]]:
+    """Parse a search query into OR-groups of AND-ed terms.
+
+    "account balance OR create" -> [["account", "balance"], ["create"]]
+    Terms are AND-ed by default; the keyword OR (or |) separates alternatives.
+    """
+    groups = []
+    current = []
+    for word in query.replace("|", " OR ").split():
+        if word.upper() == "OR":
+            if current:
+                groups.append(current)
+            current = []
+        elif word.upper() == "AND":
+            continue
+        else:
+            current.extend(tokenize(word))
+    if current:
+        groups.append(current)
+    return groups
+
+
+class CatalogSearchIndex:
+    """Token-level inverted index over an API catalog, built once at load time."""
+
+    def __init__(self, catalog: Dict[str, Dict[str, Any]]):
+        self.postings: Dict[str, Dict[str, float]] = defaultdict(dict)
+        self.by_method: Dict[str, set] = defaultdict(set)
+        self.summaries: Dict[str, Dict[str, Any]] = {}
+
+        for name, endpoint in catalog.items():
+            fields = {
+                "name": name,
+                "tags": " ".join(endpoint.get("tags") or []),
+                "path": endpoint.get("path", ""),
+                "parameters": " ".join(p["name"] for p in endpoint.get("parameters", [])),
+                "description": endpoint.get("description", "")
+            }
+            for field, text in fields.items():
+                weight = FIELD_WEIGHTS[field]
+                for token in tokenize(text):
+                    if self.postings[token].get(name, 0) < weight:
+                        self.postings[token][name] = weight
+
+            self.by_method[endpoint["method"].upper()].add(name)
+            self.summaries[name] = {
+                "name": name,
+                "method": endpoint["method"],
+                "path": endpoint["path"],
+                "description": endpoint["description"],
+                "tags": endpoint["tags"],
+                "deprecated": endpoint.get("deprecated", False),
+                "auth_required": endpoint.get("auth_required", True),
+                "parameter_count": len(endpoint["parameters"])
+            }
+
+        self.postings = dict(self.postings)
+        self.vocabulary = sorted(self.postings)
+        self.size = len(self.summaries)
+        # Pre-sorted default ordering used when there is no search query
+        self.default_order = sorted(self.summaries, key=lambda n: (self.summaries[n]["deprecated"], n))
+
+    def _term_scores(self, term: str) -> Dict[str, float]:
+        """Score endpoints for one term: exact token matches plus prefix matches."""
+        scores = {}
+        start = bisect_left(self.vocabulary, term)
+        for token in self.vocabulary[start:]:
+            if not token.startswith(term):
+                break
+            factor = 1.0 if token == term else PREFIX_WEIGHT
+            postings = self.postings[token]
+            idf = math.log(1 + self.size / len(postings))
+            for name, weight in postings.items():
+                score = weight * factor * idf
+                if score > scores.get(name, 0):
+                    scores[name] = score
+        return scores
+
+    def rank(self, text: str, limit: Optional[int] = None) -> List[Tuple[str, float]]:
+        """Rank endpoints for free text (e.g. a user question): term scores are summed, any term may match."""
+        scores: Dict[str, float] = defaultdict(float)
+        for term in set(tokenize(text)):
+            if len(term) < 2:
+                continue
+            for name, score in self._term_scores(term).items():
+                scores[name] += score
+        ranked = sorted(
+            scores.items(),
+            key=lambda item: (self.summaries[item[0]]["deprecated"], -item[1], item[0])
+        )
+        return ranked[:limit] if limit else ranked
+
+    def search(self, query: str) -> List[Tuple[str, float]]:
+        """Return (endpoint_name, score) pairs matching the query, best first."""
+        combined: Dict[str, float] = {}
+        for group in parse_query(query):
+            group_scores: Optional[Dict[str, float]] = None
+            for term in group:
+                term_scores = self._term_scores(term)
+                if group_scores is None:
+                    group_scores = term_scores
+                else:
+                    group_scores = {
+                        name: score + term_scores[name]
+                        for name, score in group_scores.items() if name in term_scores
+                    }
+                if not group_scores:
+                    break
+            for name, score in (group_scores or {}).items():
+                if score > combined.get(name, 0):
+                    combined[name] = score
+        return sorted(
+            combined.items(),
+            key=lambda item: (self.summaries[item[0]]["deprecated"], -item[1], item[0])
+        )
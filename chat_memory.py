@@ -0,0 +1,109 @@
+import os
+import json
+import uuid
+from dataclasses import dataclass
+from typing import Any, List, Optional, Sequence
+from response_cache import ResponseCache
+
+# Turns kept (and rendered) in full; older ones are compacted into the summary
+CHAT_HISTORY_MAX_TURNS = int(os.getenv("CHAT_HISTORY_MAX_TURNS", "10"))
+CHAT_SUMMARY_MAX_CHARS = int(os.getenv("CHAT_SUMMARY_MAX_CHARS", "2000"))
+# Conversation context handed to the agent with each question
+CHAT_WINDOW_TURNS = int(os.getenv("CHAT_WINDOW_TURNS", "3"))
+CHAT_WINDOW_MAX_CHARS = int(os.getenv("CHAT_WINDOW_MAX_CHARS", "3000"))
+# Characters of an answer kept per turn in the summary and in the agent's window
+CHAT_ANSWER_PREVIEW_CHARS = int(os.getenv("CHAT_ANSWER_PREVIEW_CHARS", "300"))
+# Full tool payloads live out of line, shared by all sessions and bounded by entries, bytes and age
+CHAT_PAYLOAD_TTL = float(os.getenv("CHAT_PAYLOAD_TTL", "3600"))
+CHAT_PAYLOAD_MAX_ENTRIES = int(os.getenv("CHAT_PAYLOAD_MAX_ENTRIES", "1000"))
+CHAT_PAYLOAD_MAX_BYTES = int(os.getenv("CHAT_PAYLOAD_MAX_BYTES", str(64 * 1024 * 1024)))
+
+PAYLOADS = ResponseCache(max_entries=CHAT_PAYLOAD_MAX_ENTRIES, max_bytes=CHAT_PAYLOAD_MAX_BYTES)
+
+
+def store_payload(steps: Sequence[Any]) -> Optional[str]:
+    """Store an agent run's tool calls out of line; returns the key to load them with, None if there were none.
+
+    steps are the run's intermediate_steps: (AgentAction, observation) pairs.
+    """
+    payload = [{"tool": action.tool, "input": action.tool_input, "output": observation} for action, observation in steps]
+    if not payload:
+        return None
+    key = uuid.uuid4().hex
+    PAYLOADS.put((key,), payload, CHAT_PAYLOAD_TTL, len(json.dumps(payload, default=str)))
+    return key
+
+
+def load_payload(key: str) -> Optional[List[Any]]:
+    """Tool calls stored by store_payload(); None once they have expired or been evicted."""
+    return PAYLOADS.get((key,))
+
+
+def clip(text: str, limit: int) -> str:
+    text = " ".join(str(text).split())
+    return text if len(text) <= limit else text[:limit - 3] + "..."
+
+
+@dataclass
+class Turn:
+    """One question and its answer; tool payloads are referenced by payload_key, not held."""
+    question: str
+    answer: str
+    payload_key: Optional[str] = None
+    note: Optional[str] = None
+    error: bool = False
+
+    def brief(self) -> str:
+        return f"User: {clip(self.question, CHAT_ANSWER_PREVIEW_CHARS)}\nAssistant: {clip(self.answer, CHAT_ANSWER_PREVIEW_CHARS)}"
+
+
+class ChatMemory:
+    """Bounded chat history for one session.
+
+    The last max_turns turns are kept in full; older turns are compacted
+    into one-line summaries, and the summary keeps only its most recent
+    summary_max_chars. window() gives the agent a bounded view of the
+    conversation, so per-turn cost stays flat however long the session runs.
+    """
+
+    def __init__(self, max_turns: int = CHAT_HISTORY_MAX_TURNS, summary_max_chars: int = CHAT_SUMMARY_MAX_CHARS):
+        self.max_turns = max(1, max_turns)
+        self.summary_max_chars = summary_max_chars
+        self.turns: List[Turn] = []
+        self.summary_lines: List[str] = []
+        self.compacted = 0
+
+    def add(
+        self,
+        question: str,
+        answer: str,
+        steps: Sequence[Any] = (),
+        note: Optional[str] = None,
+        error: bool = False
+    ) -> Turn:
+        turn = Turn(question, answer, store_payload(steps), note, error)
+        self.turns.append(turn)
+        while len(self.turns) > self.max_turns:
+            self._compact(self.turns.pop(0))
+        return turn
+
+    def _compact(self, turn: Turn) -> None:
+        outcome = "failed" if turn.error else clip(turn.answer, CHAT_ANSWER_PREVIEW_CHARS // 2)
+        self.summary_lines.append(f"- {clip(turn.question, CHAT_ANSWER_PREVIEW_CHARS // 2)} -> {outcome}")
+        self.compacted += 1
+        while self.summary_lines and sum(len(line) + 1 for line in self.summary_lines) > self.summary_max_chars:
+            self.summary_lines.pop(0)
+
+    @property
+    def summary(self) -> str:
+        return "\n".join(self.summary_lines)
+
+    def window(self, turns: int = CHAT_WINDOW_TURNS, max_chars: int = CHAT_WINDOW_MAX_CHARS) -> str:
+        """The conversation context for the next question: summary plus the last few turns, within max_chars."""
+        parts = [turn.brief() for turn in self.turns[-turns:] if not turn.error] if turns > 0 else []
+        if self.summary:
+            parts.insert(0, f"Earlier:\n{self.summary}")
+        # Drop the oldest parts first when over budget
+        while parts and sum(len(part) + 2 for part in parts) > max_chars:
+            parts.pop(0)
+        return "\n\n".join(parts)
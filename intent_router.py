@@ -0,0 +1,120 @@
+import re
+import inspect
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Pattern, Tuple
+from catalog_search import tokenize
+
+# Words that carry no intent; everything else in a question is matched against tool keywords
+STOPWORDS = frozenset("""
+a an the of for to in on at is are was be what whats s me my our show get give tell find
+fetch please can could you i we and or with using by from details detail api given enter input
+""".split())
+# Method line of generated endpoint tool docs (see render_tool_doc in mcp_tools_api)
+_GENERATED_RE = re.compile(r'^Generated from: (\w+) (\S+)', re.M)
+# Fallback value shape for parameters without an example: any token containing a digit
+DEFAULT_VALUE_PATTERN = r'(?<![\w-])(?=[\w-]*\d)[\w-]+(?![\w-])'
+ROUTABLE_TYPES = (str, int, Optional[str], Optional[int])
+
+
+def tool_endpoint(fn: Callable) -> Optional[Tuple[str, str]]:
+    """(method, path) of a generated endpoint tool, read from its doc; None for other tools."""
+    match = _GENERATED_RE.search(fn.__doc__ or "")
+    return (match.group(1).upper(), match.group(2)) if match else None
+
+
+def value_pattern(example: Any) -> str:
+    """Regex for values shaped like an example, e.g. "101000000101814" -> exactly 15 digits."""
+    text = str(example)
+    if not text or not re.fullmatch(r'[\w-]+', text):
+        return DEFAULT_VALUE_PATTERN
+    shape = ""
+    for run in re.finditer(r'\d+|[A-Za-z]+|[_-]', text):
+        part = run.group()
+        if part.isdigit():
+            shape += r'\d{%d}' % len(part)
+        elif part.isalpha():
+            shape += r'[A-Za-z]{%d}' % len(part)
+        else:
+            shape += re.escape(part)
+    return rf'(?<![\w-]){shape}(?![\w-])'
+
+
+@dataclass(frozen=True)
+class Route:
+    """A read-only tool that can be called straight from a question."""
+    tool_name: str
+    keywords: frozenset
+    params: Tuple[Tuple[str, Pattern, Callable[[str], Any]], ...]
+
+
+@dataclass(frozen=True)
+class RouteMatch:
+    tool_name: str
+    kwargs: Dict[str, Any]
+    score: int
+
+
+class IntentRouter:
+    """Keyword and value-pattern router that maps simple questions onto one tool call.
+
+    Only GET endpoint tools whose required parameters are all plain strings or
+    integers are routable. A question is routed when it names exactly one
+    value for each required parameter, shares at least min_matches keywords
+    with the tool's description and parameter names, and matches no other
+    candidate as well; anything else is left to the agent.
+    """
+
+    def __init__(self, tool_fns: List[Callable], examples: Dict[str, Dict[str, Any]], min_matches: int = 2):
+        self.min_matches = min_matches
+        self.routes: List[Route] = []
+        for fn in tool_fns:
+            route = self._build_route(fn, examples.get(fn.__name__) or {})
+            if route is not None:
+                self.routes.append(route)
+
+    @staticmethod
+    def _build_route(fn: Callable, example: Dict[str, Any]) -> Optional[Route]:
+        endpoint = tool_endpoint(fn)
+        if endpoint is None or endpoint[0] != "GET":
+            return None
+        required = [
+            p for p in inspect.signature(fn).parameters.values()
+            if p.default is inspect.Parameter.empty and p.name != "ctx"
+        ]
+        if not required or any(p.annotation not in ROUTABLE_TYPES for p in required):
+            return None
+        params = []
+        doc = (fn.__doc__ or "").strip()
+        keywords = set(tokenize(doc.splitlines()[0] if doc else ""))
+        for p in required:
+            keywords.update(tokenize(p.name))
+            convert = int if p.annotation in (int, Optional[int]) else str
+            pattern = value_pattern(example[p.name]) if p.name in example else DEFAULT_VALUE_PATTERN
+            params.append((p.name, re.compile(pattern), convert))
+        return Route(fn.__name__, frozenset(keywords - STOPWORDS), tuple(params))
+
+    def route(self, question: str) -> Optional[RouteMatch]:
+        """Return the tool call for a question, or None when it is not a clear single-tool request."""
+        words = set(tokenize(question)) - STOPWORDS
+        candidates = []
+        for route in self.routes:
+            score = len(route.keywords & words)
+            if score < self.min_matches:
+                continue
+            kwargs = {}
+            for name, pattern, convert in route.params:
+                values = set(pattern.findall(question))
+                if len(values) != 1:
+                    break
+                try:
+                    kwargs[name] = convert(values.pop())
+                except ValueError:
+                    break
+            else:
+                candidates.append(RouteMatch(route.tool_name, kwargs, score))
+        if not candidates:
+            return None
+        candidates.sort(key=lambda match: -match.score)
+        if len(candidates) > 1 and candidates[1].score == candidates[0].score:
+            return None
+        return candidates[0]
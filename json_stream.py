@@ -0,0 +1,261 @@
+import re
+import json
+import base64
+import codecs
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+# Structural characters outside strings, and the characters that matter inside one
+_STRUCTURAL_RE = re.compile(r'[\[\]{}",:]')
+_IN_STRING_RE = re.compile(r'["\\]')
+# While skipping an element, jump over complete strings (and, when nested, commas) in one
+# regex step and stop at the next character that matters; a lone quote is a string that
+# continues in the next chunk
+_SKIP_TOP_RE = re.compile(r'(?:[^"\[\]{},]|"(?:[^"\\]|\\.)*")*([\[\]{},"])', re.S)
+_SKIP_NESTED_RE = re.compile(r'(?:[^"\[\]{}]|"(?:[^"\\]|\\.)*")*([\[\]{}"])', re.S)
+
+
+@dataclass(frozen=True)
+class StreamOptions:
+    """How to stream and window a large JSON response.
+
+    records_path: JSON path of the record array to page through (e.g. "$.transactions",
+    "$" for a top-level array). Only that array honours `offset`; every other array
+    is cut to its first `max_records` items. Bodies up to threshold_bytes are read
+    whole and not windowed (0 windows every body).
+    """
+    max_records: int = 100
+    records_path: Optional[str] = None
+    offset: int = 0
+    threshold_bytes: int = 0
+
+
+class _Frame:
+    __slots__ = ("kind", "path", "index", "kept", "start", "skipping", "expect_key", "key")
+
+    def __init__(self, kind: str, path: str, start: int = 0):
+        self.kind = kind
+        self.path = path
+        self.index = 0
+        self.kept = 0
+        self.start = start
+        self.skipping = False
+        self.expect_key = kind == "{"
+        self.key: Optional[str] = None
+
+
+class JsonStreamTruncator:
+    """Incrementally scan a JSON document and keep only a window of each array.
+
+    Feed raw byte chunks with feed(); only the kept part of the document is
+    retained (compacted), so memory is bounded by the window rather than the
+    response size. result() parses the kept JSON and truncation() reports,
+    per array path, how many items existed and how many were returned.
+    """
+
+    def __init__(self, max_records: int, records_path: Optional[str] = None, offset: int = 0):
+        self.max_records = max(1, max_records)
+        self.records_path = records_path
+        self.offset = max(0, offset)
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._out: List[str] = []
+        self._stack: List[_Frame] = []
+        self._skipping = False
+        # Nesting depth inside the element being skipped
+        self._skip_depth = 0
+        self._in_string = False
+        self._escape = False
+        self._key_parts: Optional[List[str]] = None
+        self._pending_element = False
+        self._truncated: Dict[str, Dict[str, int]] = {}
+        self.bytes_received = 0
+
+    def _emit(self, text: str) -> None:
+        if not self._skipping and text:
+            self._out.append(text)
+
+    def _child_path(self) -> str:
+        if not self._stack:
+            return "$"
+        parent = self._stack[-1]
+        if parent.kind == "{":
+            return f"{parent.path}.{parent.key}"
+        return f"{parent.path}[]"
+
+    def _begin_element(self) -> None:
+        """Called when a value starts inside the current array."""
+        frame = self._stack[-1]
+        self._pending_element = False
+        start = frame.start
+        keep = start <= frame.index < start + self.max_records
+        frame.index += 1
+        if keep:
+            if frame.kept:
+                self._emit(",")
+            frame.kept += 1
+        else:
+            frame.skipping = True
+            self._skipping = True
+            self._skip_depth = 0
+
+    def _end_element(self) -> None:
+        frame = self._stack[-1]
+        if frame.skipping:
+            frame.skipping = False
+            self._skipping = False
+
+    def _gap(self, text: str) -> None:
+        """Handle text between structural characters (numbers, literals, whitespace)."""
+        stripped = text.strip()
+        if not stripped:
+            return
+        if self._pending_element:
+            self._begin_element()
+        self._emit(stripped)
+
+    def feed(self, chunk: bytes) -> None:
+        self.bytes_received += len(chunk)
+        self._scan(self._decoder.decode(chunk))
+
+    def _scan(self, text: str) -> None:
+        pos = 0
+        length = len(text)
+        while pos < length:
+            if self._in_string:
+                if self._escape:
+                    self._string_text(text[pos])
+                    self._escape = False
+                    pos += 1
+                    continue
+                match = _IN_STRING_RE.search(text, pos)
+                if match is None:
+                    self._string_text(text[pos:])
+                    return
+                self._string_text(text[pos:match.start()])
+                char = match.group()
+                pos = match.end()
+                if char == "\\":
+                    self._string_text(char)
+                    self._escape = True
+                else:
+                    self._end_string()
+                continue
+
+            if self._skipping:
+                pos = self._skip(text, pos)
+                continue
+
+            match = _STRUCTURAL_RE.search(text, pos)
+            if match is None:
+                self._gap(text[pos:])
+                return
+            self._gap(text[pos:match.start()])
+            self._structural(match.group())
+            pos = match.end()
+
+    def _skip(self, text: str, pos: int) -> int:
+        """Fast path over a dropped element: track nesting only, nothing is kept."""
+        while True:
+            match = (_SKIP_NESTED_RE if self._skip_depth else _SKIP_TOP_RE).match(text, pos)
+            if match is None:
+                return len(text)
+            char = match.group(1)
+            pos = match.end()
+            if char == '"':
+                self._in_string = True
+                return pos
+            if char in "[{":
+                self._skip_depth += 1
+            elif self._skip_depth:
+                self._skip_depth -= 1
+            else:
+                # "," or the closing bracket of the array the skipped element belongs to
+                self._structural(char)
+                return pos
+
+    def _string_text(self, text: str) -> None:
+        if self._key_parts is not None:
+            self._key_parts.append(text)
+        self._emit(text)
+
+    def _end_string(self) -> None:
+        self._in_string = False
+        self._emit('"')
+        if self._key_parts is not None:
+            raw = "".join(self._key_parts)
+            self._key_parts = None
+            try:
+                key = json.loads(f'"{raw}"')
+            except ValueError:
+                key = raw
+            frame = self._stack[-1]
+            frame.key = key
+            frame.expect_key = False
+
+    def _structural(self, char: str) -> None:
+        if char in "[{\"" and self._pending_element:
+            self._begin_element()
+            if self._skipping:
+                # The dropped element starts with this character
+                self._in_string = char == '"'
+                self._skip_depth = int(char != '"')
+                return
+
+        if char == '"':
+            self._in_string = True
+            if self._stack and self._stack[-1].kind == "{" and self._stack[-1].expect_key:
+                self._key_parts = []
+            self._emit('"')
+        elif char in "[{":
+            path = self._child_path()
+            start = self.offset if char == "[" and path == self.records_path else 0
+            self._emit(char)
+            self._stack.append(_Frame(char, path, start))
+            self._pending_element = char == "["
+        elif char in "]}":
+            frame = self._stack[-1]
+            if frame.kind == "[":
+                self._end_element()
+                if frame.index > frame.kept:
+                    stats = self._truncated.setdefault(frame.path, {"total": 0, "returned": 0, "offset": frame.start})
+                    stats["total"] += frame.index
+                    stats["returned"] += frame.kept
+            self._pending_element = False
+            self._stack.pop()
+            self._emit(char)
+        elif char == ",":
+            frame = self._stack[-1]
+            if frame.kind == "[":
+                self._end_element()
+                self._pending_element = True
+            else:
+                frame.expect_key = True
+                self._emit(",")
+        elif char == ":":
+            self._emit(":")
+
+    def result(self) -> Any:
+        self._scan(self._decoder.decode(b"", final=True))
+        return json.loads("".join(self._out))
+
+    def truncation(self) -> Dict[str, Dict[str, int]]:
+        return self._truncated
+
+
+def encode_continuation(endpoint_name: str, offset: int) -> str:
+    """Opaque token for fetching the next window of records."""
+    raw = json.dumps({"e": endpoint_name, "o": offset}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_continuation(token: str, endpoint_name: str) -> int:
+    """Return the record offset encoded in a continuation token; ValueError if it is invalid."""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        offset = int(data["o"])
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError(f"Invalid continuation token: {e}") from None
+    if data.get("e") != endpoint_name:
+        raise ValueError("Continuation token belongs to a different endpoint")
+    return offset
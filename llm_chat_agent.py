@@ -1,7 +1,12 @@
 import os
 from dotenv import load_dotenv  # Load environment variables
 import asyncio
+import hashlib
+import inspect
 import json
+import logging
+import re
+import threading
 import streamlit as st
 from langchain.agents import create_react_agent, AgentExecutor
 from langchain.tools import Tool
@@ -14,18 +19,100 @@ from langchain_core.prompts import PromptTemplate
 from langchain.tools import BaseTool
 from langchain_core.output_parsers import JsonOutputParser
 from langchain.agents import AgentExecutor, create_react_agent
-from typing import List, Tuple, Type
+from langchain.agents.output_parsers import ReActSingleInputOutputParser
+from langchain_core.agents import AgentAction, AgentFinish
+from langchain_core.callbacks import AsyncCallbackHandler
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Type, Union
+from catalog_search import CatalogSearchIndex
+from intent_router import IntentRouter, RouteMatch, tool_endpoint
+from plan_cache import PlanCache, ToolPlan, bind_plan, build_plan, normalize_question
 
 load_dotenv()  # Load environment variables from .env file
+logger = logging.getLogger(__name__)
 
-from mcp_tools_api import register_bancs_tools, mcp
-#register_bancs_tools(mcp)  
-tool_fns = register_bancs_tools(mcp)
+# Where the tools run: "inprocess" imports mcp_tools_api; "stdio", "sse" or "streamable-http"
+# connect to a separate tool server process (see mcp_client.py for MCP_SERVER_URL / MCP_SERVER_COMMAND)
+MCP_TRANSPORT = os.getenv("MCP_TRANSPORT", "inprocess").lower()
+# Server tools not offered to the agent in client mode (monitoring tools only add prompt tokens)
+AGENT_EXCLUDED_TOOLS = {
+    name.strip() for name in os.getenv(
+        "AGENT_EXCLUDED_TOOLS", "get_api_cache_stats,get_api_metrics,get_server_health,get_server_readiness"
+    ).split(",") if name.strip()
+}
+# Example request bodies appended to tool docs; the file is re-read only when it changes
+EXAMPLES_PATH = os.getenv("AGENT_EXAMPLES_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "api_examples.json"))
+# Replay the tool plan of an earlier question with the same template instead of running the LLM
+PLAN_CACHE_ENABLED = os.getenv("AGENT_PLAN_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+PLAN_CACHE_TTL = float(os.getenv("AGENT_PLAN_CACHE_TTL", "3600"))
+PLAN_CACHE_MAX_ENTRIES = int(os.getenv("AGENT_PLAN_CACHE_MAX_ENTRIES", "256"))
+# Only plans made of read-only calls are replayed: GET endpoint tools plus these side-effect-free tools
+PLAN_CACHE_SAFE_TOOLS = {
+    name.strip() for name in os.getenv(
+        "AGENT_PLAN_CACHE_SAFE_TOOLS", "list_api_endpoints,get_api_endpoint_schema"
+    ).split(",") if name.strip()
+}
+# Call the tool directly for simple single-lookup questions (e.g. a balance for one account reference)
+ROUTER_ENABLED = os.getenv("AGENT_ROUTER_ENABLED", "true").lower() in ("1", "true", "yes")
+# Keywords a question must share with a tool's description and parameter names to be routed
+ROUTER_MIN_MATCHES = int(os.getenv("AGENT_ROUTER_MIN_MATCHES", "2"))
+# How routed results are answered: "json" returns the tool result, "llm" has the LLM phrase it in one call
+ROUTER_FORMAT = os.getenv("AGENT_ROUTER_FORMAT", "json").lower()
+# Tools described in the prompt per question: the top-k matches for the question plus the core
+# discovery tools (0 describes every tool, as before)
+PROMPT_TOP_K = int(os.getenv("AGENT_PROMPT_TOP_K", "8"))
+CORE_TOOLS = {
+    name.strip() for name in os.getenv(
+        "AGENT_CORE_TOOLS", "list_api_endpoints,get_api_endpoint_schema,invoke_api_endpoint,invoke_api_endpoints_batch"
+    ).split(",") if name.strip()
+}
+
+# One long-lived event loop shared by every agent run and tool call, so the pooled
+# HTTP client in mcp_tools_api (or the MCP client session) is created once and reused
+agent_loop = asyncio.new_event_loop()
+threading.Thread(target=agent_loop.run_forever, name="agent-loop", daemon=True).start()
+
+def run_on_agent_loop(coro: Awaitable[Any]) -> Any:
+    """Run a coroutine on the shared agent loop from synchronous code and wait for its result."""
+    return asyncio.run_coroutine_threadsafe(coro, agent_loop).result()
+
+if MCP_TRANSPORT == "inprocess":
+    from mcp_tools_api import register_bancs_tools, mcp
+    #register_bancs_tools(mcp)  
+    # The in-process catalog is fixed for the life of the process, so tools are registered once
+    inprocess_tool_fns = register_bancs_tools(mcp)
+
+    async def load_tool_fns() -> List[Callable]:
+        return list(inprocess_tool_fns)
+else:
+    from mcp_client import McpToolClient
+    # One session to the tool server, shared by all concurrent tool calls
+    mcp_client = McpToolClient(MCP_TRANSPORT)
+
+    async def load_tool_fns() -> List[Callable]:
+        return [fn for fn in await mcp_client.tool_functions() if fn.__name__ not in AGENT_EXCLUDED_TOOLS]
+
+def load_examples() -> Dict[str, Any]:
+    """Read the example request bodies (EXAMPLES_PATH); an empty set if the file is missing."""
+    try:
+        with open(EXAMPLES_PATH, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        logger.warning("Examples file %s not found; tools are described without examples", EXAMPLES_PATH)
+        return {}
+
+def examples_stamp() -> Tuple[int, int]:
+    """Modification time and size of the examples file, to notice when it changes."""
+    try:
+        stat = os.stat(EXAMPLES_PATH)
+    except OSError:
+        return (0, 0)
+    return (stat.st_mtime_ns, stat.st_size)
 
-with open("C:/Users/AnithaS/Learning/ice_breaker_test/TestBancsAPI/api_examples.json") as f:
-    example_bodies = json.load(f)
 # Step 1: Load example JSON schema for request bodies
-def attach_examples_to_tool_doc(tool_fn, tool_name):
+def attach_examples_to_tool_doc(tool_fn, tool_name, example_bodies):
+    # Start from the original doc so a rebuild after the examples change does not append twice
+    base_doc = tool_fn.__dict__.setdefault("base_doc", tool_fn.__doc__)
+    tool_fn.__doc__ = base_doc
     example = example_bodies.get(tool_name, {}).get("request_body")
     if example:
         example_str = json.dumps(example, indent=2)
@@ -33,50 +120,176 @@ def attach_examples_to_tool_doc(tool_fn, tool_name):
             tool_fn.__doc__ += f"\n\nExample request_body:\n{example_str}"
         else:
             tool_fn.__doc__ = f"Example request_body:\n{example_str}"
-# Step 3: Inject examples into tool docstrings
-for fn in tool_fns:
-    attach_examples_to_tool_doc(fn, fn.__name__)
-# Register tools into FastMCP server
-
-# Get tools as a list (not a dict)
-mcp_tools = asyncio.run(mcp.list_tools())
-
-# Convert to LangChain tools using Tool.from_function
-langchain_tools = [
-    Tool.from_function(
-        func=fn,
+
+def parse_tool_input(
+    fn: Callable,
+    tool_input: Union[str, Dict[str, Any]],
+    signature: Optional[inspect.Signature] = None
+) -> Dict[str, Any]:
+    """Turn a ReAct Action Input (JSON object, or a bare value for single-input tools) into kwargs."""
+    params = (signature or inspect.signature(fn)).parameters
+    if isinstance(tool_input, dict):
+        kwargs = tool_input
+    else:
+        text = (tool_input or "").strip().strip("`").strip()
+        try:
+            value = json.loads(text) if text else {}
+        except ValueError:
+            value = text.strip("'\"")
+        if isinstance(value, dict):
+            kwargs = value
+        else:
+            required = [name for name, p in params.items() if p.default is inspect.Parameter.empty]
+            if len(required) != 1:
+                raise ValueError(f"Action Input must be a JSON object with: {', '.join(required)}")
+            kwargs = {required[0]: value}
+    # Older argument names still accepted by generated endpoint tools (see build_endpoint_tool)
+    aliases = getattr(fn, "param_aliases", {})
+    kwargs = {aliases.get(name, name): value for name, value in kwargs.items()}
+    unknown = [name for name in kwargs if name not in params or name == "ctx"]
+    if unknown:
+        raise ValueError(f"Unknown inputs: {', '.join(unknown)}; expected some of: {', '.join(p for p in params if p != 'ctx')}")
+    return kwargs
+
+def make_langchain_tool(fn: Callable, signature: Optional[inspect.Signature] = None) -> Tool:
+    """Wrap an async MCP tool function as a LangChain tool with a native coroutine.
+
+    The coroutine is what AgentExecutor.ainvoke awaits; the sync func only
+    bridges to the shared agent loop for callers still using invoke().
+    """
+    async def acall(tool_input: str) -> str:
+        try:
+            kwargs = parse_tool_input(fn, tool_input, signature)
+        except ValueError as e:
+            return json.dumps({"error": True, "message": str(e)})
+        result = await fn(**kwargs)
+        # Compact JSON keeps the observation (and the next prompt) short
+        return json.dumps(result, separators=(",", ":"), default=str)
+
+    def call(tool_input: str) -> str:
+        return run_on_agent_loop(acall(tool_input))
+
+    return Tool.from_function(
+        func=call,
+        coroutine=acall,
         name=fn.__name__,
         description=fn.__doc__ or "No description."
     )
-    for fn in tool_fns
-]
-#create prompt from mcp_tools prompt
-def format_tool_functions_for_prompt(tool_fns):
-    tool_descriptions = []
-    tool_names = []
 
-    for fn in tool_fns:
-        name = fn.__name__
-        doc = fn.__doc__ or "No description."
-        tool_names.append(name)
+def catalog_fingerprint(fns: List[Callable], signatures: Dict[str, inspect.Signature]) -> str:
+    """Hash of tool names, docs and signatures; changes whenever the tool catalog does."""
+    digest = hashlib.sha256()
+    for fn in sorted(fns, key=lambda f: f.__name__):
+        digest.update(f"{fn.__name__}{signatures[fn.__name__]}{fn.__doc__}".encode())
+    return digest.hexdigest()
 
-        # Try to extract function signature (parameter names)
-        try:
-            import inspect
-            sig = inspect.signature(fn)
-            param_names = ", ".join(sig.parameters.keys())
-        except Exception:
-            param_names = "unknown"
+PLAN_CACHE = PlanCache(max_entries=PLAN_CACHE_MAX_ENTRIES, ttl=PLAN_CACHE_TTL)
 
-        tool_descriptions.append(f"{name}: {doc.strip()}\nInputs: {param_names}")
+def invalidate_plan_cache() -> None:
+    """Drop every cached plan, e.g. after the API catalog or tool set was reloaded."""
+    PLAN_CACHE.invalidate()
 
-    tools_str = "\n\n".join(tool_descriptions)
-    tool_names_str = ", ".join(tool_names)
+# Action / Action Input pairs; several may appear in one step
+ACTION_PATTERN = re.compile(
+    r"Action\s*\d*\s*:[ \t]*(.*?)\s*Action\s*\d*\s*Input\s*\d*\s*:[ \t]*(.*?)(?=\s*Action\s*\d*\s*:|\Z)",
+    re.DOTALL
+)
 
-    return tools_str, tool_names_str
-#tools_str, tool_names_str = format_tool_functions_for_prompt(tool_fns)
+class MultiActionReActParser(ReActSingleInputOutputParser):
+    """ReAct output parser that also accepts several Action / Action Input pairs in one step.
 
-from langchain_core.prompts import PromptTemplate
+    AgentExecutor runs all actions of a step concurrently under ainvoke, so
+    independent lookups (e.g. balances of several accounts) overlap.
+    """
+
+    def parse(self, text: str) -> Union[AgentAction, AgentFinish, List[AgentAction]]:
+        matches = list(ACTION_PATTERN.finditer(text))
+        if len(matches) < 2 or "Final Answer:" in text:
+            return super().parse(text)
+        actions = []
+        for i, match in enumerate(matches):
+            tool_input = match.group(2).strip().strip('"')
+            # The first action carries the thought; each action logs its own pair for the scratchpad
+            log = text[:match.end()] if i == 0 else match.group(0)
+            actions.append(AgentAction(match.group(1).strip(), tool_input, log))
+        return actions
+FINAL_ANSWER_MARKER = "Final Answer:"
+
+class AgentEventStream(AsyncCallbackHandler):
+    """Forwards an agent run's progress to emit() as it happens.
+
+    Events are dicts with a "type": "thought" and "answer" carry LLM text as
+    it streams (text after "Final Answer:" is answer, the rest is reasoning),
+    "action" a tool call and "observation" its result. emit() is called on
+    the agent loop and must not block.
+    """
+
+    def __init__(self, emit: Callable[[Dict[str, Any]], None]):
+        self.emit = emit
+        self._buffer = ""
+        self._sent = 0
+        self._answering = False
+
+    def _start(self) -> None:
+        self._buffer = ""
+        self._sent = 0
+        self._answering = False
+
+    async def on_llm_start(self, serialized: Dict[str, Any], prompts: List[str], **kwargs: Any) -> None:
+        self._start()
+
+    async def on_chat_model_start(self, serialized: Dict[str, Any], messages: List[Any], **kwargs: Any) -> None:
+        self._start()
+
+    async def on_llm_new_token(self, token: str, **kwargs: Any) -> None:
+        if self._answering:
+            if token:
+                self.emit({"type": "answer", "text": token})
+            return
+        self._buffer += token
+        marker = self._buffer.find(FINAL_ANSWER_MARKER, max(0, self._sent - len(FINAL_ANSWER_MARKER)))
+        if marker == -1:
+            # Hold back a tail that could be the start of the marker
+            safe = len(self._buffer) - len(FINAL_ANSWER_MARKER) + 1
+            if safe > self._sent:
+                self.emit({"type": "thought", "text": self._buffer[self._sent:safe]})
+                self._sent = safe
+            return
+        if marker > self._sent:
+            self.emit({"type": "thought", "text": self._buffer[self._sent:marker]})
+        self._answering = True
+        rest = self._buffer[marker + len(FINAL_ANSWER_MARKER):].lstrip()
+        self._sent = len(self._buffer)
+        if rest:
+            self.emit({"type": "answer", "text": rest})
+
+    async def on_llm_end(self, response: Any, **kwargs: Any) -> None:
+        if not self._answering and len(self._buffer) > self._sent:
+            self.emit({"type": "thought", "text": self._buffer[self._sent:]})
+        self._sent = len(self._buffer)
+
+    async def on_agent_action(self, action: AgentAction, **kwargs: Any) -> None:
+        self.emit({"type": "action", "tool": action.tool, "input": action.tool_input})
+
+    async def on_tool_end(self, output: Any, **kwargs: Any) -> None:
+        self.emit({"type": "observation", "text": str(output)})
+
+#create prompt from mcp_tools prompt
+def format_tool_for_prompt(fn, signature=None):
+    name = fn.__name__
+    doc = fn.__doc__ or "No description."
+    # Try to extract function signature (parameter names)
+    try:
+        sig = signature or inspect.signature(fn)
+        param_names = ", ".join(sig.parameters.keys())
+    except Exception:
+        param_names = "unknown"
+    return f"{name}: {doc.strip()}\nInputs: {param_names}"
+
+def format_tool_functions_for_prompt(tool_fns):
+    tools_str = "\n\n".join(format_tool_for_prompt(fn) for fn in tool_fns)
+    tool_names_str = ", ".join(fn.__name__ for fn in tool_fns)
+    return tools_str, tool_names_str
 
 prompt_template = """
 Answer the following question as best you can. You have access to the following tools:
@@ -88,27 +301,32 @@ Use the following format:
 Question: the input question you must answer
 Thought: you should always think about what to do
 Action: the action to take, should be one of [{tool_names}]
-Action Input: the input to the action
+Action Input: the input to the action, as a JSON object of parameters
 Observation: the result of the action
-... (this Thought/Action/Observation can repeat)
+... (this Thought/Action/Observation can repeat; independent actions may be listed
+together as several Action/Action Input pairs before the Observation, and run in parallel)
 Thought: I now know the final answer
 Final Answer: the final answer to the original input question
 
 Begin!
-
+{chat_history}
 Question: {input}
 {agent_scratchpad}
 """
 
-# Format tool prompt
-tools_str, tool_names_str = format_tool_functions_for_prompt(tool_fns)
-print("Tools for prompt:", tools_str)
-print("Tool names for prompt:", tool_names_str)
-# Create LangChain PromptTemplate with filled-in tool metadata
-prompt = PromptTemplate.from_template(prompt_template).partial(
-    tools=tools_str,
-    tool_names=tool_names_str
-)
+def tool_catalog(fns: List[Callable], signatures: Dict[str, inspect.Signature]) -> Dict[str, Dict[str, Any]]:
+    """Catalog-shaped view of the tool functions, so they can be ranked by CatalogSearchIndex."""
+    catalog = {}
+    for fn in fns:
+        method, path = tool_endpoint(fn) or ("", "")
+        catalog[fn.__name__] = {
+            "method": method,
+            "path": path,
+            "description": fn.__doc__ or "",
+            "tags": [],
+            "parameters": [{"name": name} for name in signatures[fn.__name__].parameters if name != "ctx"]
+        }
+    return catalog
 
 
 #prompt = hub.pull("hwchase17/react")
@@ -116,6 +334,285 @@ prompt = PromptTemplate.from_template(prompt_template).partial(
 
 # Set up LLM (ChatOllama running locally or use OpenAI)
 llm = ChatOllama(model="llama3", temperature=0, max_tokens=1000)
-# Create agent
-agent = create_react_agent(llm=llm, tools=langchain_tools,prompt=prompt)
-agent_executor = AgentExecutor(agent=agent, tools=langchain_tools, verbose=True)
\ No newline at end of file
+
+class ToolArtifacts:
+    """Everything derived from the tool set and the examples, built once and shared by all runs.
+
+    Tool docs with examples, signatures, rendered prompt entries, the tool
+    search index, the intent router and the agent executor are computed
+    here, so answering a question only looks them up.
+    """
+
+    def __init__(self, tool_fns: List[Callable], example_bodies: Dict[str, Any], stamp: Tuple[int, int]):
+        self.tool_fns = tool_fns
+        self.examples_stamp = stamp
+        # Step 3: Inject examples into tool docstrings
+        for fn in tool_fns:
+            attach_examples_to_tool_doc(fn, fn.__name__, example_bodies)
+        self.tools_by_name = {fn.__name__: fn for fn in tool_fns}
+        self.signatures = {fn.__name__: inspect.signature(fn) for fn in tool_fns}
+        self.prompt_entries = {fn.__name__: format_tool_for_prompt(fn, self.signatures[fn.__name__]) for fn in tool_fns}
+        self.tools_str = "\n\n".join(self.prompt_entries.values())
+        self.tool_names_str = ", ".join(self.tools_by_name)
+        logger.debug("Tools for prompt: %s", self.tools_str)
+        self.fingerprint = catalog_fingerprint(tool_fns, self.signatures)
+        self.tool_index = CatalogSearchIndex(tool_catalog(tool_fns, self.signatures))
+        # Value shapes for routed parameters come from the examples (e.g. 15-digit account references)
+        self.intent_router = IntentRouter(tool_fns, example_bodies, min_matches=ROUTER_MIN_MATCHES)
+        # Convert to LangChain tools
+        self.langchain_tools = [make_langchain_tool(fn, self.signatures[fn.__name__]) for fn in tool_fns]
+        # Create LangChain PromptTemplate with filled-in tool metadata
+        self.prompt = PromptTemplate.from_template(prompt_template).partial(
+            tools=self.tools_str,
+            tool_names=self.tool_names_str,
+            chat_history=""
+        )
+        # Create agent
+        agent = create_react_agent(
+            llm=llm, tools=self.langchain_tools, prompt=self.prompt, output_parser=MultiActionReActParser()
+        )
+        # Intermediate steps are what the plan cache records
+        self.agent_executor = AgentExecutor(
+            agent=agent, tools=self.langchain_tools, verbose=True, return_intermediate_steps=True
+        )
+
+    def select_tools(self, question: str) -> List[str]:
+        """Names of the tools to describe for a question: core tools plus the PROMPT_TOP_K best matches.
+
+        Keeps the prompt the same size however large the catalog grows; the
+        executor can still run any tool, and the core tools let the agent
+        discover endpoints that were not selected.
+        """
+        core = [name for name in self.tools_by_name if name in CORE_TOOLS]
+        if PROMPT_TOP_K <= 0 or len(self.tool_fns) <= len(core) + PROMPT_TOP_K:
+            return list(self.tools_by_name)
+        ranked = [name for name, _ in self.tool_index.rank(question) if name not in CORE_TOOLS]
+        # Pad with the catalog order so the agent always sees PROMPT_TOP_K tools
+        ranked += [name for name in self.tool_index.default_order if name not in CORE_TOOLS and name not in ranked]
+        chosen = set(core) | set(ranked[:PROMPT_TOP_K])
+        return [name for name in self.tools_by_name if name in chosen]
+
+    def prompt_inputs(self, question: str, history: str = "") -> Dict[str, Any]:
+        """Agent inputs for a question; tools / tool_names override the prompt's partials.
+
+        create_react_agent re-renders the partials from all tools, so they are
+        always passed here, joined from the pre-rendered entries. history is
+        the bounded conversation window (see chat_memory.ChatMemory.window).
+        """
+        inputs = {"input": question, "chat_history": f"\nConversation so far:\n{history}\n" if history else ""}
+        selected = self.select_tools(question)
+        if len(selected) == len(self.tool_fns):
+            inputs.update(tools=self.tools_str, tool_names=self.tool_names_str)
+        else:
+            inputs.update(
+                tools="\n\n".join(self.prompt_entries[name] for name in selected),
+                tool_names=", ".join(selected)
+            )
+        return inputs
+
+# Process-wide registry: built on first use, rebuilt only when the tools or the examples file change
+current_artifacts: Optional[ToolArtifacts] = None
+tools_changed = True
+
+def invalidate_tool_artifacts() -> None:
+    """Mark the tool set as changed; the next question reloads the tools and rebuilds the artifacts."""
+    global tools_changed
+    tools_changed = True
+    PLAN_CACHE.invalidate()
+
+async def get_tool_artifacts() -> ToolArtifacts:
+    """Current tool artifacts, rebuilt if the tool set or the examples file changed since the last build."""
+    global current_artifacts, tools_changed
+    stamp = examples_stamp()
+    artifacts = current_artifacts
+    if artifacts is not None and not tools_changed and artifacts.examples_stamp == stamp:
+        return artifacts
+    if tools_changed or artifacts is None:
+        tool_fns = await load_tool_fns()
+        tools_changed = False
+    else:
+        tool_fns = artifacts.tool_fns
+    # Built without awaiting, so runs on the agent loop never see a half-built registry
+    artifacts = ToolArtifacts(tool_fns, load_examples(), stamp)
+    # Plans name tools, so they are dropped whenever the catalog they were made for changes
+    PLAN_CACHE.set_catalog_version(artifacts.fingerprint)
+    current_artifacts = artifacts
+    logger.info("Built agent tool artifacts for %d tools", len(tool_fns))
+    return artifacts
+
+if MCP_TRANSPORT != "inprocess":
+    # Cached plans and prompts may name tools the server no longer has
+    mcp_client.add_tools_changed_listener(invalidate_tool_artifacts)
+
+# Build once at import so the first question does not pay for it
+run_on_agent_loop(get_tool_artifacts())
+
+def is_read_only_tool(name: str, fn: Callable) -> bool:
+    """Whether replaying a call to this tool is safe: a GET endpoint tool or one of PLAN_CACHE_SAFE_TOOLS."""
+    if name in PLAN_CACHE_SAFE_TOOLS:
+        return True
+    endpoint = tool_endpoint(fn)
+    return endpoint is not None and endpoint[0] == "GET"
+
+def remember_plan(
+    artifacts: ToolArtifacts,
+    template: str,
+    slots: Tuple[str, ...],
+    result: Dict[str, Any],
+    history: str = ""
+) -> None:
+    """Cache the tool plan of a finished agent run if it can be replayed for other slot values."""
+    if str(result.get("output", "")).startswith("Agent stopped"):
+        return
+    steps = []
+    for action, observation in result.get("intermediate_steps") or []:
+        fn = artifacts.tools_by_name.get(action.tool)
+        # Replaying a write (or a generic invoke that may be one) would repeat its side effects
+        if fn is None or not is_read_only_tool(action.tool, fn):
+            return
+        try:
+            kwargs = parse_tool_input(fn, action.tool_input, artifacts.signatures[action.tool])
+            observation = json.loads(observation)
+        except (TypeError, ValueError):
+            return
+        steps.append((action.tool, kwargs, observation))
+    # Values taken from the conversation would be wrong in another one
+    plan = build_plan(template, slots, steps, context=history)
+    if plan is not None:
+        PLAN_CACHE.put(plan)
+
+def format_plan_answer(steps: List[Tuple[str, Any]]) -> str:
+    """Render replayed tool results as the answer (no LLM involved)."""
+    if len(steps) == 1:
+        return json.dumps(steps[0][1], indent=2, default=str)
+    return "\n\n".join(f"{name}:\n{json.dumps(value, indent=2, default=str)}" for name, value in steps)
+
+async def run_tool_calls(
+    artifacts: ToolArtifacts,
+    calls: List[Tuple[str, Dict[str, Any]]],
+    log: str,
+    events: Optional[AgentEventStream] = None
+) -> Optional[Tuple[List[Tuple[str, Any]], List[Tuple[AgentAction, str]]]]:
+    """Call tools directly, returning (results, intermediate_steps); None if one failed, raised or is unknown."""
+    steps = []
+    intermediate_steps = []
+    for name, kwargs in calls:
+        fn = artifacts.tools_by_name.get(name)
+        if fn is None:
+            return None
+        action = AgentAction(name, json.dumps(kwargs), log)
+        if events is not None:
+            await events.on_agent_action(action)
+        try:
+            value = await fn(**kwargs)
+        except Exception as e:
+            # Transport, MCP or argument errors: the agent takes over rather than the user seeing them
+            logger.warning("Direct call to %s failed (%s: %s); falling back to the agent", name, type(e).__name__, e)
+            return None
+        if isinstance(value, dict) and value.get("error") is True:
+            # Let the agent explain the failure (e.g. an unknown account)
+            return None
+        steps.append((name, value))
+        observation = json.dumps(value, separators=(",", ":"), default=str)
+        if events is not None:
+            await events.on_tool_end(observation)
+        intermediate_steps.append((action, observation))
+    return steps, intermediate_steps
+
+async def replay_plan(
+    artifacts: ToolArtifacts,
+    plan: ToolPlan,
+    slots: Tuple[str, ...],
+    question: str,
+    events: Optional[AgentEventStream] = None
+) -> Optional[Dict[str, Any]]:
+    """Run a cached plan with this question's values; None if it no longer fits, so the agent runs instead."""
+    try:
+        calls = bind_plan(plan, slots)
+    except ValueError:
+        return None
+    ran = await run_tool_calls(artifacts, calls, "Replayed cached plan", events)
+    if ran is None:
+        PLAN_CACHE.discard(plan.template)
+        return None
+    steps, intermediate_steps = ran
+    output = format_plan_answer(steps)
+    if events is not None:
+        events.emit({"type": "answer", "text": output})
+    return {
+        "input": question,
+        "output": output,
+        "intermediate_steps": intermediate_steps,
+        "plan_cache": "hit"
+    }
+
+format_answer_prompt = PromptTemplate.from_template(
+    "Answer the question using only this result of the {tool} tool.\n\n"
+    "Question: {question}\nResult: {result}\n\nAnswer:"
+)
+
+async def answer_routed(
+    artifacts: ToolArtifacts,
+    match: RouteMatch,
+    question: str,
+    events: Optional[AgentEventStream] = None
+) -> Optional[Dict[str, Any]]:
+    """Answer a routed question with one direct tool call; None to fall back to the agent."""
+    ran = await run_tool_calls(artifacts, [(match.tool_name, match.kwargs)], "Routed by intent", events)
+    if ran is None:
+        return None
+    steps, intermediate_steps = ran
+    if ROUTER_FORMAT == "llm":
+        # Stream the model's reply; callbacks alone see no tokens on a non-streaming ainvoke
+        parts = []
+        async for chunk in llm.astream(format_answer_prompt.format(
+            tool=match.tool_name, question=question, result=intermediate_steps[0][1]
+        )):
+            if not chunk.content:
+                continue
+            parts.append(chunk.content)
+            if events is not None:
+                events.emit({"type": "answer", "text": chunk.content})
+        output = "".join(parts)
+    else:
+        output = format_plan_answer(steps)
+        if events is not None:
+            events.emit({"type": "answer", "text": output})
+    return {"input": question, "output": output, "intermediate_steps": intermediate_steps, "routed": match.tool_name}
+
+async def arun_agent(
+    question: str,
+    emit: Optional[Callable[[Dict[str, Any]], None]] = None,
+    history: str = ""
+) -> Dict[str, Any]:
+    """Answer a question on the async path: LLM and tool calls are awaited, never blocking a thread.
+
+    Simple single-lookup questions are routed straight to their tool, and
+    questions that only differ in their values (account references, dates,
+    amounts) reuse the tool plan of an earlier run; both skip the ReAct loop.
+    With emit, progress is streamed as it happens (see AgentEventStream);
+    history is a bounded summary of the conversation so far.
+    """
+    artifacts = await get_tool_artifacts()
+    events = AgentEventStream(emit) if emit is not None else None
+    config = {"callbacks": [events] if events is not None else []}
+    match = artifacts.intent_router.route(question) if ROUTER_ENABLED else None
+    if match is not None:
+        result = await answer_routed(artifacts, match, question, events)
+        if result is not None:
+            return result
+    if not PLAN_CACHE_ENABLED:
+        return await artifacts.agent_executor.ainvoke(artifacts.prompt_inputs(question, history), config=config)
+    template, slots = normalize_question(question)
+    plan = PLAN_CACHE.get(template)
+    if plan is not None:
+        result = await replay_plan(artifacts, plan, slots, question, events)
+        if result is not None:
+            return result
+    result = await artifacts.agent_executor.ainvoke(artifacts.prompt_inputs(question, history), config=config)
+    remember_plan(artifacts, template, slots, result, history)
+    return result
+
+def run_agent(question: str) -> Dict[str, Any]:
+    """Synchronous entry point (e.g. Streamlit): runs arun_agent on the shared agent loop."""
+    return run_on_agent_loop(arun_agent(question))
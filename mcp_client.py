@@ -0,0 +1,208 @@
+import os
+import sys
+import json
+import time
+import shlex
+import asyncio
+import inspect
+import logging
+from contextlib import AsyncExitStack
+from typing import Any, Callable, Dict, List, Optional
+from mcp import ClientSession, StdioServerParameters, types
+from mcp.client.stdio import stdio_client
+from mcp.client.sse import sse_client
+try:
+    from mcp.client.streamable_http import streamable_http_client
+except ImportError:
+    # Older mcp releases only ship the original name
+    from mcp.client.streamable_http import streamablehttp_client as streamable_http_client
+logger = logging.getLogger(__name__)
+
+# Tool server connection: "stdio" spawns MCP_SERVER_COMMAND, "sse" / "streamable-http" connect to MCP_SERVER_URL
+MCP_SERVER_URL = os.getenv("MCP_SERVER_URL", "http://127.0.0.1:8000/mcp")
+# Default is this interpreter running the tool server that sits next to this file, whatever the working directory
+MCP_SERVER_COMMAND: List[str] = (
+    shlex.split(os.environ["MCP_SERVER_COMMAND"], posix=os.name != "nt")
+    if os.getenv("MCP_SERVER_COMMAND")
+    else [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "mcp_tools_api.py")]
+)
+# Seconds a list_tools result is reused; the server's tools/list_changed notification also refreshes it
+MCP_TOOLS_CACHE_TTL = float(os.getenv("MCP_TOOLS_CACHE_TTL", "300"))
+MCP_CONNECT_TIMEOUT = float(os.getenv("MCP_CONNECT_TIMEOUT", "30"))
+
+TRANSPORTS = ("stdio", "sse", "streamable-http")
+
+# Python annotations for JSON schema types, used to give remote tools real signatures
+JSON_TYPES = {
+    "string": str,
+    "integer": int,
+    "number": float,
+    "boolean": bool,
+    "array": list,
+    "object": Dict[str, Any]
+}
+
+
+class McpToolClient:
+    """Long-lived MCP client session to a tool server over stdio, SSE or streamable HTTP.
+
+    One session is opened lazily and kept for the life of the client;
+    concurrent call_tool() calls are multiplexed over it by request ID.
+    The session is reopened on the next call if the connection drops.
+    list_tools() results are cached for MCP_TOOLS_CACHE_TTL seconds.
+    """
+
+    def __init__(self, transport: str, url: str = MCP_SERVER_URL, command: List[str] = MCP_SERVER_COMMAND):
+        if transport not in TRANSPORTS:
+            raise ValueError(f"Unknown MCP transport {transport!r}, expected one of {TRANSPORTS}")
+        self.transport = transport
+        self.url = url
+        self.command = command
+        self._session: Optional[ClientSession] = None
+        self._runner: Optional["asyncio.Task[None]"] = None
+        self._closing: Optional[asyncio.Event] = None
+        self._connect_lock = asyncio.Lock()
+        self._tools: Optional[List[types.Tool]] = None
+        self._tools_fetched = 0.0
+        self._tools_changed_listeners: List[Callable[[], None]] = []
+
+    def _transport_context(self):
+        if self.transport == "stdio":
+            command, *args = self.command
+            return stdio_client(StdioServerParameters(command=command, args=args, env=dict(os.environ)))
+        if self.transport == "sse":
+            return sse_client(self.url)
+        return streamable_http_client(self.url)
+
+    async def _run(self, ready: "asyncio.Future[ClientSession]") -> None:
+        """Own the transport and session; anyio requires they are entered and exited in one task."""
+        try:
+            async with AsyncExitStack() as stack:
+                streams = await stack.enter_async_context(self._transport_context())
+                session = await stack.enter_async_context(
+                    ClientSession(streams[0], streams[1], message_handler=self._on_message)
+                )
+                await session.initialize()
+                if ready.done():
+                    # The caller gave up waiting (connect timeout); nobody would use this session
+                    return
+                ready.set_result(session)
+                await self._closing.wait()
+        except BaseException as e:
+            if not ready.done():
+                ready.set_exception(e)
+            elif not isinstance(e, asyncio.CancelledError):
+                logger.warning("MCP session to %s closed: %s", self.url if self.transport != "stdio" else " ".join(self.command), e)
+        finally:
+            self._session = None
+
+    async def _get_session(self) -> ClientSession:
+        if self._session is not None and self._runner is not None and not self._runner.done():
+            return self._session
+        async with self._connect_lock:
+            if self._session is not None and self._runner is not None and not self._runner.done():
+                return self._session
+            ready = asyncio.get_running_loop().create_future()
+            self._closing = asyncio.Event()
+            self._runner = asyncio.ensure_future(self._run(ready))
+            try:
+                self._session = await asyncio.wait_for(ready, MCP_CONNECT_TIMEOUT)
+            except BaseException:
+                # Timed out or cancelled: stop the connection attempt instead of leaving it running
+                runner, self._runner = self._runner, None
+                runner.cancel()
+                await asyncio.gather(runner, return_exceptions=True)
+                raise
+            self._tools = None
+            return self._session
+
+    async def _on_message(self, message: Any) -> None:
+        if isinstance(message, types.ServerNotification) and isinstance(message.root, types.ToolListChangedNotification):
+            self._tools = None
+            for listener in self._tools_changed_listeners:
+                listener()
+
+    def add_tools_changed_listener(self, listener: Callable[[], None]) -> None:
+        """Call listener whenever the server reports that its tool list changed."""
+        self._tools_changed_listeners.append(listener)
+
+    async def list_tools(self, refresh: bool = False) -> List[types.Tool]:
+        """All tools of the server, following pagination; cached between calls."""
+        if not refresh and self._tools is not None and time.monotonic() - self._tools_fetched < MCP_TOOLS_CACHE_TTL:
+            return self._tools
+        session = await self._get_session()
+        tools: List[types.Tool] = []
+        cursor = None
+        while True:
+            result = await session.list_tools(cursor)
+            tools.extend(result.tools)
+            cursor = result.nextCursor
+            if not cursor:
+                break
+        self._tools = tools
+        self._tools_fetched = time.monotonic()
+        return tools
+
+    async def call_tool(self, name: str, arguments: Optional[Dict[str, Any]] = None) -> Any:
+        """Call a tool and return its result as JSON data (errors as {"error": True, ...})."""
+        session = await self._get_session()
+        return tool_result(await session.call_tool(name, arguments or {}))
+
+    async def tool_functions(self) -> List[Callable]:
+        """Async functions for every server tool, with names, docs and signatures from the schemas."""
+        return [build_tool_function(self, tool) for tool in await self.list_tools()]
+
+    async def close(self) -> None:
+        if self._closing is not None:
+            self._closing.set()
+        if self._runner is not None:
+            await asyncio.gather(self._runner, return_exceptions=True)
+        self._runner = None
+
+
+def tool_result(result: types.CallToolResult) -> Any:
+    """Decode a CallToolResult into the value the tool returned."""
+    if result.structuredContent is not None and not result.isError:
+        data = result.structuredContent
+        # FastMCP wraps non-object return values as {"result": ...}
+        return data["result"] if set(data) == {"result"} else data
+    text = "".join(block.text for block in result.content if isinstance(block, types.TextContent))
+    if result.isError:
+        return {"error": True, "message": text}
+    try:
+        return json.loads(text)
+    except ValueError:
+        return text
+
+
+def _annotation(schema: Dict[str, Any]) -> Any:
+    options = schema.get("anyOf") or [schema]
+    types_ = [JSON_TYPES.get(option.get("type"), Any) for option in options if option.get("type") != "null"]
+    annotation = types_[0] if len(types_) == 1 else Any
+    return Optional[annotation] if len(types_) < len(options) else annotation
+
+
+def build_tool_function(client: McpToolClient, tool: types.Tool) -> Callable:
+    """Build an async function that calls a remote tool, shaped like the in-process tool functions."""
+    schema = tool.inputSchema or {}
+    properties = schema.get("properties", {})
+    required = set(schema.get("required", []))
+    signature_params = []
+    # Required parameters first so the signature stays valid
+    for name in sorted(properties, key=lambda n: n not in required):
+        if not name.isidentifier():
+            continue
+        prop = properties[name]
+        default = inspect.Parameter.empty if name in required else prop.get("default")
+        signature_params.append(inspect.Parameter(
+            name, inspect.Parameter.KEYWORD_ONLY, annotation=_annotation(prop), default=default
+        ))
+
+    async def remote_tool(**kwargs) -> Any:
+        return await client.call_tool(tool.name, {k: v for k, v in kwargs.items() if v is not None})
+
+    remote_tool.__name__ = tool.name
+    remote_tool.__qualname__ = tool.name
+    remote_tool.__doc__ = tool.description or ""
+    remote_tool.__signature__ = inspect.Signature(signature_params)
+    return remote_tool
@@ -2,19 +2,161 @@ import os
 import httpx
 import logging
 #from fastmcp import FastMCP
-from mcp.server.fastmcp import FastMCP
-from typing import Any, Dict, Optional
+from mcp.server.fastmcp import Context, FastMCP
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, FrozenSet, List, Optional, Pattern, Tuple
 from collections import defaultdict
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from urllib.parse import quote, urlsplit
 import asyncio
+import time
+import weakref
+import inspect
+import keyword
 import json
 import re
+from starlette.requests import Request
+from starlette.responses import JSONResponse, PlainTextResponse
+from spec_loader import build_indexes, load_catalog
+from catalog_search import CatalogSearchIndex
+from response_cache import ResponseCache, make_cache_key
+from json_stream import JsonStreamTruncator, StreamOptions, decode_continuation, encode_continuation
+from pagination import PaginationStrategy, fetch_all_pages
+from projection import FieldTree, compile_fields, copy_json, parse_fields, project, relative_to, slim
+from metrics import METRICS, instrument_tool, start_metrics_server
+from api_logging import configure_logging, redact_headers, request_logger, trace_enabled
+from resilience import (
+    AdaptiveLimiter, CircuitBreaker, LimiterRejected, RetryBudget, RetryPolicy, SingleFlight,
+    parse_retry_after
+)
+try:
+    import h2  # noqa: F401  (enables httpx HTTP/2 support)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
 logger = logging.getLogger(__name__)
-mcp = FastMCP("Bancs API Json")
+
+# Serve mode: "stdio" (one server process per client) or "streamable-http" / "sse" for a shared HTTP server
+MCP_SERVER_TRANSPORT = os.getenv("MCP_SERVER_TRANSPORT", "stdio").lower()
+MCP_HOST = os.getenv("MCP_HOST", "127.0.0.1")
+MCP_PORT = int(os.getenv("MCP_PORT", "8000"))
+MCP_WORKERS = int(os.getenv("MCP_WORKERS", "1"))
+# Sessions live in worker memory, so several workers need stateless streamable HTTP
+MCP_STATELESS_HTTP = os.getenv("MCP_STATELESS_HTTP", "true" if MCP_WORKERS > 1 else "false").lower() in ("1", "true", "yes")
+# Seconds to let in-flight requests finish on shutdown
+MCP_DRAIN_TIMEOUT = float(os.getenv("MCP_DRAIN_TIMEOUT", "30"))
+
+# Worker lifecycle, reported by the health and readiness checks
+WORKER_STATE = {"started": time.time(), "ready": False, "draining": False, "app_managed": False}
+
+@asynccontextmanager
+async def worker_lifespan():
+    """Per-process startup and shutdown: open the HTTP pool and metrics exporter, close them on exit."""
+    metrics_server = None
+    if METRICS_PORT and MCP_WORKERS > 1:
+        logger.warning("API_METRICS_PORT is ignored with %d workers; scrape /metrics on the server port", MCP_WORKERS)
+    elif METRICS_PORT:
+        metrics_server = await start_metrics_server(METRICS_HOST, METRICS_PORT)
+    get_http_client()
+    WORKER_STATE["ready"] = True
+    try:
+        yield
+    finally:
+        WORKER_STATE["ready"] = False
+        if metrics_server is not None:
+            metrics_server.close()
+        await close_http_client()
+
+@asynccontextmanager
+async def server_lifespan(server: FastMCP):
+    """FastMCP lifespan: owns the worker resources in stdio mode.
+
+    Over HTTP it runs once per session (per request when stateless), so
+    there the app lifespan built by create_app owns them instead.
+    """
+    if WORKER_STATE["app_managed"]:
+        yield {}
+        return
+    async with worker_lifespan():
+        yield {}
+
+mcp = FastMCP(
+    "Bancs API Json",
+    lifespan=server_lifespan,
+    host=MCP_HOST,
+    port=MCP_PORT,
+    stateless_http=MCP_STATELESS_HTTP
+)
 # API Configuration
 BASE_URL = os.getenv("API_BASE_URL", "https://demoapps.tcsbancs.com/Core")
 API_KEY = os.getenv("API_KEY")
 TIMEOUT = int(os.getenv("API_TIMEOUT", "30"))
-# API Catalog - Generated from OpenAPI spec
+# Connection pool configuration
+MAX_CONNECTIONS = int(os.getenv("API_MAX_CONNECTIONS", "100"))
+MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("API_MAX_KEEPALIVE_CONNECTIONS", "20"))
+KEEPALIVE_EXPIRY = float(os.getenv("API_KEEPALIVE_EXPIRY", "30"))
+HTTP2_ENABLED = os.getenv("API_HTTP2", "false").lower() in ("1", "true", "yes")
+# Response cache for idempotent GET requests (per-endpoint TTL via "cache_ttl" in the catalog)
+CACHE_ENABLED = os.getenv("API_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+CACHE_DEFAULT_TTL = float(os.getenv("API_CACHE_DEFAULT_TTL", "0"))
+CACHE_MAX_ENTRIES = int(os.getenv("API_CACHE_MAX_ENTRIES", "1024"))
+CACHE_MAX_BYTES = int(os.getenv("API_CACHE_MAX_BYTES", str(16 * 1024 * 1024)))
+CACHE_VARY_HEADERS = tuple(
+    h.strip().lower() for h in os.getenv(
+        "API_CACHE_VARY_HEADERS", "entity,languageCode,userId,Accesstoken,referenceId"
+    ).split(",") if h.strip()
+)
+# Share one backend call between concurrent identical GET requests
+COALESCE_ENABLED = os.getenv("API_COALESCE_ENABLED", "true").lower() in ("1", "true", "yes")
+# Adaptive per-host concurrency limiter (AIMD) with a bounded wait queue
+LIMITER_ENABLED = os.getenv("API_LIMITER_ENABLED", "true").lower() in ("1", "true", "yes")
+LIMITER_INITIAL = int(os.getenv("API_LIMITER_INITIAL", "20"))
+LIMITER_MIN = int(os.getenv("API_LIMITER_MIN", "1"))
+LIMITER_MAX = int(os.getenv("API_LIMITER_MAX", "200"))
+LIMITER_MAX_QUEUE = int(os.getenv("API_LIMITER_MAX_QUEUE", "100"))
+LIMITER_QUEUE_TIMEOUT = float(os.getenv("API_LIMITER_QUEUE_TIMEOUT", "10"))
+LIMITER_LATENCY_TARGET = float(os.getenv("API_LIMITER_LATENCY_TARGET", str(TIMEOUT / 6)))
+# Retries for transient failures of idempotent requests (per-endpoint override via "retry" in the catalog)
+RETRY_ENABLED = os.getenv("API_RETRY_ENABLED", "true").lower() in ("1", "true", "yes")
+RETRY_MAX_ATTEMPTS = int(os.getenv("API_RETRY_MAX_ATTEMPTS", "3"))
+RETRY_BASE_DELAY = float(os.getenv("API_RETRY_BASE_DELAY", "0.2"))
+RETRY_MAX_DELAY = float(os.getenv("API_RETRY_MAX_DELAY", "5"))
+RETRY_BUDGET_RATIO = float(os.getenv("API_RETRY_BUDGET_RATIO", "0.2"))
+RETRY_BUDGET_MIN_PER_SECOND = float(os.getenv("API_RETRY_BUDGET_MIN_PER_SECOND", "1"))
+# Circuit breakers per endpoint group, keyed by "tag" (first tag) or "path" (path template)
+BREAKER_ENABLED = os.getenv("API_BREAKER_ENABLED", "true").lower() in ("1", "true", "yes")
+BREAKER_SCOPE = os.getenv("API_BREAKER_SCOPE", "tag").lower()
+BREAKER_FAILURE_THRESHOLD = float(os.getenv("API_BREAKER_FAILURE_THRESHOLD", "0.5"))
+BREAKER_MIN_CALLS = int(os.getenv("API_BREAKER_MIN_CALLS", "10"))
+BREAKER_WINDOW = float(os.getenv("API_BREAKER_WINDOW", "30"))
+BREAKER_OPEN_DURATION = float(os.getenv("API_BREAKER_OPEN_DURATION", "30"))
+BREAKER_HALF_OPEN_PROBES = int(os.getenv("API_BREAKER_HALF_OPEN_PROBES", "1"))
+# Optional Prometheus text exporter (http://API_METRICS_HOST:API_METRICS_PORT/metrics)
+METRICS_PORT = int(os.getenv("API_METRICS_PORT", "0"))
+METRICS_HOST = os.getenv("API_METRICS_HOST", "127.0.0.1")
+# Streaming of large responses: JSON bodies over the threshold are parsed incrementally and
+# every array is cut to a window of records (per-endpoint defaults via "stream" in the catalog)
+STREAM_THRESHOLD_BYTES = int(os.getenv("API_STREAM_THRESHOLD_BYTES", str(1024 * 1024)))
+STREAM_MAX_RECORDS = int(os.getenv("API_STREAM_MAX_RECORDS", "100"))
+STREAM_PROGRESS_INTERVAL = float(os.getenv("API_STREAM_PROGRESS_INTERVAL", "0.25"))
+# fetch_all: caps on records and pages merged into one result (per-endpoint "pagination" in the catalog)
+PAGINATION_MAX_RECORDS = int(os.getenv("API_PAGINATION_MAX_RECORDS", "1000"))
+PAGINATION_MAX_PAGES = int(os.getenv("API_PAGINATION_MAX_PAGES", "50"))
+# Drop nulls and empty arrays/objects from results before they reach the caller
+SLIM_RESPONSES = os.getenv("API_SLIM_RESPONSES", "true").lower() in ("1", "true", "yes")
+# Batch invocation limits
+BATCH_MAX_CONCURRENCY = int(os.getenv("API_BATCH_MAX_CONCURRENCY", "10"))
+BATCH_MAX_ITEMS = int(os.getenv("API_BATCH_MAX_ITEMS", "500"))
+# Swagger 2.0 / OpenAPI 3 spec to generate the catalog from (JSON, or YAML with PyYAML)
+API_SPEC_PATH = os.getenv("API_SPEC_PATH")
+API_SPEC_CACHE_DIR = os.getenv("API_SPEC_CACHE_DIR", ".catalog_cache")
+# Endpoints exposed as typed MCP tools: "*" for all, or a comma-separated list of names.
+# Each typed tool builds a pydantic model at registration, which adds up to ~30s per start
+# (and per worker) for a 6000-operation spec, so with API_SPEC_PATH none are typed by
+# default and endpoints are reached through invoke_api_endpoint instead
+TYPED_TOOLS = os.getenv("API_TYPED_TOOLS", "" if API_SPEC_PATH else "*")
+# API Catalog - built-in fallback used when API_SPEC_PATH is not set
 API_CATALOG = {
  "create_acnt_actv_using_post": {
         "method": "POST",
@@ -31,31 +173,31 @@ API_CATALOG = {
                 "location": "body",
                 "required": True,
                 "description": "input"
-            }
-            
-        ]
-    },
-     "cbpetget_account_balance_using_get": {
-        "method": "GET",
-        "path": "/accountManagement/account/balanceDetails/{accountReference}",
-        "description": "Fetch Account Balance Details",
-        "tags": ["AccountManagement"],
-        "deprecated": False,
-        "auth_required": False,
-        "operation_id": "CBPETGetAccountBalanceUsingGET",
-        "parameters": [
-            
+            },
             {
-                "name": "accountReference",
+                "name": "entity",
                 "type": "string",
-                "location": "path",
-                "required": True,
-                "description": "Enter the Account Reference"
+                "location": "header",
+                "required": False,
+                "description": "entity"
+            },
+            {
+                "name": "languageCode",
+                "type": "integer",
+                "location": "header",
+                "required": False,
+                "description": "languageCode"
+            },
+            {
+                "name": "userId",
+                "type": "integer",
+                "location": "header",
+                "required": False,
+                "description": "userId"
             }
-            
         ]
-    } ,
-    "account_balance_using_get": {
+    },
+     "cbpetget_account_balance_using_get": {
         "method": "GET",
         "path": "/accountManagement/account/balanceDetails/{accountReference}",
         "description": "Fetch Account Balance Details",
@@ -63,6 +205,7 @@ API_CATALOG = {
         "deprecated": False,
         "auth_required": False,
         "operation_id": "CBPETGetAccountBalanceUsingGET",
+        "cache_ttl": 10,
         "parameters": [
             
             {
@@ -74,29 +217,193 @@ API_CATALOG = {
             }
             
         ]
-    }   
- }
+    }
+}
+
+# Load the catalog from the spec when configured (cached by spec hash), else use the built-in one
+if API_SPEC_PATH:
+    API_CATALOG, TAG_INDEX, OPERATION_ID_INDEX = load_catalog(API_SPEC_PATH, API_SPEC_CACHE_DIR)
+else:
+    # Build tag-based and operation ID indexes
+    TAG_INDEX, OPERATION_ID_INDEX = build_indexes(API_CATALOG)
+
+# Build full-text search index
+SEARCH_INDEX = CatalogSearchIndex(API_CATALOG)
+
+# Endpoint being executed in the current task, used to label backend metrics
+CURRENT_ENDPOINT: ContextVar[str] = ContextVar("current_endpoint", default="-")
+# Callback receiving (bytes_received, total_bytes) while a response body downloads
+CURRENT_PROGRESS: ContextVar[Optional[Callable[[int, Optional[int]], Awaitable[None]]]] = ContextVar(
+    "current_progress", default=None
+)
+
+# Shared response cache and in-flight request coalescing
+RESPONSE_CACHE = ResponseCache(max_entries=CACHE_MAX_ENTRIES, max_bytes=CACHE_MAX_BYTES)
+SINGLE_FLIGHT = SingleFlight()
+# Default retry policy and the global budget that caps retries across all calls
+DEFAULT_RETRY_POLICY = RetryPolicy(
+    max_attempts=RETRY_MAX_ATTEMPTS,
+    base_delay=RETRY_BASE_DELAY,
+    max_delay=RETRY_MAX_DELAY
+)
+RETRY_BUDGET = RetryBudget(ratio=RETRY_BUDGET_RATIO, min_per_second=RETRY_BUDGET_MIN_PER_SECOND)
+RETRYABLE_EXCEPTIONS = (httpx.ConnectError, httpx.ConnectTimeout)
+# Circuit breakers, one per endpoint group
+CIRCUIT_BREAKERS: Dict[str, CircuitBreaker] = {}
+
+def get_circuit_breaker(key: str) -> CircuitBreaker:
+    """Return the circuit breaker for an endpoint group, creating it on first use."""
+    breaker = CIRCUIT_BREAKERS.get(key)
+    if breaker is None:
+        breaker = CIRCUIT_BREAKERS[key] = CircuitBreaker(
+            key,
+            failure_threshold=BREAKER_FAILURE_THRESHOLD,
+            min_calls=BREAKER_MIN_CALLS,
+            window=BREAKER_WINDOW,
+            open_duration=BREAKER_OPEN_DURATION,
+            half_open_probes=BREAKER_HALF_OPEN_PROBES
+        )
+    return breaker
 
-# Build tag-based index
-TAG_INDEX = defaultdict(list)
-for endpoint_name, endpoint_info in API_CATALOG.items():
-    for tag in endpoint_info.get("tags", ["untagged"]):
-        TAG_INDEX[tag.lower()].append(endpoint_name)
+def breaker_key(endpoint: Dict[str, Any]) -> str:
+    """Endpoint group a catalog entry belongs to for circuit breaking."""
+    if BREAKER_SCOPE == "path":
+        return f"path:{endpoint['path']}"
+    tags = endpoint.get("tags") or ["untagged"]
+    return f"tag:{tags[0].lower()}"
 
-# Build operation ID index
-OPERATION_ID_INDEX = {}
-for endpoint_name, endpoint_info in API_CATALOG.items():
-    if "operation_id" in endpoint_info:
-        OPERATION_ID_INDEX[endpoint_info["operation_id"]] = endpoint_name
+# Concurrency limiters, one per backend host
+HOST_LIMITERS: Dict[str, AdaptiveLimiter] = {}
+
+def get_host_limiter(url: str) -> AdaptiveLimiter:
+    """Return the concurrency limiter for the URL's host, creating it on first use."""
+    host = urlsplit(url).netloc
+    limiter = HOST_LIMITERS.get(host)
+    if limiter is None:
+        limiter = HOST_LIMITERS[host] = AdaptiveLimiter(
+            initial_limit=LIMITER_INITIAL,
+            min_limit=LIMITER_MIN,
+            max_limit=LIMITER_MAX,
+            max_queue=LIMITER_MAX_QUEUE,
+            queue_timeout=LIMITER_QUEUE_TIMEOUT,
+            latency_target=LIMITER_LATENCY_TARGET
+        )
+    return limiter
+
+def http_pool_stats() -> Dict[str, Any]:
+    """Configuration and current connection counts of the HTTP pools (one per event loop)."""
+    stats = {
+        "max_connections": MAX_CONNECTIONS,
+        "max_keepalive_connections": MAX_KEEPALIVE_CONNECTIONS,
+        "keepalive_expiry": KEEPALIVE_EXPIRY,
+        "http2": HTTP2_ENABLED and HTTP2_AVAILABLE,
+        "open": len(open_http_clients())
+    }
+    # httpx does not expose the pool publicly; report connection counts when reachable
+    for client in open_http_clients():
+        pool = getattr(getattr(client, "_transport", None), "_pool", None)
+        connections = getattr(pool, "connections", None)
+        if connections is not None:
+            stats["connections"] = stats.get("connections", 0) + len(connections)
+            stats["idle_connections"] = stats.get("idle_connections", 0) + sum(1 for c in connections if c.is_idle())
+    return stats
+
+# Stats sampled whenever metrics are read
+METRICS.register_collector("response_cache", RESPONSE_CACHE.stats)
+METRICS.register_collector("coalescing", SINGLE_FLIGHT.stats)
+METRICS.register_collector("retry_budget", RETRY_BUDGET.stats)
+METRICS.register_collector("http_pool", http_pool_stats)
+METRICS.register_collector("limiters", lambda: {host: l.stats() for host, l in HOST_LIMITERS.items()})
+METRICS.register_collector("circuit_breakers", lambda: {key: b.stats() for key, b in CIRCUIT_BREAKERS.items()})
+
+# Pooled HTTP clients, one per event loop (an httpx client only works on the loop it was
+# created on), created lazily and reused for every backend call made on that loop
+_http_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Tuple[httpx.AsyncClient, AsyncIterator[None]]]" = weakref.WeakKeyDictionary()
+
+async def _close_with_loop(client: httpx.AsyncClient) -> AsyncIterator[None]:
+    """Async generator parked for a client's lifetime; the loop finalizes it at shutdown, closing the client."""
+    try:
+        yield
+    finally:
+        if not client.is_closed:
+            await client.aclose()
+
+async def _start_guard(guard: AsyncIterator[None]) -> None:
+    try:
+        await guard.__anext__()
+    except StopAsyncIteration:
+        # Closed by close_http_client() before it got to run
+        pass
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the running event loop's pooled HTTP client, creating it on first use.
+
+    Each loop gets its own client, so callers on different loops (the agent
+    loop, Streamlit threads, repeated asyncio.run) never share or close each
+    other's. A client is closed by close_http_client() on its loop, or when
+    its loop shuts down its async generators (asyncio.run does this).
+    """
+    loop = asyncio.get_running_loop()
+    entry = _http_clients.get(loop)
+    if entry is not None and not entry[0].is_closed:
+        return entry[0]
+    for stale in [l for l in _http_clients if l.is_closed()]:
+        # Closed without shutting down its async generators: the connections went with the loop
+        logger.warning("Dropping the HTTP client of a closed event loop")
+        del _http_clients[stale]
+    http2 = HTTP2_ENABLED and HTTP2_AVAILABLE
+    if HTTP2_ENABLED and not HTTP2_AVAILABLE:
+        logger.warning("API_HTTP2 is set but the 'h2' package is not installed; using HTTP/1.1")
+    client = httpx.AsyncClient(
+        timeout=TIMEOUT,
+        http2=http2,
+        limits=httpx.Limits(
+            max_connections=MAX_CONNECTIONS,
+            max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=KEEPALIVE_EXPIRY
+        )
+    )
+    guard = _close_with_loop(client)
+    # Its first step runs on this loop, which registers it for finalization at loop shutdown
+    loop.create_task(_start_guard(guard))
+    _http_clients[loop] = (client, guard)
+    METRICS.inc("http_clients_created_total")
+    return client
+
+def open_http_clients() -> List[httpx.AsyncClient]:
+    return [client for client, _ in list(_http_clients.values()) if not client.is_closed]
+
+async def close_http_client() -> None:
+    """Close the running event loop's HTTP client and release its pooled connections."""
+    entry = _http_clients.pop(asyncio.get_running_loop(), None)
+    if entry is not None:
+        client, guard = entry
+        await guard.aclose()
+        if not client.is_closed:
+            await client.aclose()
 
 async def make_api_request(
     method: str,
     path: str,
     params: Optional[Dict[str, Any]] = None,
     data: Optional[Dict[str, Any]] = None,
-    headers: Optional[Dict[str, str]] = None
+    headers: Optional[Dict[str, str]] = None,
+    cache_ttl: Optional[float] = None,
+    retry_policy: Optional[RetryPolicy] = None,
+    breaker: Optional[CircuitBreaker] = None,
+    stream: Optional[StreamOptions] = None
 ) -> Dict[str, Any]:
-    """Make authenticated request to API."""
+    """Make authenticated request to API.
+
+    GET responses are served from / stored in the response cache when
+    cache_ttl is positive, and concurrent identical GETs share a single
+    backend call; other methods always go to the backend. Transient
+    failures of idempotent methods are retried per retry_policy, and
+    calls fail fast while the endpoint group's circuit breaker is open.
+    With stream options the body is parsed incrementally and windowed
+    (see read_response_body); such calls bypass the cache, unless the
+    options only window bodies above a size threshold.
+    """
     url = f"{BASE_URL.rstrip('/')}{path}"
     
     request_headers = {
@@ -110,65 +417,307 @@ async def make_api_request(
     if headers:
         request_headers.update(headers)
     
-    async with httpx.AsyncClient(timeout=TIMEOUT) as client:
+    if (stream is not None and not stream.threshold_bytes) or method.upper() != "GET" or not (CACHE_ENABLED or COALESCE_ENABLED):
+        return await _send_request(
+            method, url, params, data, request_headers, retry_policy=retry_policy, breaker=breaker, stream=stream
+        )
+    
+    request_key = make_cache_key(method, url, params, request_headers, CACHE_VARY_HEADERS)
+    if stream is not None:
+        # Oversized bodies are windowed per these options, so keep them apart from plain calls
+        request_key += (stream,)
+    cache_key = None
+    if CACHE_ENABLED and cache_ttl and cache_ttl > 0:
+        cache_key = request_key
+        cached = RESPONSE_CACHE.get(cache_key)
+        if cached is not None:
+            METRICS.inc("endpoint_requests_total", endpoint=CURRENT_ENDPOINT.get(), status="cache_hit")
+            return cached
+    
+    async def send() -> Dict[str, Any]:
+        return await _send_request(
+            method, url, params, data, request_headers, cache_key, cache_ttl, retry_policy, breaker, stream
+        )
+    
+    if COALESCE_ENABLED:
+        return await SINGLE_FLIGHT.do(request_key, send)
+    return await send()
+
+async def _send_request(
+    method: str,
+    url: str,
+    params: Optional[Dict[str, Any]],
+    data: Optional[Dict[str, Any]],
+    request_headers: Dict[str, str],
+    cache_key: Optional[Tuple] = None,
+    cache_ttl: Optional[float] = None,
+    retry_policy: Optional[RetryPolicy] = None,
+    breaker: Optional[CircuitBreaker] = None,
+    stream: Optional[StreamOptions] = None
+) -> Dict[str, Any]:
+    """Send a request to the backend, retrying transient failures per the retry policy."""
+    policy = retry_policy or DEFAULT_RETRY_POLICY
+    can_retry = RETRY_ENABLED and policy.allows_method(method)
+    if can_retry:
+        RETRY_BUDGET.record_request()
+    
+    attempt = 0
+    while True:
+        attempt += 1
+        result, response, exc = await _attempt_request(method, url, params, data, request_headers, breaker, stream)
+        if not can_retry or attempt >= policy.max_attempts:
+            break
+        if response is not None:
+            if response.status_code not in policy.retry_statuses:
+                break
+            retry_after = parse_retry_after(response.headers.get("retry-after"))
+        elif isinstance(exc, RETRYABLE_EXCEPTIONS):
+            retry_after = None
+        else:
+            break
+        
+        delay = policy.delay(attempt, retry_after)
+        if delay is None:
+            logger.warning("Not retrying %s %s: Retry-After %ss exceeds %ss", method, url, retry_after, policy.max_delay)
+            break
+        if not RETRY_BUDGET.try_withdraw():
+            logger.warning("Not retrying %s %s: retry budget exhausted", method, url)
+            break
+        logger.warning("Retrying %s %s in %.2fs (attempt %d/%d)", method, url, delay, attempt + 1, policy.max_attempts)
+        await asyncio.sleep(delay)
+    
+    if attempt > 1 and isinstance(result, dict) and result.get("error") is True:
+        result["attempts"] = attempt
+    elif cache_key is not None and response is not None and response.is_success:
         try:
-            logger.debug(f"API {method} {url}")
-            logger.debug(f"Headers: {request_headers}")
-            logger.debug(f"Params: {params}")
-            logger.debug(f"Data: {data}")
-            print(f"API {method} {url}")
-            print(f"Headers: {request_headers}")
-            print(f"Params: {params}")
-            print(f"Data: {data}")   
-            response = await client.request(
-                method=method.upper(),
-                url=url,
-                params=params,
-                json=data if data else None,
-                headers=request_headers
-            )
-            
-            response.raise_for_status()
-            
-            # Handle different response types
-            content_type = response.headers.get("content-type", "").lower()
-            if "application/json" in content_type:
-                return response.json()
-            else:
-                return {"data": response.text, "content_type": content_type}
-                
-        except httpx.HTTPStatusError as e:
-            logger.error(f"API error {e.response.status_code}: {e.response.text}")
-            error_detail = {
+            size = len(response.content)
+        except httpx.ResponseNotRead:
+            # Streamed body (see read_response_body)
+            size = response.num_bytes_downloaded
+        RESPONSE_CACHE.put(cache_key, result, cache_ttl, size)
+    return result
+
+async def _attempt_request(
+    method: str,
+    url: str,
+    params: Optional[Dict[str, Any]],
+    data: Optional[Dict[str, Any]],
+    request_headers: Dict[str, str],
+    breaker: Optional[CircuitBreaker] = None,
+    stream: Optional[StreamOptions] = None
+) -> Tuple[Dict[str, Any], Optional[httpx.Response], Optional[Exception]]:
+    """Make one backend call and normalise it to (result, response, exception)."""
+    admitted = None
+    if breaker is not None:
+        admitted = breaker.allow()
+        if admitted is None:
+            METRICS.inc("endpoint_requests_total", endpoint=CURRENT_ENDPOINT.get(), status="circuit_open")
+            retry_in = breaker.retry_in()
+            return {
                 "error": True,
-                "status_code": e.response.status_code,
+                "status_code": 503,
                 "method": method,
                 "url": url,
-                "message": "Unknown error"
-            }
+                "message": f"Circuit open for '{breaker.name}': backend is failing, retry in {retry_in:.1f}s",
+                "circuit": breaker.name,
+                "circuit_state": breaker.state,
+                "retry_after": round(retry_in, 2),
+                "retryable": True
+            }, None, None
+    
+    client = get_http_client()
+    queued_at = time.monotonic()
+    limiter = get_host_limiter(url) if LIMITER_ENABLED else None
+    if limiter is not None:
+        try:
+            await limiter.acquire()
+        except LimiterRejected as e:
+            METRICS.inc("endpoint_requests_total", endpoint=CURRENT_ENDPOINT.get(), status="limiter_rejected")
+            if admitted is not None:
+                breaker.record(admitted, None)
+            logger.warning("API request rejected by limiter (%s): %s %s", e.reason, method, url)
+            return {
+                "error": True,
+                "status_code": 503,
+                "method": method,
+                "url": url,
+                "message": str(e),
+                "reason": e.reason,
+                "retryable": True,
+                "limiter": limiter.stats()
+            }, None, None
+        except BaseException:
+            # Cancelled while queued: give back the breaker admission, or a half-open probe slot leaks
+            if admitted is not None:
+                breaker.record(admitted, None)
+            raise
+    
+    started = time.monotonic()
+    backend_ok = False
+    completed = False
+    status = "transport_error"
+    # Timestamp when request headers start going out; everything before it is connection wait
+    headers_sent = []
+
+    async def on_trace(event: str, info: Dict[str, Any]) -> None:
+        if not headers_sent and event.endswith("send_request_headers.started"):
+            headers_sent.append(time.monotonic())
+
+    try:
+        trace = trace_enabled()
+        if trace:
+            request_logger.debug("API %s %s", method, url, extra={"fields": {
+                "event": "api_request",
+                "method": method,
+                "url": url,
+                "headers": redact_headers(request_headers),
+                "params": params,
+                "data": data
+            }})
+        async with client.stream(
+            method=method.upper(),
+            url=url,
+            params=params,
+            json=data if data else None,
+            headers=request_headers,
+            extensions={"trace": on_trace}
+        ) as response:
+            backend_ok = response.status_code < 500 and response.status_code != 429
+            completed = True
+            status = response.status_code
+            if trace:
+                request_logger.debug("API %s %s -> %d", method, url, response.status_code, extra={"fields": {
+                    "event": "api_response",
+                    "method": method,
+                    "url": url,
+                    "status_code": response.status_code,
+                    "elapsed_ms": round((time.monotonic() - started) * 1000, 2)
+                }})
             
-            try:
-                error_data = e.response.json()
-                error_detail["error_details"] = error_data
-                error_detail["message"] = error_data.get("message", error_data.get("error", str(error_data)))
-            except:
-                error_detail["message"] = e.response.text or str(e)
+            if response.is_error:
+                await response.aread()
+            response.raise_for_status()
             
-            # Add request details for debugging
-            if logger.isEnabledFor(logging.DEBUG):
-                error_detail["request"] = {
-                    "headers": dict(request_headers),
-                    "params": params,
-                    "data": data
-                }
+            return await read_response_body(response, stream), response, None
             
-            return error_detail
-        except Exception as e:
-            logger.error(f"API request failed: {str(e)}")
-            return {
-                "error": True,
-                "message": str(e)
+    except httpx.HTTPStatusError as e:
+        logger.error("API error %s: %s", e.response.status_code, e.response.text)
+        error_detail = {
+            "error": True,
+            "status_code": e.response.status_code,
+            "method": method,
+            "url": url,
+            "message": "Unknown error"
+        }
+        
+        try:
+            error_data = e.response.json()
+            error_detail["error_details"] = error_data
+            error_detail["message"] = error_data.get("message", error_data.get("error", str(error_data)))
+        except:
+            error_detail["message"] = e.response.text or str(e)
+        
+        # Add request details for debugging
+        if logger.isEnabledFor(logging.DEBUG):
+            error_detail["request"] = {
+                "headers": redact_headers(request_headers),
+                "params": params,
+                "data": data
             }
+        
+        return error_detail, e.response, None
+    except Exception as e:
+        completed = True
+        logger.error("API request failed: %s", e)
+        return {
+            "error": True,
+            "message": str(e)
+        }, None, e
+    finally:
+        finished = time.monotonic()
+        if limiter is not None:
+            limiter.release(finished - started, backend_ok)
+        if admitted is not None:
+            breaker.record(admitted, backend_ok if completed else None)
+        if completed:
+            io_started = headers_sent[0] if headers_sent else started
+            METRICS.observe("phase_seconds", io_started - queued_at, phase="connection_wait")
+            METRICS.observe("phase_seconds", finished - io_started, phase="backend_io")
+            METRICS.inc("endpoint_requests_total", endpoint=CURRENT_ENDPOINT.get(), status=status)
+
+async def read_response_body(response: httpx.Response, stream: Optional[StreamOptions] = None) -> Any:
+    """Read a successful response body with bounded memory.
+
+    Bodies up to STREAM_THRESHOLD_BYTES are returned as before. Larger JSON
+    bodies, and every body when stream options are given (above their
+    threshold_bytes, if set), are parsed incrementally so that only a window of each array is ever held; the
+    result then wraps the kept data with what was truncated and, when the
+    records array has more items, a continuation token for the next window.
+    Larger non-JSON bodies are cut to the threshold. Download progress is
+    reported to CURRENT_PROGRESS.
+    """
+    content_type = response.headers.get("content-type", "").lower()
+    is_json = "application/json" in content_type
+    length = response.headers.get("content-length", "")
+    # For gzip/br bodies Content-Length is the compressed size; the limits apply to decoded bytes
+    encoding = response.headers.get("content-encoding", "identity").strip().lower()
+    total = int(length) if length.isdigit() and encoding in ("", "identity") else None
+    options = stream or StreamOptions(max_records=STREAM_MAX_RECORDS, threshold_bytes=STREAM_THRESHOLD_BYTES)
+    if options.threshold_bytes and total is not None and total <= options.threshold_bytes:
+        await response.aread()
+        if is_json:
+            return response.json()
+        return {"data": response.text, "content_type": content_type}
+
+    progress = CURRENT_PROGRESS.get()
+    last_progress = time.monotonic()
+    truncator = None
+    buffered: List[bytes] = []
+    received = 0
+    async for chunk in response.aiter_bytes():
+        if truncator is None and is_json and received + len(chunk) > options.threshold_bytes:
+            truncator = JsonStreamTruncator(options.max_records, options.records_path, options.offset)
+            for piece in buffered:
+                truncator.feed(piece)
+            buffered = []
+        if truncator is not None:
+            truncator.feed(chunk)
+        elif received < STREAM_THRESHOLD_BYTES:
+            buffered.append(chunk)
+        received += len(chunk)
+        if progress is not None and time.monotonic() - last_progress >= STREAM_PROGRESS_INTERVAL:
+            last_progress = time.monotonic()
+            await progress(received, total)
+    if progress is not None:
+        await progress(received, total)
+
+    if truncator is None:
+        body = b"".join(buffered)
+        if is_json:
+            return json.loads(body)
+        result = {
+            "data": body[:STREAM_THRESHOLD_BYTES].decode(response.encoding or "utf-8", errors="replace"),
+            "content_type": content_type
+        }
+        if received > STREAM_THRESHOLD_BYTES:
+            result["truncated"] = True
+            result["bytes_received"] = received
+        return result
+
+    truncated = truncator.truncation()
+    continuation_token = None
+    records = truncated.get(options.records_path) if options.records_path else None
+    if records and records["offset"] + records["returned"] < records["total"]:
+        continuation_token = encode_continuation(
+            CURRENT_ENDPOINT.get(), records["offset"] + records["returned"]
+        )
+    return {
+        "data": truncator.result(),
+        "streamed": True,
+        "bytes_received": truncator.bytes_received,
+        "truncated": truncated,
+        "continuation_token": continuation_token
+    }
 
 
 def sanitize_param_name(name: str) -> str:
@@ -182,73 +731,620 @@ def sanitize_param_name(name: str) -> str:
     # Ensure it doesn't start with a number
     if name and name[0].isdigit():
         name = f'param_{name}'
+    # Keywords such as "from" or "in" are not valid argument names
+    if keyword.iskeyword(name):
+        name = f'{name}_'
     return name
 
+@dataclass(frozen=True)
+class ParamPlan:
+    """Pre-resolved parameter spec: where the value goes and how to validate it."""
+    name: str
+    location: str
+    required: bool
+    pattern: Optional[Pattern] = None
+
+
+@dataclass(frozen=True)
+class RequestPlan:
+    """Immutable, precompiled request recipe for one catalog endpoint."""
+    endpoint_name: str
+    method: str
+    params: Tuple[ParamPlan, ...]
+    required: FrozenSet[str]
+    format_path: Callable[[Dict[str, Any]], str]
+    raw_body: bool
+    cache_ttl: float = 0
+    retry_policy: Optional[RetryPolicy] = None
+    breaker_key: Optional[str] = None
+    stream_records_path: Optional[str] = None
+    stream_max_records: Optional[int] = None
+    pagination: Optional[PaginationStrategy] = None
+    fields: Tuple[str, ...] = ()
+
+
+def compile_path_formatter(template: str) -> Callable[[Dict[str, Any]], str]:
+    """Compile a path template like /a/{id}/b into a fast formatter function."""
+    parts = re.split(r'\{([^}]+)\}', template)
+    if len(parts) == 1:
+        return lambda path_params: template
+    literals = parts[0::2]
+    names = parts[1::2]
+
+    def format_path(path_params: Dict[str, Any]) -> str:
+        pieces = [literals[0]]
+        for name, literal in zip(names, literals[1:]):
+            value = path_params.get(name)
+            pieces.append(quote(str(value), safe="") if value is not None else f"{{{name}}}")
+            pieces.append(literal)
+        return "".join(pieces)
+    return format_path
+
+
+def compile_request_plan(endpoint_name: str, endpoint: Dict[str, Any]) -> RequestPlan:
+    """Compile a catalog entry into a RequestPlan."""
+    params = []
+    for param_spec in endpoint["parameters"]:
+        pattern = None
+        if param_spec.get("pattern"):
+            try:
+                pattern = re.compile(param_spec["pattern"])
+            except re.error as e:
+                logger.warning("Ignoring invalid pattern for %s.%s: %s", endpoint_name, param_spec["name"], e)
+        params.append(ParamPlan(
+            name=param_spec["name"],
+            location=param_spec["location"],
+            required=bool(param_spec["required"]),
+            pattern=pattern
+        ))
+    body_names = [p.name for p in params if p.location == "body"]
+    stream = endpoint.get("stream") or {}
+    pagination = None
+    if endpoint.get("pagination"):
+        try:
+            pagination = PaginationStrategy.from_catalog(endpoint["pagination"])
+        except (TypeError, ValueError) as e:
+            logger.warning("Ignoring invalid pagination for %s: %s", endpoint_name, e)
+    if pagination is not None:
+        undeclared = [name for name in pagination.param_names() if name not in {p.name for p in params}]
+        if undeclared:
+            logger.warning("Pagination parameters of %s are not endpoint parameters: %s", endpoint_name, ", ".join(undeclared))
+    fields = parse_fields(endpoint.get("fields"))
+    try:
+        compile_fields(fields)
+    except ValueError as e:
+        logger.warning("Ignoring default fields of %s: %s", endpoint_name, e)
+        fields = ()
+    return RequestPlan(
+        endpoint_name=endpoint_name,
+        method=endpoint["method"].upper(),
+        params=tuple(params),
+        required=frozenset(p.name for p in params if p.required),
+        format_path=compile_path_formatter(endpoint["path"]),
+        # A lone request_body parameter is the JSON body itself, not a field of it
+        raw_body=body_names == ["request_body"],
+        cache_ttl=float(endpoint.get("cache_ttl", CACHE_DEFAULT_TTL)),
+        retry_policy=DEFAULT_RETRY_POLICY.override(endpoint["retry"]) if endpoint.get("retry") else None,
+        breaker_key=breaker_key(endpoint) if BREAKER_ENABLED else None,
+        stream_records_path=stream.get("records_path"),
+        stream_max_records=int(stream.get("max_records", STREAM_MAX_RECORDS)) if stream else None,
+        pagination=pagination,
+        fields=fields
+    )
+
+
+# Request plans, compiled once per catalog entry
+REQUEST_PLANS = {name: compile_request_plan(name, endpoint) for name, endpoint in API_CATALOG.items()}
+
+def build_stream_options(
+    endpoint_name: str,
+    max_records: Optional[int] = None,
+    continuation_token: Optional[str] = None
+) -> Optional[StreamOptions]:
+    """Streaming window for a call; explicit arguments override the endpoint's catalog defaults.
+
+    Returns None when the endpoint has no "stream" entry and no arguments
+    were given. Raises ValueError for an invalid continuation token.
+    """
+    plan = REQUEST_PLANS[endpoint_name]
+    if max_records is None and continuation_token is None and plan.stream_max_records is None:
+        return None
+    return StreamOptions(
+        max_records=max_records or plan.stream_max_records or STREAM_MAX_RECORDS,
+        records_path=plan.stream_records_path,
+        offset=decode_continuation(continuation_token, endpoint_name) if continuation_token else 0
+    )
+
+def progress_reporter(ctx: Optional[Context]) -> Optional[Callable[[int, Optional[int]], Awaitable[None]]]:
+    """Callback forwarding download progress as MCP progress notifications, if the client asked for them."""
+    try:
+        meta = ctx.request_context.meta if ctx is not None else None
+    except ValueError:
+        # Called outside of an MCP request (e.g. directly by the agent)
+        return None
+    if meta is None or meta.progressToken is None:
+        return None
+
+    async def report(received: int, total: Optional[int]) -> None:
+        try:
+            await ctx.report_progress(received, total, f"Received {received // 1024} KiB")
+        except Exception as e:
+            logger.debug("Progress notification failed: %s", e)
+    return report
+
+async def execute_endpoint(
+    endpoint_name: str,
+    params: Optional[Dict[str, Any]] = None,
+    stream: Optional[StreamOptions] = None,
+    progress: Optional[Callable[[int, Optional[int]], Awaitable[None]]] = None
+) -> Dict[str, Any]:
+    """Validate parameters against the endpoint's request plan and execute the API call."""
+    validation_started = time.monotonic()
+    plan = REQUEST_PLANS[endpoint_name]
+    params = params or {}
+    
+    # Single pass: check required parameters, validate patterns and split by location
+    missing_required = []
+    path_params = {}
+    query_params = {}
+    body_params = {}
+    header_params = {}
+    
+    for param in plan.params:
+        if param.name not in params:
+            if param.required:
+                missing_required.append(param.name)
+            continue
+        value = params[param.name]
+        
+        if param.pattern is not None and value is not None and not isinstance(value, (dict, list)):
+            if not param.pattern.search(str(value)):
+                METRICS.inc("endpoint_requests_total", endpoint=endpoint_name, status="invalid_params")
+                return {
+                    "error": True,
+                    "message": f"Parameter '{param.name}' does not match required pattern",
+                    "pattern": param.pattern.pattern,
+                    "value": value
+                }
+        
+        if param.location == "path":
+            path_params[param.name] = value
+        elif param.location == "query":
+            query_params[param.name] = value
+        elif param.location == "body":
+            body_params[param.name] = value
+        elif param.location == "header":
+            header_params[param.name] = str(value)
+    
+    if missing_required:
+        METRICS.inc("endpoint_requests_total", endpoint=endpoint_name, status="invalid_params")
+        endpoint = API_CATALOG[endpoint_name]
+        return {
+            "error": True,
+            "message": "Missing required parameters",
+            "missing_parameters": missing_required,
+            "endpoint_schema": {
+                "method": endpoint["method"],
+                "path": endpoint["path"],
+                "parameters": endpoint["parameters"]
+            }
+        }
+    
+    if plan.raw_body:
+        body_params = body_params.get("request_body")
+    
+    path = plan.format_path(path_params)
+    METRICS.observe("phase_seconds", time.monotonic() - validation_started, phase="validation")
+    
+    # Make request
+    token = CURRENT_ENDPOINT.set(endpoint_name)
+    progress_token = CURRENT_PROGRESS.set(progress)
+    try:
+        return await make_api_request(
+            method=plan.method,
+            path=path,
+            params=query_params if query_params else None,
+            data=body_params if body_params else None,
+            headers=header_params if header_params else None,
+            cache_ttl=plan.cache_ttl,
+            retry_policy=plan.retry_policy,
+            breaker=get_circuit_breaker(plan.breaker_key) if plan.breaker_key else None,
+            stream=stream
+        )
+    finally:
+        CURRENT_PROGRESS.reset(progress_token)
+        CURRENT_ENDPOINT.reset(token)
+
+
+async def fetch_all_endpoint(
+    endpoint_name: str,
+    params: Optional[Dict[str, Any]] = None,
+    max_records: Optional[int] = None,
+    progress: Optional[Callable[[int, Optional[int]], Awaitable[None]]] = None
+) -> Dict[str, Any]:
+    """Fetch every page of a paginated endpoint and merge the records into one result.
+
+    The next page is requested while the current one is merged. Stops at the
+    last page, at max_records (default API_PAGINATION_MAX_RECORDS) or after
+    API_PAGINATION_MAX_PAGES pages; a capped result carries next_params to resume from.
+    """
+    plan = REQUEST_PLANS[endpoint_name]
+    if plan.pagination is None:
+        return {
+            "error": True,
+            "message": f"Endpoint '{endpoint_name}' does not declare pagination; fetch_all is not available"
+        }
+
+    max_records = min(max_records or PAGINATION_MAX_RECORDS, PAGINATION_MAX_RECORDS)
+    # An oversized page is windowed only past the records still wanted: a page cut to the
+    # default window would look shorter than page_size and end the paging early
+    window = StreamOptions(
+        max_records=max_records + 1,
+        records_path=plan.pagination.records_path,
+        threshold_bytes=STREAM_THRESHOLD_BYTES
+    )
+
+    async def fetch_page(page_params: Dict[str, Any]) -> Any:
+        result = await execute_endpoint(endpoint_name, page_params, window, progress)
+        if isinstance(result, dict) and result.get("streamed"):
+            # Oversized page: its window holds every record still wanted
+            return result["data"]
+        return result
+
+    return await fetch_all_pages(
+        fetch_page,
+        plan.pagination,
+        params or {},
+        max_records=max_records,
+        max_pages=PAGINATION_MAX_PAGES
+    )
+
+async def invoke_endpoint(
+    endpoint_name: Optional[str] = None,
+    operation_id: Optional[str] = None,
+    params: Optional[Dict[str, Any]] = None,
+    max_records: Optional[int] = None,
+    continuation_token: Optional[str] = None,
+    progress: Optional[Callable[[int, Optional[int]], Awaitable[None]]] = None,
+    fetch_all: bool = False,
+    fields: Optional[List[str]] = None
+) -> Dict[str, Any]:
+    """Resolve an endpoint by name or operation ID and execute it."""
+    # Resolve endpoint name
+    if operation_id and operation_id in OPERATION_ID_INDEX:
+        endpoint_name = OPERATION_ID_INDEX[operation_id]
+    
+    if not endpoint_name or endpoint_name not in API_CATALOG:
+        return {
+            "error": True,
+            "message": f"Endpoint '{endpoint_name or operation_id}' not found",
+            "hint": "Use list_api_endpoints to discover available endpoints"
+        }
+    
+    return await run_endpoint(
+        endpoint_name, params, max_records, continuation_token, fetch_all, fields, progress
+    )
+
+async def run_endpoint(
+    endpoint_name: str,
+    params: Optional[Dict[str, Any]] = None,
+    max_records: Optional[int] = None,
+    continuation_token: Optional[str] = None,
+    fetch_all: bool = False,
+    fields: Optional[List[str]] = None,
+    progress: Optional[Callable[[int, Optional[int]], Awaitable[None]]] = None
+) -> Dict[str, Any]:
+    """Execute an endpoint for a tool call: windowing or fetch_all paging, then projection.
+
+    fields overrides the endpoint's default "fields" from the catalog ("*"
+    returns everything); with fetch_all the paths apply to each merged record,
+    and "$" paths outside the records are left out and listed in ignored_fields.
+    """
+    plan = REQUEST_PLANS[endpoint_name]
+    field_paths = parse_fields(fields) or plan.fields
+    ignored_fields = ()
+    if fetch_all and plan.pagination is not None:
+        field_paths, ignored_fields = relative_to(field_paths, plan.pagination.records_path)
+    try:
+        tree = compile_fields(field_paths)
+        stream = None if fetch_all else build_stream_options(endpoint_name, max_records, continuation_token)
+    except ValueError as e:
+        return {"error": True, "message": str(e)}
+    
+    if fetch_all:
+        result = await fetch_all_endpoint(endpoint_name, params, max_records, progress)
+        if ignored_fields and result.get("error") is not True:
+            # Paths outside the records would project every record to nothing
+            result["ignored_fields"] = list(ignored_fields)
+        return shape_result(result, tree, "records")
+    result = await execute_endpoint(endpoint_name, params, stream, progress)
+    return shape_result(result, tree, "data" if isinstance(result, dict) and result.get("streamed") else None)
+
+def shape_result(result: Any, tree: Optional[FieldTree], key: Optional[str] = None) -> Any:
+    """Project and slim a successful result, or only its `key` entry (windowed and merged results).
+
+    Results are shared with the response cache and coalesced callers, so the
+    caller always gets its own copy, never the shared object.
+    """
+    if not isinstance(result, (dict, list)):
+        return result
+    if isinstance(result, dict):
+        if result.get("error") is True:
+            return copy_json(result)
+        if key is not None:
+            return {k: shape_result(v, tree) if k == key else copy_json(v) for k, v in result.items()}
+        if isinstance(result.get("data"), str) and "content_type" in result:
+            # Non-JSON body: nothing to project
+            return copy_json(result)
+    shaped = project(result, tree)
+    # slim() builds new containers; without it, the projection may still share the cached ones
+    return slim(shaped) if SLIM_RESPONSES else copy_json(shaped)
+
+async def invoke_endpoints_batch(
+    requests: List[Dict[str, Any]],
+    max_concurrency: Optional[int] = None
+) -> Dict[str, Any]:
+    """Run many endpoint invocations concurrently, preserving request order."""
+    if len(requests) > BATCH_MAX_ITEMS:
+        return {
+            "error": True,
+            "message": f"Batch too large: {len(requests)} items (maximum {BATCH_MAX_ITEMS})"
+        }
+    concurrency = min(max_concurrency or BATCH_MAX_CONCURRENCY, BATCH_MAX_CONCURRENCY)
+    semaphore = asyncio.Semaphore(max(concurrency, 1))
+
+    async def run_item(item: Dict[str, Any]) -> Dict[str, Any]:
+        if not isinstance(item, dict):
+            return {"error": True, "message": "Batch item must be an object with endpoint_name and params"}
+        async with semaphore:
+            try:
+                return await invoke_endpoint(
+                    item.get("endpoint_name"),
+                    item.get("operation_id"),
+                    item.get("params"),
+                    fields=item.get("fields")
+                )
+            except Exception as e:
+                logger.error("Batch item failed: %s", e)
+                return {"error": True, "message": str(e)}
+
+    results = await asyncio.gather(*(run_item(item) for item in requests))
+
+    items = []
+    failed = 0
+    for index, (item, result) in enumerate(zip(requests, results)):
+        is_error = isinstance(result, dict) and result.get("error") is True
+        failed += is_error
+        items.append({
+            "index": index,
+            "endpoint_name": (item.get("endpoint_name") or item.get("operation_id")) if isinstance(item, dict) else None,
+            "ok": not is_error,
+            "result": result
+        })
+    return {
+        "total": len(items),
+        "succeeded": len(items) - failed,
+        "failed": failed,
+        "results": items
+    }
+
+
+# Python annotations for catalog parameter types, used to build typed tool signatures
+TYPE_ANNOTATIONS = {
+    "string": str,
+    "integer": int,
+    "number": float,
+    "boolean": bool,
+    "array": list,
+    "object": Dict[str, Any]
+}
+
+def render_tool_doc(endpoint_name: str, endpoint: Dict[str, Any]) -> str:
+    """Render the docstring for a generated endpoint tool."""
+    lines = [
+        endpoint["description"],
+        "",
+        f"Generated from: {endpoint['method']} {endpoint['path']}"
+    ]
+    if endpoint.get("source"):
+        lines.append(f"Source: {endpoint['source']}")
+    if endpoint.get("operation_id"):
+        lines.append(f"Operation ID: {endpoint['operation_id']}")
+    lines += [
+        "",
+        f"Authentication: {'Required' if endpoint.get('auth_required', True) else 'Not required'}"
+    ]
+    headers = [p for p in endpoint["parameters"] if p["location"] == "header"]
+    others = [p for p in endpoint["parameters"] if p["location"] != "header"]
+    if others:
+        lines += ["", "Parameters:"]
+        for param in others:
+            required = " (required)" if param["required"] else ""
+            lines.append(f"- {param['name']}: {param['type']}{required}")
+            if param.get("description"):
+                lines.append(f"  {param['description']}")
+    if headers:
+        lines.append("Optional Headers:")
+        for param in headers:
+            lines.append(f"- {param['name']}: {param['type']}")
+            if param.get("description"):
+                lines.append(f"  {param['description']}")
+    lines += ["", "Large responses are windowed: use max_records and continuation_token to page through lists."]
+    lines.append("Use fields to return only the parts of the response you need.")
+    if endpoint.get("fields"):
+        lines.append(f"Default fields: {', '.join(parse_fields(endpoint['fields']))}")
+    if endpoint.get("pagination"):
+        lines.append("Paginated: pass fetch_all=true to fetch every page in one call (max_records caps the total).")
+    return "\n".join(lines)
+
+def build_endpoint_tool(endpoint_name: str, endpoint: Dict[str, Any]):
+    """Build a typed async tool function for a catalog entry.
+
+    The function signature mirrors the endpoint parameters so FastMCP can
+    derive the tool input schema; calls go through execute_endpoint.
+    """
+    arg_names = {}
+    signature_params = []
+    # Required parameters first so the signature stays valid
+    for param in sorted(endpoint["parameters"], key=lambda p: not p["required"]):
+        arg_name = param["name"]
+        if not arg_name.isidentifier() or keyword.iskeyword(arg_name):
+            arg_name = sanitize_param_name(arg_name) or "param"
+        while arg_name in arg_names:
+            arg_name = f"{arg_name}_{param['location']}"
+        arg_names[arg_name] = param["name"]
+
+        annotation = TYPE_ANNOTATIONS.get(param["type"], Any)
+        if param["required"]:
+            signature_params.append(inspect.Parameter(
+                arg_name, inspect.Parameter.KEYWORD_ONLY, annotation=annotation
+            ))
+        else:
+            signature_params.append(inspect.Parameter(
+                arg_name, inspect.Parameter.KEYWORD_ONLY, annotation=Optional[annotation], default=None
+            ))
+
+    # Windowing, pagination and projection options, unless the endpoint has parameters with these names
+    option_args = [
+        ("max_records", Optional[int], None),
+        ("continuation_token", Optional[str], None),
+        ("fields", Optional[List[str]], None)
+    ]
+    # Paginated endpoints can fetch and merge all pages in one call
+    if REQUEST_PLANS[endpoint_name].pagination is not None:
+        option_args.append(("fetch_all", bool, False))
+    option_args = [arg for arg in option_args if arg[0] not in arg_names]
+    for name, annotation, default in option_args:
+        signature_params.append(inspect.Parameter(
+            name, inspect.Parameter.KEYWORD_ONLY, annotation=annotation, default=default
+        ))
+    # FastMCP injects the request context into the parameter annotated with Context
+    signature_params.append(inspect.Parameter("ctx", inspect.Parameter.KEYWORD_ONLY, annotation=Context, default=None))
+
+    # The hand-written tools took sanitized names (languagecode, userid); keep accepting them
+    signature_names = {p.name for p in signature_params}
+    aliases = {}
+    for arg_name, wire_name in arg_names.items():
+        alias = sanitize_param_name(wire_name) or "param"
+        if alias != arg_name and alias not in signature_names and alias not in aliases:
+            aliases[alias] = arg_name
+
+    async def endpoint_tool(**kwargs) -> Dict[str, Any]:
+        progress = progress_reporter(kwargs.pop("ctx", None))
+        options = {name: kwargs.pop(name, default) for name, _, default in option_args}
+        kwargs = {aliases.get(k, k): v for k, v in kwargs.items()}
+        params = {arg_names[k]: v for k, v in kwargs.items() if v is not None}
+        return await run_endpoint(endpoint_name, params, progress=progress, **options)
+
+    endpoint_tool.__name__ = endpoint_name
+    endpoint_tool.__qualname__ = endpoint_name
+    endpoint_tool.__doc__ = render_tool_doc(endpoint_name, endpoint)
+    endpoint_tool.__signature__ = inspect.Signature(signature_params, return_annotation=Dict[str, Any])
+    endpoint_tool.__annotations__ = {p.name: p.annotation for p in signature_params}
+    endpoint_tool.param_aliases = aliases
+    return endpoint_tool
+
+def typed_tool_names():
+    """Return the catalog endpoints to expose as typed tools (see API_TYPED_TOOLS)."""
+    if TYPED_TOOLS.strip() == "*":
+        return [name for name, endpoint in API_CATALOG.items() if not endpoint.get("deprecated")]
+    names = [name.strip() for name in TYPED_TOOLS.split(",") if name.strip()]
+    unknown = [name for name in names if name not in API_CATALOG]
+    if unknown:
+        logger.warning("API_TYPED_TOOLS lists unknown endpoints: %s", ", ".join(unknown))
+    return [name for name in names if name in API_CATALOG]
+
+def tool_calls_in_flight() -> int:
+    return int(sum(METRICS.gauges["tool_in_flight"].values()))
+
+def server_health() -> Dict[str, Any]:
+    """Liveness of this server process."""
+    return {
+        "status": "draining" if WORKER_STATE["draining"] else "ok",
+        "pid": os.getpid(),
+        "transport": MCP_SERVER_TRANSPORT,
+        "uptime_seconds": round(time.time() - WORKER_STATE["started"], 1),
+        "tool_calls_in_flight": tool_calls_in_flight(),
+        "endpoints": len(API_CATALOG)
+    }
+
+def server_readiness() -> Dict[str, Any]:
+    """Whether this process can take traffic: started, not draining, catalog loaded, HTTP pool open.
+
+    Open circuit breakers are reported but do not make the server unready,
+    since the other endpoint groups still work.
+    """
+    checks = {
+        "started": WORKER_STATE["ready"],
+        "not_draining": not WORKER_STATE["draining"],
+        "catalog_loaded": bool(API_CATALOG) and len(REQUEST_PLANS) == len(API_CATALOG),
+        "http_pool_open": bool(open_http_clients())
+    }
+    return {
+        "ready": all(checks.values()),
+        "checks": checks,
+        "open_circuits": sorted(key for key, b in CIRCUIT_BREAKERS.items() if b.state != CircuitBreaker.CLOSED)
+    }
+
+async def drain_in_flight(timeout: float) -> None:
+    """Wait up to timeout seconds for running tool calls to finish."""
+    deadline = time.monotonic() + timeout
+    while tool_calls_in_flight() > 0 and time.monotonic() < deadline:
+        await asyncio.sleep(0.1)
+    if tool_calls_in_flight():
+        logger.warning("Shutting down with %d tool calls still in flight", tool_calls_in_flight())
+
 def register_bancs_tools(mcp: FastMCP):
     """Register all API tools with FastMCP server."""
     registered_funcs = []
     # Register API discovery tools
     @mcp.tool()
+    @instrument_tool
     async def list_api_endpoints(
         search_query: Optional[str] = None,
         tag: Optional[str] = None,
         method: Optional[str] = None,
-        include_deprecated: bool = False
+        include_deprecated: bool = False,
+        limit: int = 50,
+        offset: int = 0
     ) -> Dict[str, Any]:
         """Search and list available API endpoints.
         
         Discover available operations by searching through:
-        - search_query: Text to search in names, descriptions, or paths
+        - search_query: Terms to search in names, descriptions, paths, tags and parameter names.
+          Terms are AND-ed; separate alternatives with OR (e.g. "balance OR statement")
         - tag: Filter by API domain/tag (e.g., "counterparties", "loans", "accounts")
         - method: Filter by HTTP method (GET, POST, PUT, DELETE, etc.)
         - include_deprecated: Include deprecated endpoints
+        - limit / offset: Page through large result sets
         
-        Returns grouped endpoints with descriptions and metadata.
+        Returns grouped endpoints with descriptions and metadata, best matches first.
         """
-        results = []
+        # Rank by the search index, or fall back to the pre-sorted catalog order
+        if search_query and search_query.strip():
+            endpoint_names = [name for name, _ in SEARCH_INDEX.search(search_query)]
+        else:
+            endpoint_names = SEARCH_INDEX.default_order
         
-        # Filter by tag
+        # Filter by tag and method
+        allowed = None
         if tag:
-            endpoint_names = TAG_INDEX.get(tag.lower(), [])
-        else:
-            endpoint_names = list(API_CATALOG.keys())
+            allowed = set(TAG_INDEX.get(tag.lower(), []))
+        if method:
+            by_method = SEARCH_INDEX.by_method.get(method.upper(), set())
+            allowed = by_method if allowed is None else allowed & by_method
         
-        # Apply filters
-        for name in endpoint_names:
-            endpoint = API_CATALOG[name]
-            
-            # Skip deprecated if not requested
-            if endpoint.get("deprecated") and not include_deprecated:
-                continue
-            
-            # Filter by method
-            if method and endpoint["method"] != method.upper():
-                continue
-            
-            # Search filter
-            if search_query:
-                search_lower = search_query.lower()
-                if not any(search_lower in text.lower() for text in [
-                    name,
-                    endpoint["description"],
-                    endpoint["path"],
-                    ' '.join(endpoint["tags"])
-                ]):
-                    continue
-            
-            results.append({
-                "name": name,
-                "method": endpoint["method"],
-                "path": endpoint["path"],
-                "description": endpoint["description"],
-                "tags": endpoint["tags"],
-                "deprecated": endpoint.get("deprecated", False),
-                "auth_required": endpoint.get("auth_required", True),
-                "parameter_count": len(endpoint["parameters"])
-            })
+        matches = [
+            name for name in endpoint_names
+            if (allowed is None or name in allowed)
+            and (include_deprecated or not SEARCH_INDEX.summaries[name]["deprecated"])
+        ]
         
-        # Sort results
-        results.sort(key=lambda x: (x["deprecated"], x["name"]))
+        # Paginate
+        offset = max(offset, 0)
+        limit = max(limit, 1)
+        results = [SEARCH_INDEX.summaries[name] for name in matches[offset:offset + limit]]
+        next_offset = offset + limit if offset + limit < len(matches) else None
         
         # Group by tags if no specific tag was requested
         if not tag and results:
@@ -258,13 +1354,19 @@ def register_bancs_tools(mcp: FastMCP):
                     by_tag[t].append(result)
             
             return {
-                "total_endpoints": len(results),
+                "total_endpoints": len(matches),
+                "returned": len(results),
+                "offset": offset,
+                "next_offset": next_offset,
                 "endpoints_by_tag": dict(by_tag),
                 "available_tags": sorted(list(TAG_INDEX.keys()))
             }
         
         return {
-            "total_endpoints": len(results),
+            "total_endpoints": len(matches),
+            "returned": len(results),
+            "offset": offset,
+            "next_offset": next_offset,
             "endpoints": results,
             "search_criteria": {
                 "query": search_query,
@@ -275,6 +1377,7 @@ def register_bancs_tools(mcp: FastMCP):
         }
    # registered_funcs.append(list_api_endpoints)
     @mcp.tool()
+    @instrument_tool
     async def get_api_endpoint_schema(
         endpoint_name: Optional[str] = None,
         operation_id: Optional[str] = None
@@ -349,10 +1452,16 @@ def register_bancs_tools(mcp: FastMCP):
         }
     #registered_funcs.append(get_api_endpoint_schema)
     @mcp.tool()
+    @instrument_tool
     async def invoke_api_endpoint(
         endpoint_name: Optional[str] = None,
         operation_id: Optional[str] = None,
-        params: Optional[Dict[str, Any]] = None
+        params: Optional[Dict[str, Any]] = None,
+        max_records: Optional[int] = None,
+        continuation_token: Optional[str] = None,
+        fetch_all: bool = False,
+        fields: Optional[List[str]] = None,
+        ctx: Context = None
     ) -> Dict[str, Any]:
         """Dynamically invoke any API endpoint.
         
@@ -360,254 +1469,153 @@ def register_bancs_tools(mcp: FastMCP):
         - endpoint_name: The tool name
         - operation_id: The original OpenAPI operationId
         - params: Parameters to pass (use get_api_endpoint_schema for requirements)
+        - max_records: Return at most this many items of each list in the response
+          (large responses are always windowed)
+        - continuation_token: Token from a previous windowed response, to fetch the next records
+        - fetch_all: For paginated list endpoints, fetch all pages and return the merged records
+          (max_records then caps the total)
+        - fields: Only return these fields, e.g. ["accountId", "balances[*].amount"]; ["*"] for everything
         
         Validates parameters and executes the API call.
         """
-        # Resolve endpoint name
-        if operation_id and operation_id in OPERATION_ID_INDEX:
-            endpoint_name = OPERATION_ID_INDEX[operation_id]
-        
-        if not endpoint_name or endpoint_name not in API_CATALOG:
-            return {
-                "error": True,
-                "message": f"Endpoint '{endpoint_name or operation_id}' not found",
-                "hint": "Use list_api_endpoints to discover available endpoints"
-            }
-        
-        endpoint = API_CATALOG[endpoint_name]
-        params = params or {}
-        
-        # Validate required parameters
-        missing_required = []
-        for param_spec in endpoint["parameters"]:
-            if param_spec["required"] and param_spec["name"] not in params:
-                missing_required.append(param_spec["name"])
-        
-        if missing_required:
-            return {
-                "error": True,
-                "message": "Missing required parameters",
-                "missing_parameters": missing_required,
-                "endpoint_schema": {
-                    "method": endpoint["method"],
-                    "path": endpoint["path"],
-                    "parameters": endpoint["parameters"]
-                }
-            }
-        
-        # Separate parameters by location
-        path_params = {}
-        query_params = {}
-        body_params = {}
-        header_params = {}
-        
-        for param_spec in endpoint["parameters"]:
-            param_name = param_spec["name"]
-            if param_name in params:
-                value = params[param_name]
-                
-                # Validate union types if present
-                if "possible_types" in param_spec and value is not None:
-                    # For path parameters with union types, ensure proper formatting
-                    if param_spec["location"] == "path":
-                        # Convert to string for path parameters
-                        value = str(value)
-                        
-                        # Apply pattern validation if specified
-                        if "pattern" in param_spec:
-                            import re
-                            if not re.match(param_spec["pattern"], value):
-                                return {
-                                    "error": True,
-                                    "message": f"Path parameter '{param_name}' does not match required pattern",
-                                    "pattern": param_spec["pattern"],
-                                    "value": value
-                                }
-                
-                if param_spec["location"] == "path":
-                    path_params[param_name] = value
-                elif param_spec["location"] == "query":
-                    query_params[param_name] = value
-                elif param_spec["location"] == "body":
-                    body_params[param_name] = value
-                elif param_spec["location"] == "header":
-                    header_params[param_name] = value
-        
-        # Build path with parameters
-        path = endpoint["path"]
-        for param_name, param_value in path_params.items():
-            path = path.replace(f"{{param_name}}", str(param_value))
-        
-        # Make request
-        return await make_api_request(
-            method=endpoint["method"],
-            path=path,
-            params=query_params if query_params else None,
-            data=body_params if body_params else None,
-            headers=header_params if header_params else None
+        return await invoke_endpoint(
+            endpoint_name, operation_id, params, max_records, continuation_token, progress_reporter(ctx),
+            fetch_all, fields
         )
-    #registered_funcs.append(get_api_endpoint_schema)
+
     @mcp.tool()
-    async def create_acnt_actv_using_post(
-        request_body:Dict[str, Any] ,  # createAccountResource,
-        entity: Optional[str] = None,
-        languagecode: Optional[int] = None,
-        userid: Optional[int] = None
+    @instrument_tool
+    async def invoke_api_endpoints_batch(
+        requests: List[Dict[str, Any]],
+        max_concurrency: Optional[int] = None
     ) -> Dict[str, Any]:
+        """Invoke many API endpoints concurrently in a single call.
+        
+        Use this instead of repeated invoke_api_endpoint calls for bulk work
+        (e.g. fetching balances for many accounts):
+        - requests: List of items, each {"endpoint_name": ..., "params": {...}}
+          ("operation_id" may be used instead of "endpoint_name", "fields" projects each result)
+        - max_concurrency: Maximum calls in flight at once (defaults to server setting)
+        
+        Results are returned in request order; a failed item carries its own
+        error and does not affect the others.
         """
-            Create Account
-    Sends a POST request to /accountManagement/account to create an account for a customer.
-    Required:
-    - request_body: JSON body with account creation details
-    Optional Headers:
-    Headers:
-    - entity: string
-        - entity: string
-           entity
-    - languageCode: integer
-        - languageCode: integer
-          languageCode
-    - userId: integer
-        - userId: integer
-          userId
-      
-    """
-    
-       
-        # Prepare request data
-       
-        # Single body parameter - send directly
-        data = request_body if request_body is not None else {}
-     
-        # Prepare query parameters
-        params = {}
-      
-        # Replace path parameters in URL
-        path = "/accountManagement/account"
-      
-        # Prepare headers
-        headers = {}
-        if entity is not None:
-            headers["entity"] = str(entity)
-        if languagecode is not None:
-            headers["languageCode"] = str(languagecode)
-        if userid is not None:
-            headers["userId"] = str(userid)
+        return await invoke_endpoints_batch(requests, max_concurrency)
+
+    @mcp.tool()
+    @instrument_tool
+    async def get_api_cache_stats() -> Dict[str, Any]:
+        """Get response cache statistics (entries, bytes, hits, misses, hit ratio, evictions)
+        and request coalescing counters.
         
-        return await make_api_request(
-            "POST", 
-            path, 
-            data=data, 
-            params=params if params else None, 
-            headers=headers if headers else None
-        )
-   # registered_funcs.append(create_acnt_actv_using_post)
-  
+        Use this to tune per-endpoint cache TTLs.
+        """
+        return {
+            "enabled": CACHE_ENABLED,
+            **RESPONSE_CACHE.stats(),
+            "coalescing": {"enabled": COALESCE_ENABLED, **SINGLE_FLIGHT.stats()}
+        }
+
     @mcp.tool()
-    async def cbpetget_account_balance_using_get(
-            accountReference: str
-          
-        ) -> Dict[str, Any]:
-            """
-            Fetch Account Balance Details
-            
-            Generated from: GET /accountManagement/account/balanceDetails/{accountReference}
-            Source: swagger_2_0
-            Operation ID: CBPETGetAccountBalanceUsingGET
-            
-            
-            Authentication: Not required
-            
-            Parameters:
-            - accountReference: string (required)
-              Enter the Account Reference
-            Optional Headers:
-            - userId: integer
-              userId
-            
-            
-            """
-            
-            
-            # Prepare query parameters
-            params = {}
-            
-            
-            # Replace path parameters in URL
-            path = "/accountManagement/account/balanceDetails/{accountReference}"
-            print(f"Path before replacement: {path}")
-            if accountReference is not None:
-                path = path.replace("{accountReference}", str(accountReference))
-            print(f"Path after replacement: {path}")
-            
-            # Prepare headers
-            headers = {}
-          
-            headers["entity"] = "GPRDTTSTOU"
-            headers["languageCode"] = "1"
-            headers["userId"] = "1"            
-            print(f"Making API request: GET {path}")
-            print(f"Query params: {params}") 
-            return await make_api_request(
-                "GET", 
-                path, 
-                
-                params=params if params else None, 
-                headers=headers if headers else None
-            )
-    registered_funcs.append(cbpetget_account_balance_using_get)
+    @instrument_tool
+    async def get_api_metrics(format: str = "json") -> Dict[str, Any]:
+        """Get server metrics: per-tool latency histograms (p50/p90/p99), time split into
+        validation / connection wait / backend I/O, status-code counters per endpoint,
+        in-flight gauges, and cache, coalescing, pool, limiter, retry and circuit breaker stats.
+        
+        - format: "json" (default) or "prometheus" for the Prometheus text exposition format
+        """
+        if format.lower() == "prometheus":
+            return {"content_type": "text/plain; version=0.0.4", "data": METRICS.render_prometheus()}
+        return METRICS.snapshot()
+
+    @mcp.tool()
+    @instrument_tool
+    async def get_server_health() -> Dict[str, Any]:
+        """Liveness of the tool server process: status, pid, uptime and tool calls in flight."""
+        return server_health()
+
+    @mcp.tool()
+    @instrument_tool
+    async def get_server_readiness() -> Dict[str, Any]:
+        """Whether the tool server can take traffic (started, not draining, catalog loaded,
+        HTTP pool open), plus any endpoint groups whose circuit breaker is open.
+        """
+        return server_readiness()
+
+    # Register one typed tool per catalog endpoint (generated from the spec)
+    for endpoint_name in typed_tool_names():
+        tool_fn = build_endpoint_tool(endpoint_name, API_CATALOG[endpoint_name])
+        mcp.add_tool(instrument_tool(tool_fn), name=endpoint_name, description=tool_fn.__doc__)
+        registered_funcs.append(tool_fn)
+    if not registered_funcs:
+        # No typed tools (the default with a spec): callers discover and invoke endpoints generically
+        registered_funcs.extend([list_api_endpoints, get_api_endpoint_schema, invoke_api_endpoint])
     return registered_funcs
-@mcp.tool()
-async def account_balance_using_get(
-            accountReference: str
-          
-        ) -> Dict[str, Any]:
-            """
-            Fetch Account Balance Details
-            
-            Generated from: GET /accountManagement/account/balanceDetails/{accountReference}
-            Source: swagger_2_0
-            Operation ID: CBPETGetAccountBalanceUsingGET
-            
-            
-            Authentication: Not required
-            
-            Parameters:
-            - accountReference: string (required)
-              Enter the Account Reference
-            Optional Headers:
-            - userId: integer
-              userId
-            
-            
-            """
-            
-            
-            # Prepare query parameters
-            params = {}
-            
-            
-            # Replace path parameters in URL
-            path = "/accountManagement/account/balanceDetails/{accountReference}"
-            print(f"Path before replacement: {path}")
-            if accountReference is not None:
-                path = path.replace("{accountReference}", str(accountReference))
-            print(f"Path after replacement: {path}")
-            
-            # Prepare headers
-            headers = {}
-          
-            headers["entity"] = "GPRDTTSTOU"
-            headers["languageCode"] = "1"
-            headers["userId"] = "1"            
-            print(f"Making API request: GET {path}")
-            print(f"Query params: {params}") 
-            return await make_api_request(
-                "GET", 
-                path, 
-                
-                params=params if params else None, 
-                headers=headers if headers else None
-            )
+
+def create_app():
+    """Build the ASGI app for one HTTP worker (uvicorn factory).
+
+    Runs once per worker process: tools are registered, and the worker
+    lifespan opens the HTTP pool at startup and closes it after draining,
+    instead of per session. Adds /healthz, /readyz and /metrics routes for
+    load balancers and Prometheus.
+    """
+    configure_logging()
+    register_bancs_tools(mcp)
+    WORKER_STATE["app_managed"] = True
+
+    @mcp.custom_route("/healthz", methods=["GET"])
+    async def healthz(request: Request) -> JSONResponse:
+        return JSONResponse(server_health())
+
+    @mcp.custom_route("/readyz", methods=["GET"])
+    async def readyz(request: Request) -> JSONResponse:
+        readiness = server_readiness()
+        return JSONResponse(readiness, status_code=200 if readiness["ready"] else 503)
+
+    @mcp.custom_route("/metrics", methods=["GET"])
+    async def metrics(request: Request) -> PlainTextResponse:
+        return PlainTextResponse(METRICS.render_prometheus(), media_type="text/plain; version=0.0.4")
+
+    app = mcp.sse_app() if MCP_SERVER_TRANSPORT == "sse" else mcp.streamable_http_app()
+    session_lifespan = app.router.lifespan_context
+
+    @asynccontextmanager
+    async def lifespan(app):
+        async with worker_lifespan():
+            async with session_lifespan(app):
+                try:
+                    yield
+                finally:
+                    # Uvicorn has stopped accepting connections; let running tool calls finish
+                    WORKER_STATE["draining"] = True
+                    await drain_in_flight(MCP_DRAIN_TIMEOUT)
+
+    app.router.lifespan_context = lifespan
+    return app
+
+def serve() -> None:
+    """Run the server over stdio, or over HTTP with MCP_WORKERS worker processes."""
+    if MCP_SERVER_TRANSPORT == "stdio":
+        configure_logging()
+        register_bancs_tools(mcp)
+        mcp.run(transport="stdio")
+        return
+    if MCP_SERVER_TRANSPORT not in ("sse", "streamable-http"):
+        raise SystemExit(f"Unknown MCP_SERVER_TRANSPORT {MCP_SERVER_TRANSPORT!r}: use stdio, sse or streamable-http")
+    if MCP_SERVER_TRANSPORT == "sse" and MCP_WORKERS > 1:
+        raise SystemExit("SSE sessions live in one worker's memory; use streamable-http for MCP_WORKERS > 1")
+    import uvicorn
+    uvicorn.run(
+        "mcp_tools_api:create_app",
+        factory=True,
+        host=MCP_HOST,
+        port=MCP_PORT,
+        workers=MCP_WORKERS,
+        timeout_graceful_shutdown=MCP_DRAIN_TIMEOUT,
+        log_config=None
+    )
+
 if __name__ == "__main__":
-    mcp.run(transport="stdio")
\ No newline at end of file
+    serve()
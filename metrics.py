@@ -0,0 +1,250 @@
+import math
+import time
+import asyncio
+import logging
+import functools
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+logger = logging.getLogger(__name__)
+
+# Sub-buckets per power of two; 32 keeps the relative error of percentiles around 3%
+SUB_BUCKETS = 32
+# Bucket bounds (seconds) used when exporting histograms in Prometheus format
+PROMETHEUS_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0
+)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    """HDR-style log-linear latency histogram with bounded relative error.
+
+    Values (seconds) fall into buckets that subdivide each power of two into
+    SUB_BUCKETS linear steps, so memory stays small while percentiles stay
+    accurate across microseconds to minutes.
+    """
+
+    def __init__(self):
+        self.buckets: Dict[Tuple[int, int], int] = defaultdict(int)
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    def record(self, value: float) -> None:
+        value = max(value, 1e-9)
+        mantissa, exponent = math.frexp(value)
+        self.buckets[(exponent, int((mantissa * 2 - 1) * SUB_BUCKETS))] += 1
+        self.count += 1
+        self.total += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    @staticmethod
+    def _upper_bound(key: Tuple[int, int]) -> float:
+        exponent, sub = key
+        return math.ldexp(0.5 * (1 + (sub + 1) / SUB_BUCKETS), exponent)
+
+    def percentile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+        target = max(1, math.ceil(q / 100 * self.count))
+        seen = 0
+        for key in sorted(self.buckets):
+            seen += self.buckets[key]
+            if seen >= target:
+                return min(self._upper_bound(key), self.max)
+        return self.max
+
+    def cumulative(self, bounds: Tuple[float, ...]) -> List[int]:
+        """Cumulative counts at each bound (for Prometheus `le` buckets)."""
+        ordered = sorted((self._upper_bound(k), c) for k, c in self.buckets.items())
+        counts = []
+        seen = 0
+        i = 0
+        for bound in bounds:
+            while i < len(ordered) and ordered[i][0] <= bound:
+                seen += ordered[i][1]
+                i += 1
+            counts.append(seen)
+        return counts
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "mean": round(self.total / self.count, 6) if self.count else 0.0,
+            "min": round(self.min, 6) if self.count else 0.0,
+            "p50": round(self.percentile(50), 6),
+            "p90": round(self.percentile(90), 6),
+            "p99": round(self.percentile(99), 6),
+            "max": round(self.max, 6)
+        }
+
+
+def _labels(labels: Dict[str, Any]) -> Labels:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+class MetricsRegistry:
+    """In-process registry of histograms, counters, gauges and stats collectors."""
+
+    def __init__(self):
+        self.histograms: Dict[str, Dict[Labels, Histogram]] = defaultdict(dict)
+        self.counters: Dict[str, Dict[Labels, float]] = defaultdict(lambda: defaultdict(float))
+        self.gauges: Dict[str, Dict[Labels, float]] = defaultdict(lambda: defaultdict(float))
+        self.collectors: Dict[str, Callable[[], Dict[str, Any]]] = {}
+        self.started = time.time()
+
+    def observe(self, name: str, value: float, **labels: Any) -> None:
+        key = _labels(labels)
+        histogram = self.histograms[name].get(key)
+        if histogram is None:
+            histogram = self.histograms[name][key] = Histogram()
+        histogram.record(value)
+
+    def inc(self, name: str, amount: float = 1, **labels: Any) -> None:
+        self.counters[name][_labels(labels)] += amount
+
+    def gauge_add(self, name: str, amount: float, **labels: Any) -> None:
+        self.gauges[name][_labels(labels)] += amount
+
+    def register_collector(self, name: str, collector: Callable[[], Dict[str, Any]]) -> None:
+        """Register a callable returning a stats dict, sampled at snapshot/export time."""
+        self.collectors[name] = collector
+
+    def _collect(self) -> Dict[str, Any]:
+        stats = {}
+        for name, collector in self.collectors.items():
+            try:
+                stats[name] = collector()
+            except Exception as e:
+                stats[name] = {"error": str(e)}
+        return stats
+
+    def snapshot(self) -> Dict[str, Any]:
+        """All metrics as a JSON-friendly dict."""
+        def label_str(labels: Labels) -> str:
+            return ",".join(f"{k}={v}" for k, v in labels) or "all"
+
+        return {
+            "uptime_seconds": round(time.time() - self.started, 1),
+            "histograms": {
+                name: {label_str(k): h.summary() for k, h in series.items()}
+                for name, series in self.histograms.items()
+            },
+            "counters": {
+                name: {label_str(k): v for k, v in series.items()}
+                for name, series in self.counters.items()
+            },
+            "gauges": {
+                name: {label_str(k): v for k, v in series.items()}
+                for name, series in self.gauges.items()
+            },
+            **self._collect()
+        }
+
+    def render_prometheus(self, prefix: str = "bancs_mcp") -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+        def fmt(labels: Labels, extra: Optional[Tuple[str, str]] = None) -> str:
+            items = list(labels) + ([extra] if extra else [])
+            if not items:
+                return ""
+            return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in items) + "}"
+
+        lines = []
+        for name, series in self.histograms.items():
+            metric = f"{prefix}_{name}"
+            lines.append(f"# TYPE {metric} histogram")
+            for labels, histogram in series.items():
+                for bound, count in zip(PROMETHEUS_BUCKETS, histogram.cumulative(PROMETHEUS_BUCKETS)):
+                    lines.append(f"{metric}_bucket{fmt(labels, ('le', repr(bound)))} {count}")
+                lines.append(f"{metric}_bucket{fmt(labels, ('le', '+Inf'))} {histogram.count}")
+                lines.append(f"{metric}_sum{fmt(labels)} {histogram.total}")
+                lines.append(f"{metric}_count{fmt(labels)} {histogram.count}")
+        for name, series in self.counters.items():
+            metric = f"{prefix}_{name}"
+            lines.append(f"# TYPE {metric} counter")
+            for labels, value in series.items():
+                lines.append(f"{metric}{fmt(labels)} {value}")
+        for name, series in self.gauges.items():
+            metric = f"{prefix}_{name}"
+            lines.append(f"# TYPE {metric} gauge")
+            for labels, value in series.items():
+                lines.append(f"{metric}{fmt(labels)} {value}")
+        # Numeric collector stats are exported as gauges
+        for name, stats in self._collect().items():
+            for key, value in _flatten(stats):
+                if isinstance(value, bool) or not isinstance(value, (int, float)):
+                    continue
+                lines.append(f"{prefix}_{name}_{key} {value}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _flatten(stats: Dict[str, Any], parent: str = "") -> List[Tuple[str, Any]]:
+    items = []
+    for key, value in stats.items():
+        name = f"{parent}_{key}" if parent else str(key)
+        name = "".join(c if c.isalnum() else "_" for c in name)
+        if isinstance(value, dict):
+            items.extend(_flatten(value, name))
+        else:
+            items.append((name, value))
+    return items
+
+
+METRICS = MetricsRegistry()
+
+
+def instrument_tool(fn: Callable) -> Callable:
+    """Record latency, outcome and in-flight count for an async MCP tool."""
+    name = fn.__name__
+
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        METRICS.gauge_add("tool_in_flight", 1, tool=name)
+        outcome = "error"
+        try:
+            result = await fn(*args, **kwargs)
+            outcome = "error" if isinstance(result, dict) and result.get("error") is True else "ok"
+            return result
+        finally:
+            METRICS.gauge_add("tool_in_flight", -1, tool=name)
+            METRICS.observe("tool_duration_seconds", time.perf_counter() - started, tool=name)
+            METRICS.inc("tool_calls_total", tool=name, outcome=outcome)
+    return wrapper
+
+
+async def start_metrics_server(host: str, port: int) -> asyncio.AbstractServer:
+    """Serve METRICS in Prometheus text format on http://host:port/metrics."""
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), 5)
+            while (await asyncio.wait_for(reader.readline(), 5)) not in (b"\r\n", b"\n", b""):
+                pass
+            parts = request_line.decode("latin-1").split()
+            if len(parts) >= 2 and parts[1].split("?")[0] == "/metrics":
+                body = METRICS.render_prometheus().encode()
+                status = "200 OK"
+            else:
+                body = b"not found\n"
+                status = "404 Not Found"
+            writer.write(
+                f"HTTP/1.1 {status}\r\nContent-Type: text/plain; version=0.0.4\r\n"
+                f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body
+            )
+            await writer.drain()
+        except Exception as e:
+            logger.debug("Metrics request failed: %s", e)
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(handle, host, port)
+    logger.info("Prometheus metrics exporter listening on http://%s:%d/metrics", host, port)
+    return server
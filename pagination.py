@@ -0,0 +1,178 @@
+import asyncio
+from dataclasses import dataclass, fields
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+STRATEGIES = ("page", "offset", "cursor")
+
+
+def get_path(data: Any, path: str) -> Any:
+    """Resolve a simple JSON path like "$" or "$.data.accounts"; None if any step is missing."""
+    for key in path.lstrip("$").strip(".").split("."):
+        if not key:
+            continue
+        if not isinstance(data, dict):
+            return None
+        data = data.get(key)
+    return data
+
+
+@dataclass(frozen=True)
+class PaginationStrategy:
+    """How a list endpoint pages its results.
+
+    page:   page_param counts pages from start_page, size_param carries page_size
+    offset: offset_param counts records from 0, size_param carries page_size
+    cursor: cursor_param carries the value found at next_cursor_path in the previous page
+    Records are read from records_path; total_path (optional) gives the overall record count.
+    """
+    strategy: str
+    records_path: str = "$"
+    page_size: int = 50
+    size_param: Optional[str] = "size"
+    page_param: str = "page"
+    start_page: int = 1
+    offset_param: str = "offset"
+    cursor_param: str = "cursor"
+    next_cursor_path: str = "$.next_cursor"
+    total_path: Optional[str] = None
+
+    @classmethod
+    def from_catalog(cls, settings: Dict[str, Any]) -> "PaginationStrategy":
+        """Build from a catalog "pagination" entry; ValueError if the strategy is unknown."""
+        if settings.get("strategy") not in STRATEGIES:
+            raise ValueError(f"Unknown pagination strategy {settings.get('strategy')!r}, expected one of {STRATEGIES}")
+        known = {f.name for f in fields(cls)}
+        values = {k: v for k, v in settings.items() if k in known}
+        for key in ("page_size", "start_page"):
+            if key in values:
+                values[key] = int(values[key])
+        return cls(**values)
+
+    def param_names(self) -> List[str]:
+        """Request parameters this strategy sets."""
+        names = {"page": [self.page_param], "offset": [self.offset_param], "cursor": [self.cursor_param]}[self.strategy]
+        return names + ([self.size_param] if self.size_param else [])
+
+    def first_params(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        first = dict(params)
+        if self.size_param:
+            first.setdefault(self.size_param, self.page_size)
+        if self.strategy == "page":
+            first.setdefault(self.page_param, self.start_page)
+        elif self.strategy == "offset":
+            first.setdefault(self.offset_param, 0)
+        return first
+
+    def next_params(self, params: Dict[str, Any], page: Any, records: List[Any], seen: int) -> Optional[Dict[str, Any]]:
+        """Parameters for the page after `page`, or None if it was the last one."""
+        if not records:
+            return None
+        if self.total_path:
+            total = get_path(page, self.total_path)
+            if isinstance(total, int) and seen >= total:
+                return None
+        size = int(params.get(self.size_param, self.page_size)) if self.size_param else self.page_size
+        following = dict(params)
+        if self.strategy == "cursor":
+            cursor = get_path(page, self.next_cursor_path)
+            if not cursor:
+                return None
+            following[self.cursor_param] = cursor
+            return following
+        if len(records) < size:
+            return None
+        if self.strategy == "page":
+            following[self.page_param] = int(params[self.page_param]) + 1
+        else:
+            following[self.offset_param] = int(params[self.offset_param]) + len(records)
+        return following
+
+
+class PageError(Exception):
+    """A page request returned an error result."""
+
+    def __init__(self, page_number: int, result: Dict[str, Any]):
+        super().__init__(result.get("message", "Page request failed"))
+        self.page_number = page_number
+        self.result = result
+
+
+async def iterate_pages(
+    fetch: Callable[[Dict[str, Any]], Awaitable[Any]],
+    strategy: PaginationStrategy,
+    params: Dict[str, Any],
+    max_pages: int
+) -> AsyncIterator[Tuple[List[Any], Dict[str, Any], Optional[Dict[str, Any]]]]:
+    """Yield (records, page_params, next_params) page by page.
+
+    The request for the next page is started before the current page is
+    yielded, so it downloads while the caller processes the current one.
+    Raises PageError when a page comes back as an error result.
+    """
+    current = strategy.first_params(params)
+    pending: Optional["asyncio.Task[Any]"] = asyncio.ensure_future(fetch(current))
+    seen = 0
+    pages = 0
+    try:
+        while pending is not None:
+            page = await pending
+            pending = None
+            pages += 1
+            if isinstance(page, dict) and page.get("error") is True:
+                raise PageError(pages, page)
+            records = get_path(page, strategy.records_path)
+            if not isinstance(records, list):
+                records = []
+            seen += len(records)
+            following = strategy.next_params(current, page, records, seen)
+            if following is not None and pages < max_pages:
+                pending = asyncio.ensure_future(fetch(following))
+            yield records, current, following
+            current = following
+    finally:
+        if pending is not None and not pending.done():
+            pending.cancel()
+
+
+async def fetch_all_pages(
+    fetch: Callable[[Dict[str, Any]], Awaitable[Any]],
+    strategy: PaginationStrategy,
+    params: Dict[str, Any],
+    max_records: int,
+    max_pages: int
+) -> Dict[str, Any]:
+    """Fetch pages until the last one, max_records or max_pages, and merge their records."""
+    records: List[Any] = []
+    pages = 0
+    next_params = None
+    skip_records = 0
+    page_iter = iterate_pages(fetch, strategy, params, max_pages)
+    try:
+        async for page_records, page_params, next_params in page_iter:
+            pages += 1
+            taken = page_records[:max_records - len(records)]
+            records.extend(taken)
+            if len(taken) < len(page_records):
+                # Capped part-way through this page: resume from it, skipping what was returned
+                next_params, skip_records = page_params, len(taken)
+            if len(records) >= max_records:
+                break
+    except PageError as e:
+        return {
+            "error": True,
+            "message": f"Page {e.page_number} failed: {e}",
+            "page_error": e.result,
+            "pages_fetched": pages,
+            "records": records
+        }
+    finally:
+        await page_iter.aclose()
+    return {
+        "records": records,
+        "record_count": len(records),
+        "pages_fetched": pages,
+        "complete": next_params is None,
+        # Parameters to resume from when the result was capped
+        "next_params": next_params,
+        "skip_records": skip_records
+    }
@@ -0,0 +1,182 @@
+import re
+import time
+import json
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+# Values that vary between otherwise identical questions: double-quoted strings, e-mail
+# addresses and any token containing a digit (account references, dates, amounts, counts)
+_SLOT_RE = re.compile(r'"([^"]*)"|([\w.+-]+@[\w-]+\.[\w.-]+)|\b((?=[\w-]*\d)[\w-]+(?:\.\d+)?)\b')
+_SPACE_RE = re.compile(r'\s+')
+_TRAILING_RE = re.compile(r'[\s?.!]+$')
+
+
+def normalize_question(question: str) -> Tuple[str, Tuple[str, ...]]:
+    """Split a question into a template and its slot values.
+
+    e.g. 'Balance of account 100000000000001?' -> ('balance of account {0}', ('100000000000001',))
+    """
+    slots: List[str] = []
+
+    def replace(match: "re.Match[str]") -> str:
+        value = next(group for group in match.groups() if group is not None)
+        if value not in slots:
+            slots.append(value)
+        return "{%d}" % slots.index(value)
+
+    template = _SLOT_RE.sub(replace, question.strip())
+    template = _TRAILING_RE.sub("", _SPACE_RE.sub(" ", template)).lower()
+    return template, tuple(slots)
+
+
+@dataclass(frozen=True)
+class Slot:
+    """Placeholder in a cached plan for the question's slot `index`, converted to `kind`."""
+    index: int
+    kind: str = "str"
+
+
+@dataclass(frozen=True)
+class ToolPlan:
+    """Tool calls that answered a question template, with arguments bound to its slots."""
+    template: str
+    steps: Tuple[Tuple[str, Any], ...]
+
+
+def _parameterize(value: Any, slots: Sequence[str], used: set, observed: str) -> Any:
+    """Replace slot values in tool arguments with Slot placeholders.
+
+    Raises ValueError for a value that came from an earlier tool result rather
+    than the question, since replaying it as a constant would be wrong.
+    """
+    if isinstance(value, dict):
+        return {k: _parameterize(v, slots, used, observed) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_parameterize(v, slots, used, observed) for v in value]
+    if isinstance(value, bool) or value is None:
+        return value
+    text = str(value)
+    if text in slots:
+        index = slots.index(text)
+        used.add(index)
+        return Slot(index, type(value).__name__ if isinstance(value, (int, float)) else "str")
+    if len(text) >= 4 and text in observed:
+        raise ValueError(f"Argument {text!r} depends on an earlier tool result")
+    return value
+
+
+def build_plan(
+    template: str,
+    slots: Sequence[str],
+    steps: Sequence[Tuple[str, Dict[str, Any], Any]],
+    context: str = ""
+) -> Optional[ToolPlan]:
+    """Turn an agent run's (tool, kwargs, result) steps into a replayable plan.
+
+    Returns None when the run is not safe to replay: a step failed, an
+    argument was taken from an earlier result or from the conversation
+    context, or a slot of the question was never used (a different value
+    there could have led to a different plan).
+    """
+    if not steps:
+        return None
+    used: set = set()
+    observed = context
+    plan_steps = []
+    for tool_name, kwargs, result in steps:
+        if isinstance(result, dict) and result.get("error") is True:
+            return None
+        try:
+            plan_steps.append((tool_name, _parameterize(kwargs, slots, used, observed)))
+        except ValueError:
+            return None
+        observed += json.dumps(result, default=str)
+    if len(used) != len(slots):
+        return None
+    return ToolPlan(template, tuple(plan_steps))
+
+
+def _bind(value: Any, slots: Sequence[str]) -> Any:
+    if isinstance(value, Slot):
+        text = slots[value.index]
+        if value.kind == "int":
+            return int(text)
+        if value.kind == "float":
+            return float(text)
+        return text
+    if isinstance(value, dict):
+        return {k: _bind(v, slots) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_bind(v, slots) for v in value]
+    return value
+
+
+def bind_plan(plan: ToolPlan, slots: Sequence[str]) -> List[Tuple[str, Dict[str, Any]]]:
+    """Fill a cached plan's slots with the values of a new question; ValueError if they don't fit."""
+    return [(tool_name, _bind(kwargs, slots)) for tool_name, kwargs in plan.steps]
+
+
+class PlanCache:
+    """Bounded TTL + LRU cache of tool plans keyed by normalized question template.
+
+    Plans reference tools by name, so the whole cache is dropped when the tool
+    catalog changes: call set_catalog_version() with a fingerprint of the
+    current tools, or invalidate() from a change notification.
+    """
+
+    def __init__(self, max_entries: int = 256, ttl: float = 3600):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.catalog_version: Optional[str] = None
+        self._entries: "OrderedDict[str, Tuple[float, ToolPlan]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, template: str) -> Optional[ToolPlan]:
+        entry = self._entries.get(template)
+        if entry is None or entry[0] <= time.monotonic():
+            if entry is not None:
+                del self._entries[template]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(template)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, plan: ToolPlan) -> None:
+        if self.ttl <= 0 or self.max_entries <= 0:
+            return
+        self._entries.pop(plan.template, None)
+        self._entries[plan.template] = (time.monotonic() + self.ttl, plan)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def discard(self, template: str) -> None:
+        self._entries.pop(template, None)
+
+    def invalidate(self) -> None:
+        self._entries.clear()
+        self.invalidations += 1
+
+    def set_catalog_version(self, version: str) -> None:
+        """Record the tool catalog fingerprint; a different one drops every cached plan."""
+        if self.catalog_version is not None and version != self.catalog_version:
+            self.invalidate()
+        self.catalog_version = version
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations
+        }
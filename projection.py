@@ -0,0 +1,108 @@
+import re
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Optional, Tuple, Union
+
+# Array steps in a path; arrays are traversed implicitly, so "[*]" / "[]" only document intent
+_ARRAY_STEP_RE = re.compile(r'\[(\*?)\]')
+
+# Projection tree: key -> subtree, where None keeps the whole value
+FieldTree = Dict[str, Optional["FieldTree"]]
+
+
+def parse_fields(fields: Union[str, Iterable[str], None]) -> Tuple[str, ...]:
+    """Normalise a fields argument ("a,b.c" or ["a", "b.c"]) into a tuple of paths."""
+    if not fields:
+        return ()
+    if isinstance(fields, str):
+        fields = fields.split(",")
+    return tuple(f.strip() for f in fields if f and f.strip())
+
+
+@lru_cache(maxsize=256)
+def compile_fields(fields: Tuple[str, ...]) -> Optional[FieldTree]:
+    """Compile JSONPath-style field paths into a projection tree.
+
+    Accepts "accountId", "$.balances.amount" or "$.transactions[*].amount";
+    lists are projected element-wise. Returns None when nothing is to be
+    projected ("*" or no fields). Raises ValueError for index or filter steps.
+    """
+    if not fields or "*" in fields or "$" in fields:
+        return None
+    tree: FieldTree = {}
+    for path in fields:
+        steps = path[1:] if path.startswith("$") else path
+        if "[" in _ARRAY_STEP_RE.sub("", steps):
+            raise ValueError(f"Unsupported field path '{path}': only [*] array steps are allowed")
+        keys = [k for k in _ARRAY_STEP_RE.sub("", steps).split(".") if k]
+        if not keys:
+            continue
+        node = tree
+        for key in keys[:-1]:
+            if key in node and node[key] is None:
+                break
+            node = node.setdefault(key, {})
+        else:
+            # A shorter path keeps the whole value, overriding deeper ones
+            node[keys[-1]] = None
+    return tree
+
+
+def project(data: Any, tree: Optional[FieldTree]) -> Any:
+    """Return a copy of data with only the fields in the projection tree."""
+    if tree is None:
+        return data
+    if isinstance(data, list):
+        return [project(item, tree) for item in data]
+    if isinstance(data, dict):
+        return {key: project(data[key], subtree) for key, subtree in tree.items() if key in data}
+    return data
+
+
+def slim(data: Any) -> Any:
+    """Return a copy of data without null values and empty arrays or objects inside objects."""
+    if isinstance(data, list):
+        return [slim(item) for item in data]
+    if isinstance(data, dict):
+        slimmed = {}
+        for key, value in data.items():
+            value = slim(value)
+            if value is None or (isinstance(value, (list, dict)) and not value):
+                continue
+            slimmed[key] = value
+        return slimmed
+    return data
+
+
+def copy_json(data: Any) -> Any:
+    """Return a copy of JSON data with new dicts and lists (scalars are immutable and shared)."""
+    if isinstance(data, list):
+        return [copy_json(item) for item in data]
+    if isinstance(data, dict):
+        return {key: copy_json(value) for key, value in data.items()}
+    return data
+
+
+def relative_to(fields: Tuple[str, ...], records_path: str) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+    """Rewrite response-level paths under records_path to be relative to each record.
+
+    Returns (relative paths, ignored paths). Paths without "$" that are not
+    under records_path are taken as record-relative already; "$" paths
+    outside records_path cannot apply to a record and are ignored.
+    """
+    prefix = records_path[1:] if records_path.startswith("$") else records_path
+    prefix = prefix.strip(".")
+    if not prefix:
+        return fields, ()
+    relative = []
+    ignored = []
+    for path in fields:
+        steps = _ARRAY_STEP_RE.sub("", path[1:] if path.startswith("$") else path).strip(".")
+        if steps == prefix:
+            return (), tuple(ignored)
+        if steps.startswith(prefix + "."):
+            relative.append(steps[len(prefix) + 1:])
+        elif path.startswith("$"):
+            ignored.append(path)
+        else:
+            relative.append(path)
+    return tuple(relative), tuple(ignored)
@@ -0,0 +1,352 @@
+import time
+import random
+import asyncio
+from collections import deque
+from dataclasses import dataclass, replace
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Dict, FrozenSet, Hashable, Optional, Tuple
+
+
+class SingleFlight:
+    """Coalesce concurrent identical calls so that only one runs at a time.
+
+    The first caller for a key starts the call; callers arriving while it is
+    in flight await the same result (or exception). The shared call runs as
+    its own task, so a cancelled waiter does not cancel it for the others.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, "asyncio.Task[Any]"] = {}
+        self.leaders = 0
+        self.shared = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        loop = asyncio.get_running_loop()
+        task = self._calls.get(key)
+        if task is not None and not task.done() and task.get_loop() is loop:
+            self.shared += 1
+        else:
+            task = loop.create_task(fn())
+            self._calls[key] = task
+            self.leaders += 1
+            task.add_done_callback(lambda t, key=key: self._finish(key, t))
+        return await asyncio.shield(task)
+
+    def _finish(self, key: Hashable, task: "asyncio.Task[Any]") -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        # Mark the exception as retrieved when every waiter has gone away
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "in_flight": len(self._calls),
+            "leaders": self.leaders,
+            "shared": self.shared
+        }
+
+
+class LimiterRejected(Exception):
+    """Raised when the concurrency limiter cannot admit a call (queue full or wait timed out)."""
+
+    def __init__(self, reason: str, message: str):
+        super().__init__(message)
+        self.reason = reason
+
+
+class AdaptiveLimiter:
+    """AIMD concurrency limiter with a bounded wait queue.
+
+    The limit grows additively (about +1 per limit's worth of healthy calls)
+    and shrinks multiplicatively when a call fails or exceeds latency_target,
+    so throughput settles just below the point where the backend degrades.
+    Calls beyond the limit queue for at most queue_timeout seconds; once
+    max_queue callers are waiting, new calls are rejected immediately.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int = 20,
+        min_limit: int = 1,
+        max_limit: int = 200,
+        max_queue: int = 100,
+        queue_timeout: float = 10.0,
+        latency_target: float = 5.0,
+        backoff_ratio: float = 0.9
+    ):
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.latency_target = latency_target
+        self.backoff_ratio = backoff_ratio
+        self.in_flight = 0
+        self._waiters: "deque[asyncio.Future]" = deque()
+        self.latency_ewma = 0.0
+        self.rejected = 0
+        self.timeouts = 0
+        self.decreases = 0
+
+    async def acquire(self) -> None:
+        if self.in_flight < int(self.limit) and not self._waiters:
+            self.in_flight += 1
+            return
+        if len(self._waiters) >= self.max_queue:
+            self.rejected += 1
+            raise LimiterRejected("queue_full", f"Backend overloaded: {len(self._waiters)} calls already queued")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, self.queue_timeout)
+        except BaseException as e:
+            if waiter.done() and not waiter.cancelled():
+                # A slot was handed over just as we gave up; pass it on
+                self.in_flight -= 1
+                self._wake()
+            elif waiter in self._waiters:
+                self._waiters.remove(waiter)
+            if isinstance(e, asyncio.TimeoutError):
+                self.timeouts += 1
+                raise LimiterRejected(
+                    "queue_timeout", f"Backend overloaded: no capacity within {self.queue_timeout}s"
+                ) from None
+            raise
+        # The slot was handed over by release(); in_flight already counts it
+
+    def release(self, latency: float, ok: bool) -> None:
+        self.latency_ewma = latency if not self.latency_ewma else 0.8 * self.latency_ewma + 0.2 * latency
+        if ok and latency <= self.latency_target:
+            self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+        else:
+            self.limit = max(self.min_limit, self.limit * self.backoff_ratio)
+            self.decreases += 1
+        self.in_flight -= 1
+        self._wake()
+
+    def _wake(self) -> None:
+        """Hand free slots to queued callers in FIFO order."""
+        while self._waiters and self.in_flight < int(self.limit):
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.in_flight += 1
+                waiter.set_result(None)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "limit": round(self.limit, 2),
+            "in_flight": self.in_flight,
+            "queued": len(self._waiters),
+            "latency_ewma": round(self.latency_ewma, 4),
+            "rejected": self.rejected,
+            "queue_timeouts": self.timeouts,
+            "decreases": self.decreases
+        }
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header (delta seconds or HTTP date) into seconds from now."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """When and how often to retry a failed backend call."""
+    max_attempts: int = 3
+    base_delay: float = 0.2
+    max_delay: float = 5.0
+    retry_statuses: FrozenSet[int] = frozenset({429, 502, 503, 504})
+    methods: FrozenSet[str] = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+    def allows_method(self, method: str) -> bool:
+        return self.max_attempts > 1 and method.upper() in self.methods
+
+    def delay(self, attempt: int, retry_after: Optional[float] = None) -> Optional[float]:
+        """Delay before the next attempt: exponential backoff with full jitter.
+
+        A server supplied Retry-After wins; None means it asked us to wait
+        longer than max_delay and the call should not be retried.
+        """
+        if retry_after is not None:
+            return retry_after if retry_after <= self.max_delay else None
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** (attempt - 1))))
+
+    def override(self, settings: Dict[str, Any]) -> "RetryPolicy":
+        """Return a copy with per-endpoint settings from the catalog applied."""
+        changes = {}
+        for key in ("max_attempts", "base_delay", "max_delay"):
+            if key in settings:
+                changes[key] = type(getattr(self, key))(settings[key])
+        if "retry_on_status" in settings:
+            changes["retry_statuses"] = frozenset(int(s) for s in settings["retry_on_status"])
+        if "methods" in settings:
+            changes["methods"] = frozenset(m.upper() for m in settings["methods"])
+        return replace(self, **changes)
+
+
+class RetryBudget:
+    """Token bucket that caps retries to a fraction of overall traffic.
+
+    Every request deposits `ratio` tokens and every retry withdraws one, with
+    a small time-based reserve (min_per_second) so low traffic can still retry.
+    During an outage the bucket drains and retries stop instead of multiplying load.
+    """
+
+    def __init__(self, ratio: float = 0.2, min_per_second: float = 1.0, max_tokens: float = 100.0):
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.max_tokens = max_tokens
+        self.tokens = max_tokens
+        self._updated = time.monotonic()
+        self.retries = 0
+        self.exhausted = 0
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.max_tokens, self.tokens + (now - self._updated) * self.min_per_second)
+        self._updated = now
+
+    def record_request(self) -> None:
+        self._refill()
+        self.tokens = min(self.max_tokens, self.tokens + self.ratio)
+
+    def try_withdraw(self) -> bool:
+        self._refill()
+        if self.tokens >= 1:
+            self.tokens -= 1
+            self.retries += 1
+            return True
+        self.exhausted += 1
+        return False
+
+    def stats(self) -> Dict[str, Any]:
+        self._refill()
+        return {
+            "tokens": round(self.tokens, 2),
+            "retries": self.retries,
+            "exhausted": self.exhausted
+        }
+
+
+class CircuitBreaker:
+    """Error-rate circuit breaker with half-open probing.
+
+    CLOSED: calls flow; outcomes within the last `window` seconds are tracked
+    and the circuit opens once at least min_calls were seen and the failure
+    ratio reaches failure_threshold. OPEN: calls are rejected immediately for
+    open_duration seconds. HALF_OPEN: up to half_open_probes calls are let
+    through; if they all succeed the circuit closes, any failure re-opens it.
+    """
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: float = 0.5,
+        min_calls: int = 10,
+        window: float = 30.0,
+        open_duration: float = 30.0,
+        half_open_probes: int = 1
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.min_calls = min_calls
+        self.window = window
+        self.open_duration = open_duration
+        self.half_open_probes = half_open_probes
+        self.state = self.CLOSED
+        self._outcomes: "deque[Tuple[float, bool]]" = deque()
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+        self.rejected = 0
+        self.trips = 0
+
+    def allow(self) -> Optional[str]:
+        """Admit a call; returns the state it was admitted under, or None if rejected."""
+        if self.state == self.OPEN:
+            if time.monotonic() - self._opened_at < self.open_duration:
+                self.rejected += 1
+                return None
+            self.state = self.HALF_OPEN
+            self._probes_in_flight = 0
+            self._probe_successes = 0
+        if self.state == self.HALF_OPEN:
+            if self._probes_in_flight >= self.half_open_probes:
+                self.rejected += 1
+                return None
+            self._probes_in_flight += 1
+        return self.state
+
+    def record(self, admitted: str, ok: Optional[bool]) -> None:
+        """Record the outcome of an admitted call; ok=None means it was abandoned (e.g. cancelled)."""
+        if admitted == self.HALF_OPEN:
+            if self.state != self.HALF_OPEN:
+                return
+            self._probes_in_flight = max(0, self._probes_in_flight - 1)
+            if ok is None:
+                return
+            if not ok:
+                self._trip()
+            else:
+                self._probe_successes += 1
+                if self._probe_successes >= self.half_open_probes:
+                    self._close()
+            return
+        if ok is None or self.state != self.CLOSED:
+            return
+
+        now = time.monotonic()
+        self._outcomes.append((now, ok))
+        self._failures += not ok
+        while self._outcomes and self._outcomes[0][0] < now - self.window:
+            _, old_ok = self._outcomes.popleft()
+            self._failures -= not old_ok
+        if len(self._outcomes) >= self.min_calls and self._failures / len(self._outcomes) >= self.failure_threshold:
+            self._trip()
+
+    def retry_in(self) -> float:
+        """Seconds until an open circuit starts letting probes through."""
+        if self.state != self.OPEN:
+            return 0.0
+        return max(0.0, self.open_duration - (time.monotonic() - self._opened_at))
+
+    def _trip(self) -> None:
+        self.state = self.OPEN
+        self._opened_at = time.monotonic()
+        self.trips += 1
+
+    def _close(self) -> None:
+        self.state = self.CLOSED
+        self._outcomes.clear()
+        self._failures = 0
+
+    def stats(self) -> Dict[str, Any]:
+        calls = len(self._outcomes)
+        return {
+            "state": self.state,
+            "calls_in_window": calls,
+            "failure_ratio": round(self._failures / calls, 4) if calls else 0.0,
+            "retry_in": round(self.retry_in(), 2),
+            "rejected": self.rejected,
+            "trips": self.trips
+        }
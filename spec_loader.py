@@ -0,0 +1,251 @@
+import os
+import re
+import json
+import hashlib
+import logging
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+try:
+    import yaml
+except ImportError:
+    yaml = None
+logger = logging.getLogger(__name__)
+
+# Bump when the compiled catalog format changes so stale caches are rebuilt
+LOADER_VERSION = 6
+HTTP_METHODS = ("get", "put", "post", "delete", "options", "head", "patch")
+
+
+def operation_name(operation_id: str) -> str:
+    """Convert an operationId into a tool name.
+
+    e.g. CBPETGetAccountBalanceUsingGET -> cbpetget_account_balance_using_get
+    """
+    name = re.sub(r'([a-z0-9])([A-Z])', r'\1_\2', operation_id.strip())
+    name = re.sub(r'[^a-zA-Z0-9_]+', '_', name).strip('_').lower()
+    name = re.sub(r'_+', '_', name)
+    if name and name[0].isdigit():
+        name = f'op_{name}'
+    return name
+
+
+def build_indexes(catalog: Dict[str, Dict[str, Any]]) -> Tuple[Dict[str, List[str]], Dict[str, str]]:
+    """Build the tag index and operation ID index for a catalog."""
+    tag_index = defaultdict(list)
+    operation_id_index = {}
+    for endpoint_name, endpoint_info in catalog.items():
+        for tag in endpoint_info.get("tags") or ["untagged"]:
+            tag_index[tag.lower()].append(endpoint_name)
+        if "operation_id" in endpoint_info:
+            operation_id_index[endpoint_info["operation_id"]] = endpoint_name
+    return dict(tag_index), operation_id_index
+
+
+def _read_spec(raw: bytes, spec_path: str) -> Dict[str, Any]:
+    if spec_path.lower().endswith((".yaml", ".yml")):
+        if yaml is None:
+            raise RuntimeError(f"PyYAML is required to load {spec_path}; install it or convert the spec to JSON")
+        return yaml.safe_load(raw)
+    return json.loads(raw)
+
+
+def _resolve(spec: Dict[str, Any], node: Dict[str, Any]) -> Dict[str, Any]:
+    """Resolve a local JSON reference such as #/parameters/entity."""
+    seen = 0
+    while isinstance(node, dict) and "$ref" in node and seen < 20:
+        ref = node["$ref"]
+        if not ref.startswith("#/"):
+            return node
+        target = spec
+        for part in ref[2:].split("/"):
+            target = target.get(part.replace("~1", "/").replace("~0", "~"), {})
+        node = target
+        seen += 1
+    return node
+
+
+def _schema_type(schema: Dict[str, Any]) -> str:
+    if not schema:
+        return "any"
+    if "$ref" in schema:
+        return "object"
+    return schema.get("type", "object" if "properties" in schema else "any")
+
+
+def _convert_parameter(spec: Dict[str, Any], raw_param: Dict[str, Any], openapi3: bool) -> Optional[Dict[str, Any]]:
+    param = _resolve(spec, raw_param)
+    location = param.get("in")
+    if location == "cookie":
+        return None
+    if location == "formData":
+        location = "body"
+    schema = _resolve(spec, param.get("schema", {})) if openapi3 else param
+    converted = {
+        "name": param["name"],
+        "type": _schema_type(schema),
+        "location": location,
+        "required": bool(param.get("required", location == "path")),
+        "description": (param.get("description") or "").strip()
+    }
+    example = param.get("example", param.get("x-example", schema.get("example")))
+    if example is not None:
+        converted["example"] = example
+    for key in ("pattern", "enum", "default", "format"):
+        if key in schema:
+            converted[key] = schema[key]
+    return converted
+
+
+def _body_parameter(spec: Dict[str, Any], operation: Dict[str, Any], openapi3: bool) -> Optional[Dict[str, Any]]:
+    """Convert a Swagger 2.0 body parameter or OpenAPI 3 requestBody to a request_body parameter."""
+    if openapi3:
+        request_body = _resolve(spec, operation.get("requestBody", {}))
+        if not request_body:
+            return None
+        content = request_body.get("content", {})
+        media = content.get("application/json") or next(iter(content.values()), {})
+        schema = media.get("schema", {})
+        description = request_body.get("description", "")
+        required = bool(request_body.get("required", False))
+        example = media.get("example")
+    else:
+        body = next((
+            _resolve(spec, p) for p in operation.get("parameters", [])
+            if _resolve(spec, p).get("in") == "body"
+        ), None)
+        if body is None:
+            return None
+        schema = body.get("schema", {})
+        description = body.get("description", "")
+        required = bool(body.get("required", False))
+        example = body.get("x-example")
+    param = {
+        "name": "request_body",
+        "type": _schema_type(_resolve(spec, schema)),
+        "location": "body",
+        "required": required,
+        "description": (description or "input").strip()
+    }
+    if "$ref" in schema:
+        param["schema_ref"] = schema["$ref"].rsplit("/", 1)[-1]
+    if example is not None:
+        param["example"] = example
+    return param
+
+
+def parse_spec(spec: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """Build an API_CATALOG style dict from a Swagger 2.0 or OpenAPI 3 document."""
+    openapi3 = str(spec.get("openapi", "")).startswith("3")
+    source = "openapi_3" if openapi3 else "swagger_2_0"
+    global_security = spec.get("security")
+    catalog = {}
+
+    for path, path_item in (spec.get("paths") or {}).items():
+        path_item = _resolve(spec, path_item)
+        shared_params = path_item.get("parameters", [])
+        for method in HTTP_METHODS:
+            operation = path_item.get(method)
+            if not operation:
+                continue
+
+            # Operation level parameters override path level ones with the same name/location
+            merged = {}
+            for raw_param in shared_params + operation.get("parameters", []):
+                param = _resolve(spec, raw_param)
+                if param.get("in") == "body":
+                    continue
+                merged[(param.get("name"), param.get("in"))] = raw_param
+            parameters = [
+                p for p in (_convert_parameter(spec, raw, openapi3) for raw in merged.values()) if p
+            ]
+            body = _body_parameter(spec, operation, openapi3)
+            if body:
+                parameters.append(body)
+
+            operation_id = operation.get("operationId") or f"{method}_{path}"
+            name = operation_name(operation_id)
+            if name in catalog:
+                name = f"{name}_{method}"
+            suffix = 2
+            base_name = name
+            while name in catalog:
+                name = f"{base_name}_{suffix}"
+                suffix += 1
+
+            security = operation.get("security", global_security)
+            catalog[name] = {
+                "method": method.upper(),
+                "path": path,
+                "description": (operation.get("summary") or operation.get("description") or name).strip(),
+                "tags": operation.get("tags") or ["untagged"],
+                "deprecated": bool(operation.get("deprecated", False)),
+                "auth_required": bool(security),
+                "operation_id": operation_id,
+                "source": source,
+                "parameters": parameters
+            }
+            # Optional response cache TTL (seconds) for idempotent operations
+            if "x-cache-ttl" in operation:
+                catalog[name]["cache_ttl"] = float(operation["x-cache-ttl"])
+            # Optional retry policy override, e.g. {"max_attempts": 5, "retry_on_status": [503]}
+            if isinstance(operation.get("x-retry"), dict):
+                catalog[name]["retry"] = operation["x-retry"]
+            # Optional streaming window for large responses, e.g. {"records_path": "$.transactions"}
+            if isinstance(operation.get("x-stream"), dict):
+                catalog[name]["stream"] = operation["x-stream"]
+            # Optional paging strategy for list endpoints, e.g. {"strategy": "page", "records_path": "$.accounts"}
+            if isinstance(operation.get("x-pagination"), dict):
+                catalog[name]["pagination"] = operation["x-pagination"]
+            # Optional default projection of the response, e.g. ["accountId", "balances[*].amount"]
+            if isinstance(operation.get("x-fields"), (list, str)):
+                catalog[name]["fields"] = operation["x-fields"]
+    return catalog
+
+
+def load_catalog(
+    spec_path: str,
+    cache_dir: Optional[str] = None
+) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, List[str]], Dict[str, str]]:
+    """Load the catalog and indexes for a spec file, using a compiled cache when possible.
+
+    The cache file is keyed by the SHA-256 of the spec, so any change to the
+    spec forces a re-parse while a warm start skips parsing entirely.
+    """
+    with open(spec_path, "rb") as f:
+        raw = f.read()
+    spec_hash = hashlib.sha256(raw).hexdigest()
+
+    cache_file = None
+    if cache_dir:
+        base = os.path.splitext(os.path.basename(spec_path))[0]
+        cache_file = os.path.join(cache_dir, f"{base}.{spec_hash[:16]}.catalog.json")
+        try:
+            with open(cache_file, encoding="utf-8") as f:
+                cached = json.load(f)
+            if cached.get("spec_hash") == spec_hash and cached.get("loader_version") == LOADER_VERSION:
+                logger.info("Loaded %d endpoints from catalog cache %s", len(cached["catalog"]), cache_file)
+                return cached["catalog"], cached["tag_index"], cached["operation_id_index"]
+        except (OSError, ValueError, KeyError):
+            pass
+
+    catalog = parse_spec(_read_spec(raw, spec_path))
+    tag_index, operation_id_index = build_indexes(catalog)
+    logger.info("Parsed %d endpoints from %s", len(catalog), spec_path)
+
+    if cache_file:
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            tmp_file = f"{cache_file}.tmp"
+            with open(tmp_file, "w", encoding="utf-8") as f:
+                json.dump({
+                    "spec_hash": spec_hash,
+                    "loader_version": LOADER_VERSION,
+                    "catalog": catalog,
+                    "tag_index": tag_index,
+                    "operation_id_index": operation_id_index
+                }, f)
+            os.replace(tmp_file, cache_file)
+        except OSError as e:
+            logger.warning("Could not write catalog cache %s: %s", cache_file, e)
+
+    return catalog, tag_index, operation_id_index
@@ -0,0 +1,146 @@
+import uuid
+import time
+import queue
+import streamlit as st
+from agent_service import AgentService, SessionBusy
+from chat_memory import ChatMemory, load_payload
+from resilience import LimiterRejected
+
+# Longest wait for the next streamed event; each wake-up lets Streamlit handle new input
+POLL_INTERVAL = 0.25
+# Characters of each tool result shown in the thinking trace
+OBSERVATION_PREVIEW_CHARS = 500
+
+
+@st.cache_resource
+def get_agent_service():
+    """One agent service (tools, prompt artifacts, executor pool) for the whole server process.
+
+    Streamlit re-executes this script on every interaction; the cached
+    service survives reruns and is shared by all browser sessions.
+    """
+    return AgentService()
+
+
+def apply_event(run, event):
+    """Fold one streamed agent event into the pending run's trace or answer text."""
+    if event["type"] == "answer":
+        run["answer"] += event["text"]
+    elif event["type"] == "thought":
+        run["trace"] += event["text"]
+    elif event["type"] == "action":
+        run["trace"] += f"\n\n**{event['tool']}** `{event['input']}`\n"
+    elif event["type"] == "observation":
+        preview = event["text"][:OBSERVATION_PREVIEW_CHARS]
+        if len(event["text"]) > OBSERVATION_PREVIEW_CHARS:
+            preview += " ..."
+        run["trace"] += f"\n```\n{preview}\n```\n"
+
+
+service = get_agent_service()
+
+st.title("BaNCS API Chatbot")
+st.markdown("Interact with your Bancs API via LLM and tools!")
+
+# Store chat history: recent turns in full, older ones summarized, tool payloads out of line
+if "memory" not in st.session_state:
+    st.session_state.memory = ChatMemory()
+if "session_id" not in st.session_state:
+    st.session_state.session_id = uuid.uuid4().hex
+memory = st.session_state.memory
+
+# Display chat history
+if memory.summary:
+    with st.expander(f"Earlier conversation ({memory.compacted} turns)"):
+        st.markdown(memory.summary)
+for turn in memory.turns:
+    st.chat_message("user").write(turn.question)
+    with st.chat_message("assistant"):
+        if turn.error:
+            st.error(f"Error: {turn.answer}")
+        else:
+            st.write(turn.answer)
+        if turn.note:
+            st.caption(turn.note)
+        # Tool payloads are only fetched and rendered when asked for
+        if turn.payload_key and st.toggle("Show tool results", key=f"payload-{turn.payload_key}"):
+            payload = load_payload(turn.payload_key)
+            if payload is None:
+                st.caption("Tool results are no longer available")
+            for call in payload or []:
+                st.markdown(f"**{call['tool']}** `{call['input']}`")
+                st.code(call["output"], language="json")
+
+# User input
+user_input = st.chat_input("Ask something like 'Create an account for user John'")
+
+if user_input:
+    events = queue.Queue()
+    try:
+        # Routes simple lookups and replays cached tool plans before falling back to the LLM
+        future = service.submit(st.session_state.session_id, user_input, events.put, history=memory.window())
+    except SessionBusy as e:
+        st.warning(str(e))
+    else:
+        st.session_state.pending = {
+            "question": user_input,
+            "future": future,
+            "events": events,
+            "submitted": time.monotonic(),
+            "trace": "",
+            "answer": ""
+        }
+
+# A pending answer survives reruns, so new input never loses it
+pending = st.session_state.get("pending")
+if pending:
+    st.chat_message("user").write(pending["question"])
+    with st.chat_message("assistant"):
+        # Thoughts and tool calls stream into a collapsible trace, answer tokens below it
+        status = st.status("Thinking...")
+        trace = status.empty()
+        answer = st.empty()
+        trace.markdown(pending["trace"])
+        answer.markdown(pending["answer"])
+        events = pending["events"]
+        while True:
+            try:
+                event = events.get(timeout=POLL_INTERVAL)
+            except queue.Empty:
+                if pending["future"].done():
+                    break
+                status.update(label=f"Thinking... {time.monotonic() - pending['submitted']:.0f}s")
+                continue
+            apply_event(pending, event)
+            # Render once per burst of events rather than per token
+            while not events.empty():
+                apply_event(pending, events.get_nowait())
+            trace.markdown(pending["trace"])
+            if pending["answer"]:
+                answer.markdown(pending["answer"] + "▌")
+
+        result, error = None, None
+        try:
+            result = pending["future"].result()
+        except LimiterRejected as e:
+            error = f"The assistant is busy, please try again shortly ({e})"
+        except Exception as e:
+            error = str(e)
+        del st.session_state.pending
+        if error is not None:
+            status.update(label="Failed", state="error")
+            answer.empty()
+            memory.add(pending["question"], error, error=True)
+            st.error(f"Error: {error}")
+        else:
+            status.update(label=f"Done in {time.monotonic() - pending['submitted']:.1f}s", state="complete", expanded=False)
+            note = None
+            if result.get("routed"):
+                note = f"Answered directly by {result['routed']}"
+            elif result.get("plan_cache") == "hit":
+                note = "Answered from a cached tool plan"
+            # Only the answer stays in the session; the tool payloads go to the shared store
+            memory.add(pending["question"], result["output"], result.get("intermediate_steps") or (), note)
+            answer.markdown(result["output"])
+            if note:
+                st.caption(note)
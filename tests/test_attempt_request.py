@@ -0,0 +1,43 @@
+import asyncio
+import unittest
+import mcp_tools_api
+from resilience import AdaptiveLimiter, CircuitBreaker
+
+URL = "http://backend.test/accounts"
+
+
+class CancelledWhileQueuedTest(unittest.TestCase):
+    """A call cancelled in the limiter queue must hand back its breaker admission."""
+
+    def setUp(self):
+        self.limiter = AdaptiveLimiter(initial_limit=1, min_limit=1, max_limit=1, queue_timeout=30)
+        mcp_tools_api.HOST_LIMITERS["backend.test"] = self.limiter
+
+    def tearDown(self):
+        mcp_tools_api.HOST_LIMITERS.pop("backend.test", None)
+        asyncio.run(mcp_tools_api.close_http_client())
+
+    def test_half_open_probe_is_released(self):
+        breaker = CircuitBreaker("test", open_duration=0.0, half_open_probes=1)
+        breaker._trip()
+
+        async def scenario():
+            # Hold the only slot so the probe has to queue
+            await self.limiter.acquire()
+            task = asyncio.create_task(mcp_tools_api._attempt_request("GET", URL, None, None, {}, breaker))
+            await asyncio.sleep(0)
+            self.assertEqual(breaker.state, CircuitBreaker.HALF_OPEN)
+            self.assertEqual(len(self.limiter._waiters), 1)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+            self.limiter.release(0.0, True)
+
+        asyncio.run(scenario())
+        self.assertEqual(breaker._probes_in_flight, 0)
+        # The next call is let through as a fresh probe
+        self.assertEqual(breaker.allow(), CircuitBreaker.HALF_OPEN)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+import asyncio
+import inspect
+import unittest
+from unittest import mock
+import mcp_tools_api
+
+DATE_RANGE_ENDPOINT = {
+    "method": "GET",
+    "path": "/accounts/{accountReference}/transactions",
+    "description": "List transactions in a date range",
+    "parameters": [
+        {"name": "accountReference", "type": "string", "location": "path", "required": True},
+        {"name": "from", "type": "string", "location": "query", "required": True},
+        {"name": "to", "type": "string", "location": "query", "required": False}
+    ]
+}
+
+
+class KeywordParameterTest(unittest.TestCase):
+    """A spec parameter named with a Python keyword must still give a valid tool."""
+
+    def setUp(self):
+        patcher = mock.patch.dict(mcp_tools_api.REQUEST_PLANS, {
+            "list_transactions": mcp_tools_api.compile_request_plan("list_transactions", DATE_RANGE_ENDPOINT)
+        })
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_keyword_parameter_is_renamed(self):
+        self.assertEqual(mcp_tools_api.sanitize_param_name("from"), "from_")
+        tool = mcp_tools_api.build_endpoint_tool("list_transactions", DATE_RANGE_ENDPOINT)
+        self.assertIn("from_", inspect.signature(tool).parameters)
+        self.assertNotIn("from", inspect.signature(tool).parameters)
+
+    def test_wire_name_is_sent(self):
+        tool = mcp_tools_api.build_endpoint_tool("list_transactions", DATE_RANGE_ENDPOINT)
+        run_endpoint = mock.AsyncMock(return_value={})
+        with mock.patch.object(mcp_tools_api, "run_endpoint", run_endpoint):
+            asyncio.run(tool(accountReference="101000000101814", from_="2024-01-01"))
+        params = run_endpoint.call_args.args[1]
+        self.assertEqual(params, {"accountReference": "101000000101814", "from": "2024-01-01"})
+
+
+class BaselineArgumentNameTest(unittest.TestCase):
+    """Generated tools keep the spec's names but still accept the older sanitized ones."""
+
+    def test_sanitized_names_are_aliases(self):
+        endpoint = mcp_tools_api.API_CATALOG["create_acnt_actv_using_post"]
+        tool = mcp_tools_api.build_endpoint_tool("create_acnt_actv_using_post", endpoint)
+        self.assertIn("languageCode", inspect.signature(tool).parameters)
+        self.assertEqual(tool.param_aliases, {"languagecode": "languageCode", "userid": "userId"})
+        run_endpoint = mock.AsyncMock(return_value={})
+        with mock.patch.object(mcp_tools_api, "run_endpoint", run_endpoint):
+            asyncio.run(tool(request_body={}, languagecode=1, userId=7))
+        params = run_endpoint.call_args.args[1]
+        self.assertEqual(params, {"request_body": {}, "languageCode": 1, "userId": 7})
+
+
+if __name__ == "__main__":
+    unittest.main()
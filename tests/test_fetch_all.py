@@ -0,0 +1,61 @@
+import asyncio
+import json
+import unittest
+from unittest import mock
+import httpx
+import mcp_tools_api
+
+LIST_ENDPOINT = {
+    "method": "GET",
+    "path": "/transactions",
+    "description": "List transactions",
+    "parameters": [
+        {"name": "page", "type": "integer", "location": "query", "required": False},
+        {"name": "size", "type": "integer", "location": "query", "required": False}
+    ],
+    "pagination": {"strategy": "page", "records_path": "$.items", "page_size": 300}
+}
+TOTAL_RECORDS = 450
+
+
+def backend(request: httpx.Request) -> httpx.Response:
+    page = int(request.url.params["page"])
+    size = int(request.url.params["size"])
+    start = (page - 1) * size
+    items = [{"id": i, "memo": "x" * 20} for i in range(start, min(start + size, TOTAL_RECORDS))]
+    return httpx.Response(200, json={"items": items})
+
+
+class OversizedPageTest(unittest.TestCase):
+    """Pages above the stream threshold must not be cut to the default window while paging."""
+
+    def setUp(self):
+        plan = mcp_tools_api.compile_request_plan("list_transactions", LIST_ENDPOINT)
+        client = httpx.AsyncClient(transport=httpx.MockTransport(backend))
+        for patcher in (
+            mock.patch.dict(mcp_tools_api.REQUEST_PLANS, {"list_transactions": plan}),
+            mock.patch.dict(mcp_tools_api.API_CATALOG, {"list_transactions": LIST_ENDPOINT}),
+            mock.patch.object(mcp_tools_api, "get_http_client", lambda: client),
+            mock.patch.object(mcp_tools_api, "STREAM_THRESHOLD_BYTES", 1024),
+            mock.patch.object(mcp_tools_api, "STREAM_MAX_RECORDS", 100),
+            mock.patch.object(mcp_tools_api, "CACHE_ENABLED", False)
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_every_record_is_fetched(self):
+        result = asyncio.run(mcp_tools_api.fetch_all_endpoint("list_transactions"))
+        self.assertEqual(result["record_count"], TOTAL_RECORDS)
+        self.assertTrue(result["complete"])
+        self.assertEqual(result["pages_fetched"], 2)
+
+    def test_capped_inside_an_oversized_page_can_resume(self):
+        result = asyncio.run(mcp_tools_api.fetch_all_endpoint("list_transactions", max_records=120))
+        self.assertEqual(result["record_count"], 120)
+        self.assertFalse(result["complete"])
+        self.assertEqual(result["next_params"], {"size": 300, "page": 1})
+        self.assertEqual(result["skip_records"], 120)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+import asyncio
+import threading
+import unittest
+import mcp_tools_api
+
+
+class PerLoopClientTest(unittest.TestCase):
+    """Each event loop gets its own pooled client; using one loop never closes another's."""
+
+    def test_clients_are_per_loop(self):
+        other = asyncio.new_event_loop()
+        thread = threading.Thread(target=other.run_forever, daemon=True)
+        thread.start()
+
+        async def get_client():
+            return mcp_tools_api.get_http_client()
+
+        try:
+            first = asyncio.run_coroutine_threadsafe(get_client(), other).result()
+
+            async def main():
+                second = mcp_tools_api.get_http_client()
+                self.assertIsNot(second, first)
+                self.assertIs(mcp_tools_api.get_http_client(), second)
+                return second
+
+            second = asyncio.run(main())
+            self.assertFalse(first.is_closed)
+            # asyncio.run shut its loop down, which closes that loop's client
+            self.assertTrue(second.is_closed)
+            self.assertIs(asyncio.run_coroutine_threadsafe(get_client(), other).result(), first)
+        finally:
+            asyncio.run_coroutine_threadsafe(mcp_tools_api.close_http_client(), other).result()
+            other.call_soon_threadsafe(other.stop)
+            thread.join()
+            other.close()
+        self.assertTrue(first.is_closed)
+
+    def test_close_http_client(self):
+        async def main():
+            client = mcp_tools_api.get_http_client()
+            await mcp_tools_api.close_http_client()
+            self.assertTrue(client.is_closed)
+            self.assertIsNot(mcp_tools_api.get_http_client(), client)
+
+        asyncio.run(main())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+import re
+import inspect
+import unittest
+from typing import Optional
+from intent_router import IntentRouter, tool_endpoint, value_pattern
+
+
+def generated(fn):
+    # Generated tool docs are not indented (see render_tool_doc)
+    fn.__doc__ = inspect.cleandoc(fn.__doc__)
+    return fn
+
+
+@generated
+async def cbpetget_account_balance_using_get(*, accountReference: str, max_records: Optional[int] = None):
+    """Fetch Account Balance Details
+
+    Generated from: GET /accountManagement/account/balanceDetails/{accountReference}
+    """
+
+
+@generated
+async def get_customer_details_using_get(*, customerId: str):
+    """Fetch Customer Details
+
+    Generated from: GET /customerManagement/customer/{customerId}
+    """
+
+
+@generated
+async def list_account_transactions_using_get(*, accountReference: str, count: int):
+    """Fetch Account Transactions
+
+    Generated from: GET /accountManagement/account/{accountReference}/transactions
+    """
+
+
+@generated
+async def create_acnt_actv_using_post(*, request_body: dict):
+    """Create Account for a given customer
+
+    Generated from: POST /accountManagement/account
+    """
+
+
+async def list_api_endpoints(search_query: Optional[str] = None):
+    """Search and list available API endpoints."""
+
+
+TOOLS = [
+    cbpetget_account_balance_using_get, get_customer_details_using_get,
+    list_account_transactions_using_get, create_acnt_actv_using_post, list_api_endpoints
+]
+EXAMPLES = {
+    "cbpetget_account_balance_using_get": {"accountReference": "101000000101814"},
+    "list_account_transactions_using_get": {"accountReference": "101000000101814", "count": 5}
+}
+
+
+class ValuePatternTest(unittest.TestCase):
+
+    def test_shape_of_example(self):
+        pattern = re.compile(value_pattern("101000000101814"))
+        self.assertEqual(pattern.findall("accounts 100000000000001 and 12345"), ["100000000000001"])
+        self.assertEqual(re.findall(value_pattern("AB-12"), "ref XY-34 or XY-345"), ["XY-34"])
+
+    def test_default_pattern(self):
+        self.assertEqual(re.findall(value_pattern("a b"), "id C123 or abc"), ["C123"])
+
+
+class IntentRouterTest(unittest.TestCase):
+
+    def setUp(self):
+        self.router = IntentRouter(TOOLS, EXAMPLES, min_matches=2)
+
+    def test_only_get_endpoint_tools_are_routable(self):
+        self.assertEqual(tool_endpoint(create_acnt_actv_using_post), ("POST", "/accountManagement/account"))
+        self.assertIsNone(tool_endpoint(list_api_endpoints))
+        self.assertEqual(
+            sorted(route.tool_name for route in self.router.routes),
+            ["cbpetget_account_balance_using_get", "get_customer_details_using_get", "list_account_transactions_using_get"]
+        )
+
+    def test_slot_extraction(self):
+        match = self.router.route("What is the account balance of 100000000000001?")
+        self.assertEqual(match.tool_name, "cbpetget_account_balance_using_get")
+        self.assertEqual(match.kwargs, {"accountReference": "100000000000001"})
+
+    def test_integer_slots_are_converted(self):
+        match = self.router.route("Last 5 account transactions for 100000000000001")
+        self.assertEqual(match.tool_name, "list_account_transactions_using_get")
+        self.assertEqual(match.kwargs, {"accountReference": "100000000000001", "count": 5})
+
+    def test_value_must_match_the_example_shape(self):
+        self.assertIsNone(self.router.route("account balance of 12345"))
+
+    def test_ambiguous_or_weak_questions_are_left_to_the_agent(self):
+        self.assertIsNone(self.router.route("balance 100000000000001"))
+        self.assertIsNone(self.router.route("account balance for 100000000000001 and 100000000000002"))
+        self.assertIsNone(self.router.route("create an account for customer C123"))
+
+    def test_customer_lookup(self):
+        match = self.router.route("Look up the customer with customer id C12345")
+        self.assertEqual(match.tool_name, "get_customer_details_using_get")
+        self.assertEqual(match.kwargs, {"customerId": "C12345"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import json
+import unittest
+from json_stream import JsonStreamTruncator, decode_continuation, encode_continuation
+
+DOC = {
+    "items": [{"id": i, "tags": ["a", "b", "c"], "memo": 'x,]}"y'} for i in range(10)],
+    "meta": {"total": 10}
+}
+
+
+def run(truncator: JsonStreamTruncator, raw: bytes, chunk_size: int = 7):
+    for i in range(0, len(raw), chunk_size):
+        truncator.feed(raw[i:i + chunk_size])
+    return truncator.result(), truncator.truncation()
+
+
+class JsonStreamTruncatorTest(unittest.TestCase):
+
+    def test_records_window_with_offset(self):
+        data, truncated = run(JsonStreamTruncator(3, "$.items", offset=4), json.dumps(DOC).encode())
+        self.assertEqual([item["id"] for item in data["items"]], [4, 5, 6])
+        self.assertEqual(data["items"][0], DOC["items"][4])
+        self.assertEqual(data["meta"], DOC["meta"])
+        self.assertEqual(truncated, {"$.items": {"total": 10, "returned": 3, "offset": 4}})
+
+    def test_other_arrays_are_cut_to_max_records(self):
+        data, truncated = run(JsonStreamTruncator(2, "$.items"), json.dumps(DOC).encode())
+        self.assertEqual(data["items"][0]["tags"], ["a", "b"])
+        self.assertEqual(truncated["$.items"]["returned"], 2)
+
+    def test_small_document_is_unchanged(self):
+        data, truncated = run(JsonStreamTruncator(100, "$.items"), json.dumps(DOC).encode())
+        self.assertEqual(data, DOC)
+        self.assertEqual(truncated, {})
+
+    def test_top_level_array_and_split_utf8(self):
+        truncator = JsonStreamTruncator(2, "$")
+        truncator.feed(b'["\xc3')
+        truncator.feed(b'\xa9", 2, 3, 4]')
+        self.assertEqual(truncator.result(), ["é", 2])
+        self.assertEqual(truncator.truncation(), {"$": {"total": 4, "returned": 2, "offset": 0}})
+
+
+class ContinuationTokenTest(unittest.TestCase):
+
+    def test_round_trip(self):
+        token = encode_continuation("list_transactions", 300)
+        self.assertNotIn("=", token)
+        self.assertEqual(decode_continuation(token, "list_transactions"), 300)
+
+    def test_token_of_another_endpoint(self):
+        with self.assertRaises(ValueError):
+            decode_continuation(encode_continuation("a", 10), "b")
+
+    def test_garbage(self):
+        for token in ("", "not-a-token", "e30"):
+            with self.assertRaises(ValueError):
+                decode_continuation(token, "a")
+
+
+if __name__ == "__main__":
+    unittest.main()
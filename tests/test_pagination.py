@@ -0,0 +1,113 @@
+import asyncio
+import unittest
+from pagination import PaginationStrategy, fetch_all_pages, get_path
+
+RECORDS = list(range(25))
+
+
+def page_backend(total=RECORDS, with_total=False):
+    calls = []
+
+    async def fetch(params):
+        calls.append(dict(params))
+        start = (params["page"] - 1) * params["size"]
+        page = {"data": {"items": total[start:start + params["size"]]}}
+        if with_total:
+            page["count"] = len(total)
+        return page
+    return fetch, calls
+
+
+def fetch_all(fetch, strategy, max_records=1000, max_pages=50, params=None):
+    return asyncio.run(fetch_all_pages(fetch, strategy, params or {}, max_records, max_pages))
+
+
+class PageStrategyTest(unittest.TestCase):
+    strategy = PaginationStrategy("page", records_path="$.data.items", page_size=10)
+
+    def test_short_page_is_the_last(self):
+        fetch, calls = page_backend()
+        result = fetch_all(fetch, self.strategy)
+        self.assertEqual(result["records"], RECORDS)
+        self.assertTrue(result["complete"])
+        self.assertEqual([c["page"] for c in calls], [1, 2, 3])
+
+    def test_empty_page_ends_paging(self):
+        fetch, calls = page_backend(list(range(20)))
+        result = fetch_all(fetch, self.strategy)
+        self.assertEqual(result["record_count"], 20)
+        self.assertTrue(result["complete"])
+        self.assertEqual(len(calls), 3)
+
+    def test_total_path_avoids_an_extra_request(self):
+        strategy = PaginationStrategy("page", records_path="$.data.items", page_size=10, total_path="$.count")
+        fetch, calls = page_backend(list(range(20)), with_total=True)
+        result = fetch_all(fetch, strategy)
+        self.assertTrue(result["complete"])
+        self.assertEqual(len(calls), 2)
+
+    def test_max_records_inside_a_page_can_resume(self):
+        fetch, _ = page_backend()
+        result = fetch_all(fetch, self.strategy, max_records=15)
+        self.assertEqual(result["records"], RECORDS[:15])
+        self.assertFalse(result["complete"])
+        self.assertEqual(result["next_params"], {"size": 10, "page": 2})
+        self.assertEqual(result["skip_records"], 5)
+
+    def test_max_pages(self):
+        fetch, calls = page_backend()
+        result = fetch_all(fetch, self.strategy, max_pages=2)
+        self.assertEqual(result["record_count"], 20)
+        self.assertFalse(result["complete"])
+        self.assertEqual(result["next_params"], {"size": 10, "page": 3})
+        self.assertEqual(len(calls), 2)
+
+    def test_error_page(self):
+        async def fetch(params):
+            if params["page"] == 2:
+                return {"error": True, "message": "boom"}
+            return {"data": {"items": list(range(10))}}
+        result = fetch_all(fetch, self.strategy)
+        self.assertTrue(result["error"])
+        self.assertEqual(result["pages_fetched"], 1)
+        self.assertEqual(len(result["records"]), 10)
+
+
+class OffsetAndCursorStrategyTest(unittest.TestCase):
+
+    def test_offset_advances_by_records_seen(self):
+        strategy = PaginationStrategy("offset", records_path="$", page_size=10, size_param="limit")
+        calls = []
+
+        async def fetch(params):
+            calls.append(params["offset"])
+            return RECORDS[params["offset"]:params["offset"] + params["limit"]]
+        result = fetch_all(fetch, strategy)
+        self.assertEqual(result["records"], RECORDS)
+        self.assertEqual(calls, [0, 10, 20])
+
+    def test_cursor_stops_without_next_cursor(self):
+        strategy = PaginationStrategy("cursor", records_path="$.items", size_param=None, next_cursor_path="$.next")
+        pages = {None: {"items": [1, 2], "next": "b"}, "b": {"items": [3], "next": ""}}
+
+        async def fetch(params):
+            return pages[params.get("cursor")]
+        result = fetch_all(fetch, strategy)
+        self.assertEqual(result["records"], [1, 2, 3])
+        self.assertTrue(result["complete"])
+
+    def test_from_catalog(self):
+        strategy = PaginationStrategy.from_catalog({"strategy": "page", "page_size": "20", "unknown": 1})
+        self.assertEqual(strategy.page_size, 20)
+        self.assertEqual(strategy.first_params({}), {"size": 20, "page": 1})
+        with self.assertRaises(ValueError):
+            PaginationStrategy.from_catalog({"strategy": "link"})
+
+    def test_get_path(self):
+        self.assertEqual(get_path({"a": {"b": [1]}}, "$.a.b"), [1])
+        self.assertIsNone(get_path({"a": 1}, "$.a.b"))
+        self.assertEqual(get_path([1], "$"), [1])
+
+
+if __name__ == "__main__":
+    unittest.main()
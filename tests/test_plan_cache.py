@@ -0,0 +1,82 @@
+import unittest
+from unittest import mock
+import plan_cache
+from plan_cache import PlanCache, Slot, ToolPlan, bind_plan, build_plan, normalize_question
+
+
+class NormalizeQuestionTest(unittest.TestCase):
+
+    def test_values_become_slots(self):
+        template, slots = normalize_question('Balance of account "ACC-1" and 100000000000001 for john@x.com?')
+        self.assertEqual(template, "balance of account {0} and {1} for {2}")
+        self.assertEqual(slots, ("ACC-1", "100000000000001", "john@x.com"))
+
+    def test_same_template_for_different_values(self):
+        self.assertEqual(
+            normalize_question("Balance of account 101000000101814")[0],
+            normalize_question("  balance of   account 100000000000001?! ")[0]
+        )
+
+    def test_repeated_value_reuses_its_slot(self):
+        self.assertEqual(normalize_question("move 500 from 500"), ("move {0} from {0}", ("500",)))
+
+
+class BuildAndBindPlanTest(unittest.TestCase):
+    slots = ("101000000101814", "5")
+
+    def test_round_trip(self):
+        steps = [
+            ("get_balance", {"accountReference": "101000000101814"}, {"balance": 10}),
+            ("list_transactions", {"accountReference": "101000000101814", "size": 5}, {"items": []})
+        ]
+        plan = build_plan("t", self.slots, steps)
+        self.assertEqual(plan.steps[1][1], {"accountReference": Slot(0), "size": Slot(1, "int")})
+        self.assertEqual(bind_plan(plan, ("100000000000001", "7")), [
+            ("get_balance", {"accountReference": "100000000000001"}),
+            ("list_transactions", {"accountReference": "100000000000001", "size": 7})
+        ])
+
+    def test_not_replayable(self):
+        ok = ("get_balance", {"accountReference": "101000000101814", "size": "5"}, {"customerId": "C12345"})
+        # A failed step
+        self.assertIsNone(build_plan("t", self.slots, [("get_balance", {"accountReference": "101000000101814", "size": 5}, {"error": True})]))
+        # An argument taken from an earlier result
+        self.assertIsNone(build_plan("t", self.slots, [ok, ("get_customer", {"customerId": "C12345"}, {})]))
+        # An argument taken from the conversation
+        self.assertIsNone(build_plan("t", self.slots, [ok, ("get_customer", {"customerId": "C999"}, {})], context="customer C999"))
+        # A slot that was never used
+        self.assertIsNone(build_plan("t", self.slots, [("get_balance", {"accountReference": "101000000101814"}, {})]))
+        self.assertIsNone(build_plan("t", (), []))
+
+    def test_bind_rejects_values_of_the_wrong_kind(self):
+        plan = ToolPlan("t", (("list", {"size": Slot(0, "int")}),))
+        with self.assertRaises(ValueError):
+            bind_plan(plan, ("five",))
+
+
+class PlanCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.now = 1000.0
+        patcher = mock.patch.object(plan_cache.time, "monotonic", lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_ttl_lru_and_catalog_version(self):
+        cache = PlanCache(max_entries=2, ttl=10)
+        for name in ("a", "b", "c"):
+            cache.put(ToolPlan(name, ()))
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.evictions, 1)
+        self.assertIsNotNone(cache.get("b"))
+        self.now += 10
+        self.assertIsNone(cache.get("c"))
+        cache.put(ToolPlan("d", ()))
+        cache.set_catalog_version("v1")
+        self.assertIsNotNone(cache.get("d"))
+        cache.set_catalog_version("v2")
+        self.assertIsNone(cache.get("d"))
+
+
+if __name__ == "__main__":
+    unittest.main()
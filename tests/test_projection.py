@@ -0,0 +1,59 @@
+import unittest
+from projection import compile_fields, copy_json, parse_fields, project, relative_to, slim
+
+
+class RelativeToTest(unittest.TestCase):
+
+    def test_paths_under_records_become_record_relative(self):
+        fields = ("$.data.items[*].amount", "$.data.items.currency")
+        self.assertEqual(relative_to(fields, "$.data.items"), (("amount", "currency"), ()))
+
+    def test_record_relative_paths_are_kept(self):
+        self.assertEqual(relative_to(("amount", "memo.text"), "$.data.items"), (("amount", "memo.text"), ()))
+
+    def test_rooted_paths_outside_records_are_ignored(self):
+        relative, ignored = relative_to(("$.cust", "$.data.items[*].amount"), "$.data.items")
+        self.assertEqual(relative, ("amount",))
+        self.assertEqual(ignored, ("$.cust",))
+
+    def test_records_path_itself_keeps_whole_records(self):
+        self.assertEqual(relative_to(("$.data.items", "$.data.items.amount"), "$.data.items"), ((), ()))
+
+    def test_top_level_records(self):
+        self.assertEqual(relative_to(("$.amount",), "$"), (("$.amount",), ()))
+
+
+class ProjectionTest(unittest.TestCase):
+
+    def test_parse_fields(self):
+        self.assertEqual(parse_fields("a, b.c ,"), ("a", "b.c"))
+        self.assertEqual(parse_fields(["a", " "]), ("a",))
+        self.assertEqual(parse_fields(None), ())
+
+    def test_compile_fields(self):
+        self.assertIsNone(compile_fields(("*",)))
+        self.assertIsNone(compile_fields(()))
+        self.assertEqual(compile_fields(("$.a.b", "$.a", "c[*].d")), {"a": None, "c": {"d": None}})
+        with self.assertRaises(ValueError):
+            compile_fields(("$.items[0].amount",))
+
+    def test_project_lists_element_wise(self):
+        data = {"id": 1, "items": [{"amount": 5, "memo": "x"}, {"amount": 7}], "extra": True}
+        tree = compile_fields(("id", "$.items[*].amount"))
+        self.assertEqual(project(data, tree), {"id": 1, "items": [{"amount": 5}, {"amount": 7}]})
+
+    def test_slim(self):
+        data = {"a": None, "b": [], "c": {"d": {}}, "e": [None, 0], "f": ""}
+        self.assertEqual(slim(data), {"e": [None, 0], "f": ""})
+
+    def test_copy_json(self):
+        data = {"items": [{"amount": 5}], "meta": {"total": 1}}
+        copied = copy_json(data)
+        self.assertEqual(copied, data)
+        copied["items"][0]["amount"] = 6
+        copied["meta"]["total"] = 2
+        self.assertEqual(data, {"items": [{"amount": 5}], "meta": {"total": 1}})
+
+
+if __name__ == "__main__":
+    unittest.main()
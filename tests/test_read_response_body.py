@@ -0,0 +1,44 @@
+import asyncio
+import gzip
+import json
+import unittest
+from unittest import mock
+import httpx
+import mcp_tools_api
+
+RECORDS = [{"id": i, "memo": "payment " * 5} for i in range(1000)]
+
+
+def json_response(body: bytes, **headers: str) -> httpx.Response:
+    return httpx.Response(200, headers={"content-type": "application/json", **headers}, content=body)
+
+
+class ReadResponseBodyTest(unittest.TestCase):
+
+    def setUp(self):
+        for patcher in (
+            mock.patch.object(mcp_tools_api, "STREAM_THRESHOLD_BYTES", 10000),
+            mock.patch.object(mcp_tools_api, "STREAM_MAX_RECORDS", 100)
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_small_body_is_read_whole(self):
+        result = asyncio.run(mcp_tools_api.read_response_body(json_response(json.dumps(RECORDS[:10]).encode())))
+        self.assertEqual(result, RECORDS[:10])
+
+    def test_large_body_is_windowed(self):
+        result = asyncio.run(mcp_tools_api.read_response_body(json_response(json.dumps(RECORDS).encode())))
+        self.assertTrue(result["streamed"])
+        self.assertEqual(len(result["data"]), 100)
+
+    def test_compressed_size_does_not_skip_the_window(self):
+        body = gzip.compress(json.dumps(RECORDS).encode())
+        self.assertLess(len(body), 10000)
+        result = asyncio.run(mcp_tools_api.read_response_body(json_response(body, **{"content-encoding": "gzip"})))
+        self.assertTrue(result["streamed"])
+        self.assertEqual(len(result["data"]), 100)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,125 @@
+import unittest
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from unittest import mock
+import resilience
+from resilience import CircuitBreaker, RetryBudget, RetryPolicy, parse_retry_after
+
+
+class RetryAfterTest(unittest.TestCase):
+
+    def test_delta_seconds(self):
+        self.assertEqual(parse_retry_after("3"), 3.0)
+        self.assertEqual(parse_retry_after(" 1.5 "), 1.5)
+        self.assertEqual(parse_retry_after("-2"), 0.0)
+
+    def test_http_date(self):
+        value = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=30), usegmt=True)
+        self.assertAlmostEqual(parse_retry_after(value), 30, delta=2)
+        past = format_datetime(datetime.now(timezone.utc) - timedelta(seconds=30), usegmt=True)
+        self.assertEqual(parse_retry_after(past), 0.0)
+
+    def test_missing_or_invalid(self):
+        self.assertIsNone(parse_retry_after(None))
+        self.assertIsNone(parse_retry_after(""))
+        self.assertIsNone(parse_retry_after("soon"))
+
+    def test_policy_honours_retry_after_up_to_max_delay(self):
+        policy = RetryPolicy(max_delay=5.0)
+        self.assertEqual(policy.delay(1, 2.0), 2.0)
+        self.assertIsNone(policy.delay(1, 10.0))
+        for attempt in range(1, 6):
+            self.assertLessEqual(policy.delay(attempt), min(5.0, 0.2 * 2 ** (attempt - 1)))
+
+    def test_policy_override(self):
+        policy = RetryPolicy().override({"max_attempts": "5", "retry_on_status": [500], "methods": ["post"]})
+        self.assertEqual(policy.max_attempts, 5)
+        self.assertEqual(policy.retry_statuses, frozenset({500}))
+        self.assertTrue(policy.allows_method("POST"))
+        self.assertFalse(policy.allows_method("GET"))
+
+
+class RetryBudgetTest(unittest.TestCase):
+
+    def setUp(self):
+        self.now = 1000.0
+        patcher = mock.patch.object(resilience.time, "monotonic", lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_retries_stop_when_the_budget_drains(self):
+        budget = RetryBudget(ratio=0.5, min_per_second=0.0, max_tokens=2)
+        self.assertTrue(budget.try_withdraw())
+        self.assertTrue(budget.try_withdraw())
+        self.assertFalse(budget.try_withdraw())
+        self.assertEqual(budget.exhausted, 1)
+        # Two requests earn one retry
+        budget.record_request()
+        budget.record_request()
+        self.assertTrue(budget.try_withdraw())
+        self.assertFalse(budget.try_withdraw())
+
+    def test_time_based_reserve(self):
+        budget = RetryBudget(ratio=0.0, min_per_second=1.0, max_tokens=1)
+        self.assertTrue(budget.try_withdraw())
+        self.assertFalse(budget.try_withdraw())
+        self.now += 1.0
+        self.assertTrue(budget.try_withdraw())
+
+
+class CircuitBreakerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.now = 1000.0
+        patcher = mock.patch.object(resilience.time, "monotonic", lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.breaker = CircuitBreaker("test", failure_threshold=0.5, min_calls=4, window=30, open_duration=10)
+
+    def trip(self):
+        for ok in (True, False, False, True):
+            self.breaker.record(self.breaker.allow(), ok)
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+
+    def test_opens_at_failure_ratio(self):
+        for ok in (True, False, True):
+            self.breaker.record(self.breaker.allow(), ok)
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+        self.breaker.record(self.breaker.allow(), False)
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+        self.assertIsNone(self.breaker.allow())
+        self.assertAlmostEqual(self.breaker.retry_in(), 10)
+
+    def test_half_open_admits_one_probe(self):
+        self.trip()
+        self.now += 10
+        admitted = self.breaker.allow()
+        self.assertEqual(admitted, CircuitBreaker.HALF_OPEN)
+        self.assertIsNone(self.breaker.allow())
+        self.breaker.record(admitted, True)
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+
+    def test_failed_probe_reopens(self):
+        self.trip()
+        self.now += 10
+        self.breaker.record(self.breaker.allow(), False)
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+        self.assertEqual(self.breaker.trips, 2)
+
+    def test_abandoned_probe_frees_its_slot(self):
+        self.trip()
+        self.now += 10
+        self.breaker.record(self.breaker.allow(), None)
+        self.assertEqual(self.breaker.state, CircuitBreaker.HALF_OPEN)
+        self.assertEqual(self.breaker.allow(), CircuitBreaker.HALF_OPEN)
+
+    def test_old_outcomes_leave_the_window(self):
+        for ok in (False, False, True):
+            self.breaker.record(self.breaker.allow(), ok)
+        self.now += 31
+        self.breaker.record(self.breaker.allow(), False)
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,34 @@
+import unittest
+from unittest import mock
+import mcp_tools_api
+
+
+class SharedResultTest(unittest.TestCase):
+    """Shaped results must never be the object held by the response cache."""
+
+    def test_unshaped_result_is_a_copy(self):
+        cached = {"account": {"balance": 5}, "history": [{"amount": 1}]}
+        with mock.patch.object(mcp_tools_api, "SLIM_RESPONSES", False):
+            result = mcp_tools_api.shape_result(cached, None)
+        result["account"]["balance"] = 0
+        result["history"].append({"amount": 2})
+        self.assertEqual(cached, {"account": {"balance": 5}, "history": [{"amount": 1}]})
+
+    def test_projected_result_is_a_copy(self):
+        cached = {"account": {"balance": 5}, "other": 1}
+        tree = mcp_tools_api.compile_fields(("account",))
+        with mock.patch.object(mcp_tools_api, "SLIM_RESPONSES", False):
+            result = mcp_tools_api.shape_result(cached, tree)
+        result["account"]["balance"] = 0
+        self.assertEqual(cached["account"], {"balance": 5})
+
+    def test_windowed_result_is_a_copy(self):
+        cached = {"data": {"items": [1]}, "streamed": True, "truncated": {"$.items": {"returned": 1}}}
+        result = mcp_tools_api.shape_result(cached, None, "data")
+        result["truncated"]["$.items"]["returned"] = 0
+        result["data"]["items"].append(2)
+        self.assertEqual(cached, {"data": {"items": [1]}, "streamed": True, "truncated": {"$.items": {"returned": 1}}})
+
+
+if __name__ == "__main__":
+    unittest.main()